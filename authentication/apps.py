@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class AuthenticationConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "authentication"
+
+    def ready(self):
+        # Enregistre les récepteurs de signaux (invalidation du cache des utilisateurs)
+        from . import signals  # noqa: F401
@@ -0,0 +1,138 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+
+class UserCache:
+    """
+    Cache LRU des lignes d'utilisateurs, limité en taille et en durée, propre au processus.
+
+    On garde les valeurs des colonnes, pas les instances : chaque requête reçoit sa propre
+    instance de modèle, que les vues peuvent modifier sans effet sur les autres threads.
+    """
+
+    def __init__(self, maxsize, timeout):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, values):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.timeout, values)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = self.misses = 0
+
+
+user_cache = UserCache(
+    maxsize=getattr(settings, 'JWT_USER_CACHE_SIZE', 10000),
+    timeout=getattr(settings, 'JWT_USER_CACHE_TIMEOUT', 60),
+)
+
+
+def invalidate_user(user_id):
+    """
+    Retire un utilisateur du cache : à appeler après une écriture qui ne déclenche pas
+    de signaux (`update()`, SQL brut...).
+    """
+    user_cache.delete(str(user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    `JWTAuthentication` sans lecture de la base à chaque requête.
+
+    L'identifiant de l'utilisateur vient du jeton ; sa ligne est lue une fois puis servie
+    par `user_cache` jusqu'à `JWT_USER_CACHE_TIMEOUT` secondes. Les signaux de
+    `authentication.signals` l'invalident quand l'utilisateur est modifié ou supprimé.
+    Le cache est propre à chaque processus : avec plusieurs processus, une désactivation
+    faite ailleurs n'est prise en compte qu'à l'expiration de l'entrée.
+    """
+
+    def get_user_id(self, validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+    def get_cached_user(self, user_id):
+        values = user_cache.get(str(user_id))
+        if values is None:
+            return None
+        user = self.user_model.from_db(
+            DEFAULT_DB_ALIAS, [field.attname for field in self.user_model._meta.concrete_fields], values
+        )
+        if not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        return user
+
+    def cache_user(self, user_id, user):
+        user_cache.set(str(user_id), tuple(getattr(user, field.attname) for field in user._meta.concrete_fields))
+
+    def get_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+        if not user_cache.timeout:
+            return super().get_user(validated_token)
+
+        user = self.get_cached_user(user_id)
+        if user is None:
+            user = super().get_user(validated_token)
+            self.cache_user(user_id, user)
+        return user
+
+    async def aauthenticate(self, request):
+        """
+        Équivalent asynchrone de `authenticate()` pour les vues de `projects.async_views`.
+        """
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+        user = self.get_cached_user(user_id) if user_cache.timeout else None
+        if user is not None:
+            return user
+
+        try:
+            user = await self.user_model.objects.aget(**{api_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+        if not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        if user_cache.timeout:
+            self.cache_user(user_id, user)
+        return user
@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """
+    PBKDF2-SHA256 de Django dont le coût (nombre d'itérations) dépend du profil
+    `PASSWORD_HASHING_PROFILE` choisi parmi `PASSWORD_HASHING_PROFILES`.
+
+    L'algorithme ne change pas : les mots de passe existants restent valides et sont
+    recalculés au coût du profil lors de la connexion suivante.
+    """
+
+    @property
+    def iterations(self):
+        profiles = getattr(settings, 'PASSWORD_HASHING_PROFILES', {})
+        return profiles.get(getattr(settings, 'PASSWORD_HASHING_PROFILE', None), hashers.PBKDF2PasswordHasher.iterations)
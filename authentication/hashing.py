@@ -0,0 +1,92 @@
+"""
+Exécution du hachage des mots de passe (inscription, connexion) hors du thread de la requête.
+
+Le hachage PBKDF2 occupe un cœur pendant des dizaines de millisecondes ; OpenSSL libère le GIL
+pendant le calcul, un pool de threads suffit donc. Le pool est borné (`PASSWORD_HASHING_WORKERS`)
+et sa file d'attente aussi (`PASSWORD_HASHING_MAX_PENDING`) : au-delà, la requête est refusée
+avec un 429 plutôt que de laisser une rafale de connexions saturer le processus.
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from rest_framework.exceptions import Throttled
+
+_lock = threading.Lock()
+_executor = None
+_executor_workers = None
+_pending = 0
+
+
+class HashingBusy(Throttled):
+    default_detail = 'Trop de connexions en cours, réessayez dans un instant.'
+
+
+def get_workers():
+    return getattr(settings, 'PASSWORD_HASHING_WORKERS', 2)
+
+
+def get_executor():
+    """
+    Renvoie le pool, recréé si `PASSWORD_HASHING_WORKERS` a changé. None si le pool est désactivé (0).
+    """
+    global _executor, _executor_workers
+    workers = get_workers()
+    with _lock:
+        if workers != _executor_workers:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            _executor = ThreadPoolExecutor(workers, thread_name_prefix='password-hashing') if workers else None
+            _executor_workers = workers
+        return _executor
+
+
+def _release(future):
+    global _pending
+    with _lock:
+        _pending -= 1
+
+
+def _call(function, args, kwargs):
+    # Les threads du pool ne passent pas par request_finished : on applique CONN_MAX_AGE ici
+    try:
+        return function(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+def submit(executor, function, *args, **kwargs):
+    global _pending
+    with _lock:
+        if _pending >= getattr(settings, 'PASSWORD_HASHING_MAX_PENDING', 64):
+            raise HashingBusy(wait=1)
+        _pending += 1
+    future = executor.submit(_call, function, args, kwargs)
+    future.add_done_callback(_release)
+    return future
+
+
+def run(function, *args, **kwargs):
+    """
+    Exécute `function` dans le pool et attend son résultat (vues synchrones).
+    """
+    executor = get_executor()
+    if executor is None:
+        return function(*args, **kwargs)
+    return submit(executor, function, *args, **kwargs).result()
+
+
+async def run_async(function, *args, **kwargs):
+    """
+    Exécute `function` dans le pool sans bloquer la boucle d'évènements (vues asynchrones).
+
+    Sans pool, on retombe sur `sync_to_async`, c'est-à-dire sur le thread unique partagé
+    par toutes les vues synchrones, comme avant.
+    """
+    executor = get_executor()
+    if executor is None:
+        return await sync_to_async(function)(*args, **kwargs)
+    return await asyncio.wrap_future(submit(executor, function, *args, **kwargs))
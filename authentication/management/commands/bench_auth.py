@@ -0,0 +1,73 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import AccessToken
+
+from authentication.authentication import CachedJWTAuthentication, user_cache
+from projects.views import ProjectViewSet
+
+
+class Command(BaseCommand):
+    """
+    Compare le débit d'une requête authentifiée par jeton JWT avec `JWTAuthentication`
+    et avec `CachedJWTAuthentication`, dans une transaction annulée à la fin.
+    """
+
+    help = 'Mesure les requêtes par seconde avec et sans cache des utilisateurs JWT.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--users', type=int, default=100, help='Utilisateurs distincts, servis à tour de rôle')
+
+    def measure(self, authentication_class, tokens, requests):
+        """
+        Renvoie (requêtes par seconde sur la liste des projets, µs par appel à `authenticate()`,
+        lectures de la table des utilisateurs par requête).
+        """
+        view = ProjectViewSet.as_view({'get': 'list'}, authentication_classes=[authentication_class])
+        factory = APIRequestFactory(SERVER_NAME='localhost')
+        user_queries = []
+
+        def count_user_queries(execute, sql, params, many, context):
+            if 'FROM "authentication_user"' in sql:
+                user_queries.append(sql)
+            return execute(sql, params, many, context)
+
+        def build(i):
+            return factory.get('/projects/', {'limit': 1}, HTTP_AUTHORIZATION=f'Bearer {tokens[i % len(tokens)]}')
+
+        user_cache.clear()
+        with connection.execute_wrapper(count_user_queries):
+            start = time.perf_counter()
+            for i in range(requests):
+                response = view(build(i))
+                assert response.status_code == 200, response.status_code
+            rate = requests / (time.perf_counter() - start)
+
+        authenticator = authentication_class()
+        http_requests = [build(i) for i in range(requests)]
+        start = time.perf_counter()
+        for request in http_requests:
+            authenticator.authenticate(request)
+        per_call = (time.perf_counter() - start) / requests * 1e6
+
+        return rate, per_call, len(user_queries) / requests
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        with transaction.atomic():
+            prefix = f'bench-auth-{time.time_ns()}'
+            User.objects.bulk_create([User(username=f'{prefix}-{i}') for i in range(options['users'])])
+            tokens = [str(AccessToken.for_user(user)) for user in User.objects.filter(username__startswith=prefix)]
+
+            self.stdout.write(f"{'classe':<26} {'requêtes/s':>11} {'authenticate()':>15} {'lectures user/req.':>19}")
+            for authentication_class in (JWTAuthentication, CachedJWTAuthentication):
+                rate, per_call, user_queries = self.measure(authentication_class, tokens, options['requests'])
+                self.stdout.write(f'{authentication_class.__name__:<26} {rate:>11.0f} {per_call:>12.0f} µs '
+                                  f'{user_queries:>19.2f}')
+
+            transaction.set_rollback(True)
@@ -0,0 +1,78 @@
+import asyncio
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+class Command(BaseCommand):
+    """
+    Mesure la latence de la liste des projets pendant une rafale de connexions, à travers la pile
+    ASGI (`AsyncClient`), avec le hachage dans le thread des vues synchrones (0 thread) puis dans le pool.
+
+    Les threads du pool utilisent leurs propres connexions : les utilisateurs de mesure sont donc
+    enregistrés dans la base, puis supprimés à la fin.
+    """
+
+    help = 'Mesure la latence des autres routes pendant une rafale de connexions.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=16, help='Connexions simultanées')
+        parser.add_argument('--requests', type=int, default=50, help='Requêtes mesurées par scénario')
+
+    async def storm(self, stop, credentials):
+        client = AsyncClient()
+        logins = 0
+        while not stop.is_set():
+            response = await client.post('/login/', credentials, content_type='application/json')
+            logins += response.status_code == 200
+        return logins
+
+    async def scenario(self, token, credentials, concurrency, requests):
+        """
+        Renvoie (médiane en ms, 95e centile en ms, connexions par seconde).
+        """
+        stop = asyncio.Event()
+        storms = [asyncio.create_task(self.storm(stop, credentials)) for _ in range(concurrency)]
+        await asyncio.sleep(0.5 if concurrency else 0)
+
+        client = AsyncClient()
+        headers = {'authorization': f'Bearer {token}'}
+        timings = []
+        start = time.perf_counter()
+        for _ in range(requests):
+            request_start = time.perf_counter()
+            response = await client.get('/projects/', {'limit': 1}, headers=headers)
+            assert response.status_code == 200, response.status_code
+            timings.append((time.perf_counter() - request_start) * 1000)
+        duration = time.perf_counter() - start
+
+        stop.set()
+        logins = sum(await asyncio.gather(*storms))
+        p95 = statistics.quantiles(timings, n=20)[-1]
+        return statistics.median(timings), p95, logins / duration
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        prefix = f'bench-login-{time.time_ns()}'
+        credentials = {'username': f'{prefix}-storm', 'password': 'mot de passe de mesure'}
+        User.objects.create_user(**credentials)
+        reader = User.objects.create(username=f'{prefix}-reader')
+        token = str(AccessToken.for_user(reader))
+
+        try:
+            self.stdout.write(f"{'hachage':<22} {'rafale':>7} {'médiane':>10} {'p95':>10} {'connexions/s':>13}")
+            for workers in (0, settings.PASSWORD_HASHING_WORKERS or 2):
+                label = f'pool de {workers} threads' if workers else 'thread des vues'
+                # AsyncClient envoie toujours l'en-tête Host "testserver"
+                with override_settings(PASSWORD_HASHING_WORKERS=workers, ALLOWED_HOSTS=['testserver']):
+                    for concurrency in (0, options['concurrency']):
+                        median, p95, rate = asyncio.run(
+                            self.scenario(token, credentials, concurrency, options['requests']))
+                        self.stdout.write(f'{label:<22} {concurrency:>7} {median:>7.1f} ms {p95:>7.1f} ms {rate:>13.1f}')
+        finally:
+            User.objects.filter(username__startswith=prefix).delete()
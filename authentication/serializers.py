@@ -1,6 +1,9 @@
 from rest_framework import serializers
 from rest_framework.validators import UniqueValidator
 from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth.hashers import make_password
+
+from authentication import hashing
 
 User = get_user_model()
 
@@ -49,11 +52,17 @@ class SignUpSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         """
-        Crée un nouvel utilisateur avec les données validées (username, email, password).
-        **validated_data est une façon de passer toutes les données validées en une fois à la méthode create_user.
+        Crée un nouvel utilisateur avec les données validées (username, email, password), comme `create_user`.
+        Le mot de passe déjà haché par la vue est passé par `save(password_hash=...)` ; sinon,
+        il est haché ici, dans le pool de `authentication.hashing`.
         """
-        validated_data.pop('password2')
-        user = User.objects.create_user(**validated_data)
+        password = validated_data.get('password_hash') or hashing.run(make_password, validated_data['password'])
+        user = User(
+            username=User.normalize_username(validated_data['username']),
+            email=User.objects.normalize_email(validated_data.get('email')),
+            password=password,
+        )
+        user.save()
         return user
 
 
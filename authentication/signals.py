@@ -0,0 +1,15 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from rest_framework_simplejwt.settings import api_settings
+
+from .authentication import invalidate_user
+
+
+@receiver([post_save, post_delete], sender=get_user_model())
+def user_changed(sender, instance, **kwargs):
+    """
+    Une modification (désactivation, droits...) ou une suppression retire l'utilisateur du cache
+    de `CachedJWTAuthentication`.
+    """
+    invalidate_user(getattr(instance, api_settings.USER_ID_FIELD))
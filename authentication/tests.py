@@ -1,3 +1,112 @@
-from django.test import TestCase
+import threading
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import AsyncClient, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from . import hashing
+from .authentication import UserCache, user_cache
+
+User = get_user_model()
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    """
+    Vérifie que l'utilisateur authentifié est servi par le cache et invalidé à sa modification.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='user')
+
+    def setUp(self):
+        user_cache.clear()
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+
+    def user_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/projects/')
+        self.assertEqual(response.status_code, 200)
+        return [query for query in context if 'FROM "authentication_user"' in query['sql']]
+
+    def test_user_read_once(self):
+        self.assertEqual(len(self.user_queries()), 1)
+        self.assertEqual(self.user_queries(), [])
+
+    def test_deactivation_invalidates(self):
+        self.user_queries()
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get('/projects/').status_code, 401)
+
+    def test_lru_eviction_and_expiry(self):
+        cache = UserCache(maxsize=2, timeout=60)
+        cache.set('1', 'a')
+        cache.set('2', 'b')
+        cache.get('1')
+        cache.set('3', 'c')
+        self.assertEqual([cache.get(key) for key in '123'], ['a', None, 'c'])
+
+        cache.timeout = -1
+        cache.set('1', 'a')
+        self.assertIsNone(cache.get('1'))
+
+
+@override_settings(PASSWORD_HASHING_PROFILE='rapide', PASSWORD_HASHING_WORKERS=0)
+class PasswordHashingTests(TestCase):
+    """
+    Vérifie l'inscription et la connexion avec le profil de hachage et le pool.
+    Le pool est désactivé dans les requêtes : ses threads ne voient pas la transaction du test.
+    """
+
+    def test_signup_and_login(self):
+        response = self.client.post('/signup/', {'username': 'alice', 'email': 'alice@example.com',
+                                                 'password': 'motdepasse', 'password2': 'motdepasse'})
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(User.objects.get(username='alice').password.startswith('pbkdf2_sha256$1000$'))
+
+        response = self.client.post('/login/', {'username': 'alice', 'password': 'motdepasse'},
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('access', response.json())
+
+        response = self.client.post('/login/', {'username': 'alice', 'password': 'faux'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'non_field_errors': ['Les informations sont incorrectes.']})
+
+    def test_login_is_a_drf_view(self):
+        # Erreurs, négociation du contenu et méthodes de DRF
+        self.assertEqual(self.client.get('/login/').status_code, 405)
+        response = self.client.post('/login/', '{', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('detail', response.json())
+        response = self.client.post('/login/', {'username': 'alice', 'password': 'x'}, HTTP_ACCEPT='text/html')
+        self.assertEqual(response['Content-Type'], 'text/html; charset=utf-8')
+
+        with override_settings(PASSWORD_HASHING_WORKERS=1, PASSWORD_HASHING_MAX_PENDING=0):
+            response = self.client.post('/login/', {'username': 'alice', 'password': 'x'})
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '1')
+
+    async def test_signup_and_login_under_asgi(self):
+        client = AsyncClient()
+        response = await client.post('/signup/', {'username': 'carol', 'email': 'carol@example.com',
+                                                  'password': 'motdepasse', 'password2': 'motdepasse'})
+        self.assertEqual(response.status_code, 201)
+        response = await client.post('/login/', {'username': 'carol', 'password': 'motdepasse'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_signup_other_actions_stay_synchronous(self):
+        User.objects.create(username='bob')
+        self.assertEqual(self.client.get('/signup/').status_code, 200)
+
+    @override_settings(PASSWORD_HASHING_WORKERS=1)
+    def test_pool(self):
+        self.assertTrue(hashing.run(lambda: threading.current_thread().name).startswith('password-hashing'))
+        with override_settings(PASSWORD_HASHING_MAX_PENDING=0):
+            with self.assertRaises(hashing.HashingBusy):
+                hashing.run(lambda: None)
@@ -1,88 +1,137 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
 from rest_framework import status, viewsets
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
+from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import get_user_model
-from rest_framework.views import APIView
+from django.contrib.auth.hashers import make_password
 
+from authentication import hashing
 from authentication.serializers import SignUpSerializer, LoginSerializer, UserSerializer
 
 User = get_user_model()
 
-class SignUpView(viewsets.ModelViewSet):
+
+class AsyncDispatchMixin:
+    """
+    Dispatch asynchrone pour les vues DRF (APIView et ViewSet) : les gestionnaires coroutines s'exécutent
+    dans la boucle d'évènements, les autres dans un thread (`sync_to_async`). L'authentification,
+    les permissions, la limitation de débit, la négociation du contenu et le format des erreurs
+    restent ceux de DRF. Sous WSGI, Django exécute la vue avec `async_to_sync`.
+    """
+
+    view_is_async = True
+
+    @classmethod
+    def as_view(cls, *args, **kwargs):
+        # Le routeur des ViewSet ne marque pas la vue : Django doit savoir qu'elle renvoie une coroutine
+        return markcoroutinefunction(super().as_view(*args, **kwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            # Authentification, permissions et limitation de débit peuvent lire la base
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            if iscoroutinefunction(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                response = await sync_to_async(handler)(request, *args, **kwargs)
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+class SignUpView(AsyncDispatchMixin, viewsets.ModelViewSet):
     """
     Vue pour l'inscription des utilisateurs.
+
+    Le mot de passe est haché dans le pool de `authentication.hashing` sans occuper le thread de la requête ;
+    les autres actions s'exécutent comme des vues synchrones.
     """
-    
+
     # Récupère tous les utilisateurs
     queryset = User.objects.all()
-    
+
     serializer_class = SignUpSerializer
-    
+
     # N'importe qui peut s'inscrire
     permission_classes = [AllowAny]
 
-    def create(self, request):
+    async def create(self, request):
         """
         Crée un nouvel utilisateur.
         """
-        
+
         # Initialise une instance de SignUpSerializer avec les données de la requête
         serializer = self.get_serializer(data=request.data)
-        
-        # Vérifie si les données sont valides
-        if serializer.is_valid(raise_exception=True):
-            
-            # Enregistre l'utilisateur
-            user = serializer.save()
 
-            # Crée un nouveau token de rafraîchissement pour l'utilisateur
-            refresh = RefreshToken.for_user(user)
-            
-            # Renvoie une réponse avec les données de l'utilisateur, un message de succès et les tokens
-            return Response({
-                'user': UserSerializer(user).data,
-                'message': "L'utilisateur a été créé avec succès.",
-                'tokens': {
-                    'refresh': str(refresh),
-                    'access': str(refresh.access_token),
-                }},
-                status=status.HTTP_201_CREATED)
+        # Vérifie si les données sont valides (l'unicité de l'email est vérifiée en base)
+        await sync_to_async(serializer.is_valid)(raise_exception=True)
 
-        # Si les données ne sont pas valides, renvoie une réponse avec les erreurs
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        # Hache le mot de passe dans le pool, puis enregistre l'utilisateur
+        password_hash = await hashing.run_async(make_password, serializer.validated_data['password'])
+        user = await sync_to_async(serializer.save)(password_hash=password_hash)
 
+        # Crée un nouveau token de rafraîchissement pour l'utilisateur
+        refresh = RefreshToken.for_user(user)
 
+        # Renvoie une réponse avec les données de l'utilisateur, un message de succès et les tokens
+        return Response({
+            'user': UserSerializer(user).data,
+            'message': "L'utilisateur a été créé avec succès.",
+            'tokens': {
+                'refresh': str(refresh),
+                'access': str(refresh.access_token),
+            }},
+            status=status.HTTP_201_CREATED)
 
 
-class LoginView(APIView):
+class LoginView(AsyncDispatchMixin, APIView):
     """
     Vue pour la connexion des utilisateurs.
+
+    La vérification du mot de passe (`LoginSerializer`, donc `authenticate`) s'exécute dans le pool
+    de `authentication.hashing` : sous ASGI (config/asgi.py), une rafale de connexions n'occupe
+    ni la boucle d'évènements ni le thread des vues synchrones. Pool saturé : 429 avec Retry-After.
     """
-    
+
     # Tout le monde peut se connecter
     permission_classes = [AllowAny]
 
-    def post(self, request):
+    async def post(self, request):
         """
         Connecter un utilisateur.
         """
-        
+
         # Initialise le serializer avec les données de la requête
         serializer = LoginSerializer(data=request.data, context={'request': request})
-        
-        # Vérifie si les données sont valides
-        serializer.is_valid(raise_exception=True)
-        
+
+        # Vérifie si les données sont valides, dans le pool de hachage
+        await hashing.run_async(serializer.is_valid, raise_exception=True)
+
         # Récupère l'utilisateur à partir des données validées
         user = serializer.validated_data['user']
 
         # Génère des tokens pour l'utilisateur
         refresh = RefreshToken.for_user(user)
-        
+
         # Renvoie une réponse avec les tokens
         return Response({
             "refresh": str(refresh),
             "access": str(refresh.access_token),
         })
-
@@ -13,4 +13,10 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Importé après la configuration de Django : le flux d'évènements (projects/sse.py) est servi
+# devant l'application de Django, qui reçoit toutes les autres requêtes.
+from projects.sse import EventStreamApplication  # noqa: E402
+
+application = EventStreamApplication(django_application)
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 from datetime import timedelta
 
@@ -50,6 +51,7 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "projects.replicas.ReplicaRoutingMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -78,14 +80,58 @@ WSGI_APPLICATION = "config.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# Profils de connexion SQLite (moteur config.sqlite, options de Django 5.1) :
+#   - "production" : journal WAL (les lectures ne bloquent plus les écritures ni l'inverse),
+#     synchronous=NORMAL (sûr en WAL, une synchronisation par point de contrôle au lieu d'une par transaction),
+#     attente de 5 s d'un verrou avant « database is locked », 256 Mo de fichier projeté en mémoire et 64 Mo
+#     de cache par connexion, transactions IMMEDIATE et connexions réutilisées pendant 10 minutes ;
+#   - "django" : la configuration par défaut de Django (journal d'annulation, une connexion par requête).
+# Comparer les deux avec `manage.py bench_sqlite`. Le profil "django" est celui par défaut : le profil
+# "production" passe le fichier en WAL (en-tête modifié), on l'active avec la variable d'environnement
+# SQLITE_PROFILE=production.
+SQLITE_PROFILES = {
+    "production": {
+        "CONN_MAX_AGE": 600,
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {
+            "init_command": (
+                "PRAGMA journal_mode=WAL;"
+                "PRAGMA synchronous=NORMAL;"
+                "PRAGMA busy_timeout=5000;"
+                "PRAGMA mmap_size=268435456;"
+                "PRAGMA cache_size=-65536;"
+            ),
+            "transaction_mode": "IMMEDIATE",
+        },
+    },
+    "django": {
+        "CONN_MAX_AGE": 0,
+        "OPTIONS": {},
+    },
+}
+SQLITE_PROFILE = os.environ.get("SQLITE_PROFILE", "django")
+
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
+        "ENGINE": "config.sqlite",
         "NAME": BASE_DIR / "db.sqlite3",
+        **SQLITE_PROFILES[SQLITE_PROFILE],
     }
 }
 
 
+# Réplicas en lecture (projects/replicas.py) : les requêtes en lecture seule des projets, problèmes,
+# commentaires et utilisateurs sont servies par l'un des alias de DATABASE_REPLICAS (copies de "default"
+# maintenues par la réplication) ; un utilisateur qui vient d'écrire lit la base principale pendant
+# REPLICA_STICKY_SECONDS secondes (marqueur dans le cache par défaut, qui doit alors être partagé entre
+# les processus : la vérification projects.E001 refuse la mémoire locale). Par exemple, avec une copie locale de la base :
+#   DATABASES["replica"] = {**DATABASES["default"], "NAME": BASE_DIR / "replica.sqlite3", "TEST": {"MIRROR": "default"}}
+#   DATABASE_REPLICAS = ["replica"]
+DATABASE_ROUTERS = ["projects.replicas.ReplicaRouter"]
+DATABASE_REPLICAS = []
+REPLICA_STICKY_SECONDS = 10
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -135,7 +181,7 @@ AUTH_USER_MODEL = 'authentication.User'
 REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
     'PAGE_SIZE': 100,
-    'DEFAULT_AUTHENTICATION_CLASSES': ('rest_framework_simplejwt.authentication.JWTAuthentication',)
+    'DEFAULT_AUTHENTICATION_CLASSES': ('authentication.authentication.CachedJWTAuthentication',)
 }
 
 
@@ -143,3 +189,83 @@ SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1000),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
 }
+
+# Cache des utilisateurs de CachedJWTAuthentication (propre à chaque processus) :
+# nombre maximal d'utilisateurs et durée en secondes (0 : lecture de la base à chaque requête).
+JWT_USER_CACHE_SIZE = 10000
+JWT_USER_CACHE_TIMEOUT = 60
+
+
+# Durée (en secondes) de mise en cache de l'appartenance aux projets de chaque utilisateur.
+# 0 : calculée une fois par requête seulement. Avec plusieurs processus, n'activer qu'avec
+# un cache partagé, sinon un contributeur retiré garde l'accès jusqu'à l'expiration.
+MEMBERSHIP_CACHE_TIMEOUT = 0
+
+
+# Cache de Django. La mémoire locale est propre à chaque processus : avec plusieurs processus,
+# utiliser un cache partagé (Redis, Memcached) ou `FileBasedCache` sur un même disque.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+
+# Cache des réponses des listes (projets, problèmes, utilisateurs d'un projet), par utilisateur.
+# RESPONSE_CACHE_TIMEOUT : durée en secondes, 0 pour désactiver. Les écritures l'invalident via les signaux.
+RESPONSE_CACHE_ALIAS = 'default'
+RESPONSE_CACHE_TIMEOUT = 0
+
+# Statistiques des projets (`/projects/<id>/stats/`, projects/stats.py), mises en cache pour chaque version
+# du projet pendant PROJECT_STATS_CACHE_TIMEOUT secondes : toute écriture sur le projet les fait recalculer.
+# PROJECT_STATS_TTL > 0 sert le dernier calcul pendant ce nombre de secondes même si le projet a changé
+# depuis (un projet très modifié n'est alors recalculé qu'une fois par période) ; 0 : toujours à jour.
+PROJECT_STATS_CACHE_TIMEOUT = 300
+PROJECT_STATS_TTL = 0
+
+
+# Fil d'activité (projects/activity.py) : 'read' calcule le fil à la lecture (une ligne par évènement),
+# 'write' copie chaque évènement dans le fil de chaque membre du projet. Sous SQLite, la lecture reste
+# rapide pour un membre de 1 000 projets (voir `manage.py bench_feed`). Un nouveau contributeur
+# reçoit les ACTIVITY_FEED_BACKFILL derniers évènements du projet en diffusion à l'écriture.
+ACTIVITY_FEED_FANOUT = 'read'
+ACTIVITY_FEED_BACKFILL = 100
+
+
+# Synchronisation incrémentale (`?since=`, projects/sync.py) : le curseur renvoyé recule de
+# SYNC_CURSOR_MARGIN secondes pour ne pas manquer les écritures validées pendant la lecture.
+SYNC_CURSOR_MARGIN = 5
+# Objets modifiés par page de synchronisation (`?limit=`, au plus SYNC_MAX_PAGE_SIZE).
+SYNC_PAGE_SIZE = 500
+SYNC_MAX_PAGE_SIZE = 1000
+
+
+# Flux d'évènements des projets (`/events/` sous ASGI, projects/sse.py). EVENT_BUS_BACKEND transporte les
+# évènements entre les processus : `LocalBackend` ne les remet qu'au processus qui les publie (un seul
+# processus ASGI), `UnixSocketBackend` à tous les processus de la machine, par des sockets Unix créées
+# dans EVENT_BUS_SOCKET_DIR (un répertoire du dossier temporaire par défaut). Chaque flux garde au plus
+# SSE_QUEUE_SIZE évènements en attente, et reçoit un commentaire toutes les SSE_KEEPALIVE secondes.
+EVENT_BUS_BACKEND = 'projects.events.LocalBackend'
+EVENT_BUS_SOCKET_DIR = None
+SSE_QUEUE_SIZE = 100
+SSE_KEEPALIVE = 15
+
+
+# Hachage des mots de passe : coût PBKDF2 (nombre d'itérations) par profil. Le profil "rapide"
+# n'est destiné qu'au développement et aux tests, jamais à la production.
+PASSWORD_HASHERS = [
+    'authentication.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+PASSWORD_HASHING_PROFILES = {
+    'production': 600000,
+    'rapide': 1000,
+}
+PASSWORD_HASHING_PROFILE = 'production'
+
+# Pool de threads du hachage (inscription, connexion) : nombre de threads (0 : dans le thread
+# de la requête) et nombre maximal de hachages en attente avant de répondre 429.
+PASSWORD_HASHING_WORKERS = 2
+PASSWORD_HASHING_MAX_PENDING = 64
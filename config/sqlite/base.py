@@ -0,0 +1,45 @@
+"""
+Moteur SQLite de Django avec les options de connexion de Django 5.1, pour Django 4.2 :
+
+  - `init_command` : instructions exécutées à l'ouverture de chaque connexion, séparées par « ; »
+    (les PRAGMA du profil de production : WAL, synchronous, busy_timeout, mmap_size, cache_size) ;
+  - `transaction_mode` : mode des transactions de `atomic()` ('DEFERRED', 'IMMEDIATE' ou 'EXCLUSIVE').
+
+Sans ces options, le moteur se comporte comme celui de Django. Au passage à Django 5.1, il suffit de revenir
+à ENGINE = 'django.db.backends.sqlite3' : les options ont le même nom et le même sens.
+"""
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+TRANSACTION_MODES = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_connection_params(self):
+        # Ces options ne sont pas des paramètres de sqlite3.connect()
+        options = self.settings_dict['OPTIONS']
+        self.init_command = options.get('init_command')
+        self.transaction_mode = (options.get('transaction_mode') or 'DEFERRED').upper()
+        if self.transaction_mode not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(f"transaction_mode doit valoir l'un de {', '.join(TRANSACTION_MODES)}.")
+        kwargs = super().get_connection_params()
+        kwargs.pop('init_command', None)
+        kwargs.pop('transaction_mode', None)
+        return kwargs
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        if self.init_command:
+            for statement in self.init_command.split(';'):
+                if statement.strip():
+                    conn.execute(statement)
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        """
+        En mode 'IMMEDIATE', une transaction prend le verrou d'écriture dès son début : deux transactions
+        qui lisent puis écrivent ne peuvent plus s'interbloquer (erreur « database is locked » immédiate,
+        sans attendre `busy_timeout`), la seconde attend que la première se termine.
+        """
+        self.cursor().execute(f'BEGIN {self.transaction_mode}')
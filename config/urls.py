@@ -5,7 +5,8 @@ from django.urls import path, include
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from rest_framework_nested import routers
 
-from projects.views import ProjectViewSet, IssueViewSet, CommentViewSet, UserListView, ProjectUserViewSet
+from projects import async_views
+from projects.views import ProjectViewSet, IssueViewSet, CommentViewSet, UserListView, ProjectUserViewSet, ResponseCacheStatsView, FeedView
 
 
 # On crée une instance de DefaultRouter
@@ -69,6 +70,20 @@ urlpatterns = [
     # Route pour lister tous les utilisateurs authentifiés
     # La vue UserListView sera accessible via l'URL /users_list
     path('users/', UserListView.as_view(), name='user_list'),
+
+    # Fil d'activité de l'utilisateur connecté, sur tous ses projets
+    path('feed/', FeedView.as_view(), name='feed'),
+
+    # Variantes asynchrones des routes de lecture, pour un serveur ASGI (config/asgi.py)
+    path('async/projects/', async_views.ProjectListView.as_view(), name='async-project-list'),
+    path('async/projects/<int:pk>/', async_views.ProjectDetailView.as_view(), name='async-project-detail'),
+    path('async/projects/<int:project_pk>/issues/', async_views.IssueListView.as_view(), name='async-issue-list'),
+    path('async/projects/<int:project_pk>/issues/<int:issue_pk>/comments/', async_views.CommentListView.as_view(),
+         name='async-comment-list'),
+    path('async/users/', async_views.UserListView.as_view(), name='async-user-list'),
+
+    # Statistiques du cache des réponses (administrateurs uniquement)
+    path('cache/stats/', ResponseCacheStatsView.as_view(), name='response_cache_stats'),
 ]
 
 
@@ -0,0 +1,130 @@
+"""
+Fil d'activité : ce qui s'est passé récemment dans tous les projets d'un utilisateur.
+
+Chaque évènement est enregistré une fois dans `Activity`. Le réglage `ACTIVITY_FEED_FANOUT` choisit
+comment le fil est construit :
+  - 'write' (diffusion à l'écriture) : chaque évènement est aussi copié dans `FeedEntry` pour chaque membre
+    du projet. Lire le fil est un parcours de l'index (user, activity), quel que soit le nombre de projets
+    de l'utilisateur ; en contrepartie, un évènement coûte une ligne par membre du projet.
+  - 'read' (diffusion à la lecture) : le fil est lu dans `Activity` à partir des projets visibles.
+    Un évènement ne coûte qu'une ligne ; la lecture dépend du nombre de projets de l'utilisateur.
+
+Les évènements sont enregistrés dans les deux cas : on peut passer de 'write' à 'read' à tout moment.
+Dans l'autre sens, les fils ne contiennent que les évènements diffusés depuis le changement
+(et les `ACTIVITY_FEED_BACKFILL` derniers évènements des projets rejoints ensuite).
+"""
+from django.conf import settings
+
+from .membership import project_member_ids, visible_project_ids
+from .models import Activity, FeedEntry
+
+# Taille des paquets d'insertion des évènements et des entrées des fils
+BATCH_SIZE = 1000
+
+
+def fanout_on_write():
+    return getattr(settings, 'ACTIVITY_FEED_FANOUT', 'read') == 'write'
+
+
+def record(project_id, activities):
+    """
+    Enregistre des évènements (non sauvegardés) d'un même projet et, en diffusion à l'écriture,
+    les copie dans le fil de chacun de ses membres : trois requêtes, quel que soit le nombre d'évènements.
+    """
+    if not activities:
+        return
+    Activity.objects.bulk_create(activities, batch_size=BATCH_SIZE)
+    if fanout_on_write():
+        members = project_member_ids(project_id)
+        FeedEntry.objects.bulk_create(
+            (FeedEntry(user_id=user_id, activity_id=activity.pk) for activity in activities for user_id in members),
+            batch_size=BATCH_SIZE,
+        )
+
+
+def backfill(project_id, user_ids):
+    """
+    Copie les derniers évènements du projet dans le fil de nouveaux membres.
+    """
+    limit = getattr(settings, 'ACTIVITY_FEED_BACKFILL', 100)
+    recent = Activity.objects.filter(project_id=project_id).order_by('-id').values_list('id', flat=True)[:limit]
+    FeedEntry.objects.bulk_create(
+        [FeedEntry(user_id=user_id, activity_id=activity_id) for activity_id in recent for user_id in user_ids],
+        batch_size=BATCH_SIZE, ignore_conflicts=True,
+    )
+
+
+def issue_activity(issue):
+    return Activity(project_id=issue.project_id, actor_id=issue.author_id, verb=Activity.ISSUE_CREATED,
+                    data={'issue': issue.pk, 'title': issue.title})
+
+
+def status_activity(project_id, issue_id, title, old_status, status, actor_id):
+    return Activity(project_id=project_id, actor_id=actor_id, verb=Activity.ISSUE_STATUS_CHANGED,
+                    data={'issue': issue_id, 'title': title, 'old_status': old_status, 'status': status})
+
+
+def issues_created(project_id, issues):
+    record(project_id, [issue_activity(issue) for issue in issues])
+
+
+def issue_status_changed(issue, old_status, actor_id):
+    record(issue.project_id,
+           [status_activity(issue.project_id, issue.pk, issue.title, old_status, issue.status, actor_id)])
+
+
+def statuses_changed(project_id, issues, status, actor_id):
+    """
+    Changement de statut en masse : `issues` est une liste de (identifiant, titre, ancien statut).
+    """
+    record(project_id, [status_activity(project_id, issue_id, title, old_status, status, actor_id)
+                        for issue_id, title, old_status in issues if old_status != status])
+
+
+def comment_activity(comment, project_id):
+    return Activity(project_id=project_id, actor_id=comment.author_id, verb=Activity.COMMENT_CREATED,
+                    data={'issue': comment.issue_id, 'comment': comment.pk, 'excerpt': comment.description[:200]})
+
+
+def comment_created(comment, project_id):
+    record(project_id, [comment_activity(comment, project_id)])
+
+
+def contributors_added(project_id, user_ids):
+    """
+    Annonce l'arrivée des contributeurs à tous les membres et, en diffusion à l'écriture,
+    leur donne l'historique récent du projet.
+    """
+    record(project_id, [Activity(project_id=project_id, actor_id=user_id, verb=Activity.CONTRIBUTOR_ADDED)
+                        for user_id in user_ids])
+    if fanout_on_write() and user_ids:
+        backfill(project_id, user_ids)
+
+
+def contributors_removed(project_id, user_ids):
+    """
+    Annonce le départ des contributeurs aux membres restants et retire le projet de leur fil.
+    """
+    record(project_id, [Activity(project_id=project_id, actor_id=user_id, verb=Activity.CONTRIBUTOR_REMOVED)
+                        for user_id in user_ids])
+    FeedEntry.objects.filter(user_id__in=user_ids, activity__project_id=project_id).delete()
+
+
+def feed_queryset(user):
+    """
+    Les clés du fil de l'utilisateur : des `FeedEntry` en diffusion à l'écriture, des `Activity` en diffusion
+    à la lecture (voir `FeedPagination` pour le tri). Seuls les identifiants sont lus : le tri se fait
+    sur l'index (user, activity) ou (project, id), et les évènements de la page sont chargés par `load_page`.
+    """
+    if fanout_on_write():
+        return FeedEntry.objects.filter(user=user).only('activity_id')
+    return Activity.objects.filter(project__in=visible_project_ids(user)).only('id')
+
+
+def load_page(page):
+    """
+    Charge en une requête les évènements d'une page de `feed_queryset`, dans l'ordre de la page.
+    """
+    ids = [item.activity_id if isinstance(item, FeedEntry) else item.pk for item in page]
+    activities = Activity.objects.select_related('actor').in_bulk(ids)
+    return [activities[activity_id] for activity_id in ids if activity_id in activities]
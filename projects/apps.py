@@ -1,6 +1,20 @@
 from django.apps import AppConfig
+from django.core import checks
+from django.db.models.signals import post_migrate
 
 
 class ProjectsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "projects"
+
+    def ready(self):
+        # Enregistre les récepteurs de signaux (invalidation des caches)
+        from . import signals  # noqa: F401
+
+        # Recrée les triggers de la recherche plein texte si une migration a reconstruit leur table
+        from .search import install_triggers
+        post_migrate.connect(install_triggers, sender=self)
+
+        # Les réplicas exigent un cache partagé entre les processus
+        from .replicas import check_shared_cache
+        checks.register(check_shared_cache, checks.Tags.caches, checks.Tags.database)
@@ -0,0 +1,157 @@
+"""
+Variantes asynchrones des routes de lecture, servies sous `async/` (voir config/urls.py).
+
+Sous ASGI (config/asgi.py), une requête n'occupe un thread que le temps de ses requêtes SQL :
+l'authentification, l'attente du client et la sérialisation se font dans la boucle d'évènements.
+Les querysets et les sérialiseurs sont ceux des vues synchrones ; seule la pagination limit/offset
+est disponible (pas de mode curseur, d'ETag ni de cache des réponses).
+"""
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import prefetch_related_objects
+from django.http import Http404, HttpResponse
+from django.views import View
+from rest_framework import exceptions
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from authentication.authentication import CachedJWTAuthentication
+
+from .serializers import ProjectSerializer, ProjectDetailSerializer, IssueSerializer, CommentSerializer, UserSerializer
+from .views import project_queryset, issue_queryset, comment_queryset
+
+
+async def afetch(queryset, start=None, stop=None):
+    """
+    Évalue une tranche de la queryset avec l'itération asynchrone.
+
+    Django 4.2 ne sait pas faire de `prefetch_related()` pendant l'itération asynchrone :
+    les préchargements de la queryset sont appliqués ensuite, en une seule fois.
+    """
+    lookups = queryset._prefetch_related_lookups
+    objects = [obj async for obj in queryset.prefetch_related(None)[start:stop]]
+    if objects and lookups:
+        await sync_to_async(prefetch_related_objects)(objects, *lookups)
+    return objects
+
+
+def ordered(queryset, *ordering):
+    # Les résultats d'une recherche sont déjà triés par pertinence
+    return queryset if queryset.ordered else queryset.order_by(*ordering)
+
+
+def user_queryset(request):
+    return get_user_model().objects.all()
+
+
+class AsyncReadView(View):
+    """
+    Vue de lecture asynchrone : authentification JWT, appel de `aget_data()` et rendu JSON comme DRF.
+    Par défaut, `aget_data()` renvoie une page de la queryset de `queryset_function`, triée par `ordering`.
+    """
+
+    http_method_names = ['get', 'head', 'options']
+    renderer = JSONRenderer()
+    # Obligatoires (attributs de classe ou arguments de as_view) : la fonction qui renvoie la queryset
+    # à partir de la requête et des arguments d'URL (celle de la vue synchrone), et le sérialiseur
+    queryset_function = None
+    serializer_class = None
+    # Tri des listes, sauf recherche (déjà triée par pertinence)
+    ordering = ('created_time', 'id')
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        for name in ('queryset_function', 'serializer_class'):
+            if initkwargs.get(name, getattr(cls, name)) is None:
+                raise ImproperlyConfigured(f'{cls.__name__} doit définir {name}.')
+        return super().as_view(**initkwargs)
+
+    async def get(self, request, **kwargs):
+        try:
+            request = await self.authenticate(request)
+            data = await self.aget_data(request, **kwargs)
+        except Http404:
+            return self.render({'detail': exceptions.NotFound.default_detail}, 404)
+        except exceptions.APIException as exc:
+            # Même corps d'erreur que le gestionnaire d'exceptions de DRF
+            detail = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+            response = self.render(detail, exc.status_code)
+            if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+                response.status_code = 401
+                response['WWW-Authenticate'] = 'Bearer realm="api"'
+            return response
+        return self.render(data)
+
+    async def authenticate(self, request):
+        """
+        Renvoie la requête DRF de l'utilisateur authentifié par son jeton (sans requête SQL si
+        l'utilisateur est dans le cache de `CachedJWTAuthentication`).
+        """
+        result = await CachedJWTAuthentication().aauthenticate(request)
+        if result is None:
+            raise exceptions.NotAuthenticated()
+        drf_request = Request(request)
+        drf_request.user = result[0]
+        return drf_request
+
+    def render(self, data, status=200):
+        return HttpResponse(self.renderer.render(data), status=status, content_type='application/json')
+
+    def get_serializer_context(self, request):
+        return {'request': request, 'format': None, 'view': self}
+
+    async def paginate(self, request, queryset, serializer_class):
+        """
+        Pagination limit/offset, avec la même réponse que `LimitOffsetPagination`.
+        """
+        paginator = LimitOffsetPagination()
+        paginator.request = request
+        paginator.limit = paginator.get_limit(request)
+        paginator.offset = paginator.get_offset(request)
+        paginator.count = await queryset.acount()
+        page = []
+        if paginator.count > paginator.offset:
+            page = await afetch(queryset, paginator.offset, paginator.offset + paginator.limit)
+        serializer = serializer_class(page, many=True, context=self.get_serializer_context(request))
+        return paginator.get_paginated_response(serializer.data).data
+
+    async def aget_data(self, request, **kwargs):
+        queryset = ordered(self.queryset_function(request, **kwargs), *self.ordering)
+        return await self.paginate(request, queryset, self.serializer_class)
+
+
+class ProjectListView(AsyncReadView):
+    queryset_function = staticmethod(project_queryset)
+    serializer_class = ProjectSerializer
+    ordering = ('id',)
+
+
+class ProjectDetailView(AsyncReadView):
+    queryset_function = staticmethod(partial(project_queryset, detail=True))
+    serializer_class = ProjectDetailSerializer
+
+    async def aget_data(self, request, pk):
+        projects = await afetch(self.queryset_function(request).filter(pk=pk))
+        if not projects:
+            raise Http404
+        return self.serializer_class(projects[0], context=self.get_serializer_context(request)).data
+
+
+class IssueListView(AsyncReadView):
+    queryset_function = staticmethod(issue_queryset)
+    serializer_class = IssueSerializer
+
+
+class CommentListView(AsyncReadView):
+    queryset_function = staticmethod(comment_queryset)
+    serializer_class = CommentSerializer
+
+
+class UserListView(AsyncReadView):
+    queryset_function = staticmethod(user_queryset)
+    serializer_class = UserSerializer
+    ordering = ('id',)
@@ -0,0 +1,64 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response, quote_etag
+
+from .membership import visible_to
+from .models import Project
+
+
+def compute_etag(request, versions):
+    """
+    ETag fort : empreinte de l'utilisateur, de l'URL complète (filtres, pagination, ?fields=),
+    du format de rendu et des versions des projets concernés.
+    """
+    digest = hashlib.sha256()
+    for part in (request.user.id, request.get_full_path(), request.accepted_renderer.format, versions):
+        digest.update(str(part).encode())
+        digest.update(b'\0')
+    return quote_etag(digest.hexdigest()[:32])
+
+
+def visible_project_version(user, project_pk):
+    """
+    Version d'un projet visible par l'utilisateur, en une requête. None s'il n'existe pas ou n'est pas visible.
+    """
+    try:
+        return Project.objects.filter(visible_to(user), pk=project_pk).values_list('version', flat=True).first()
+    except (TypeError, ValueError):
+        return None
+
+
+class ConditionalGetMixin:
+    """
+    Requêtes conditionnelles (`If-None-Match`) pour les actions `list` et `retrieve`.
+
+    L'ETag est calculé à partir des versions des projets (voir `Project.version`) avant d'exécuter
+    la queryset : si le client a déjà la bonne version, la réponse est un `304 Not Modified`
+    obtenu après une seule lecture, sans toucher aux sérialiseurs.
+    """
+
+    def get_etag_versions(self):
+        """
+        Renvoie ce qui identifie l'état des données de la réponse (versions des projets),
+        ou None si aucun ETag ne doit être calculé.
+        """
+        return None
+
+    def conditional(self, handler, request, *args, **kwargs):
+        versions = self.get_etag_versions()
+        if versions is None:
+            return handler(request, *args, **kwargs)
+
+        etag = compute_etag(request, versions)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(super().retrieve, request, *args, **kwargs)
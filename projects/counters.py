@@ -0,0 +1,86 @@
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from .models import Project, Issue, Comment
+
+
+def shift(field, delta):
+    """
+    Ajoute `delta` à un compteur sans passer sous zéro (les écritures en masse ne passent pas par les signaux).
+    """
+    return Greatest(F(field) + delta, 0)
+
+
+def touch_project(project_id, issues=0, open_issues=0):
+    """
+    Incrémente la version d'un projet (voir projects/conditional.py) et, si besoin, lui ajoute des problèmes
+    (ou en retire, si négatif), en une seule requête.
+    """
+    changes = {'version': F('version') + 1, 'updated_time': timezone.now()}
+    if issues:
+        changes['issue_count'] = shift('issue_count', issues)
+    if open_issues:
+        changes['open_issue_count'] = shift('open_issue_count', open_issues)
+    Project.objects.filter(pk=project_id).update(**changes)
+
+
+def touch_issue_project(issue_id):
+    """
+    Incrémente la version du projet d'un problème, sans charger le problème.
+    """
+    Project.objects.filter(issues=issue_id).update(version=F('version') + 1, updated_time=timezone.now())
+
+
+def issue_created(issue):
+    """
+    Incrémente les compteurs du projet d'un nouveau problème.
+    """
+    touch_project(issue.project_id, 1, int(issue.is_open))
+
+
+def issue_updated(issue, old_status):
+    """
+    Met à jour le nombre de problèmes ouverts quand un problème est ouvert ou fermé.
+    `old_status` vaut None si le statut précédent est inconnu.
+    """
+    if old_status is None:
+        touch_project(issue.project_id)
+    else:
+        touch_project(issue.project_id, open_issues=int(issue.is_open) - int(old_status in Issue.OPEN_STATUSES))
+
+
+def issue_deleted(issue):
+    """
+    Décrémente les compteurs du projet d'un problème supprimé.
+    """
+    touch_project(issue.project_id, -1, -int(issue.is_open))
+
+
+def comment_created(comment):
+    Issue.objects.filter(pk=comment.issue_id).update(comment_count=shift('comment_count', 1), updated_time=timezone.now())
+    touch_issue_project(comment.issue_id)
+
+
+def comment_deleted(comment):
+    Issue.objects.filter(pk=comment.issue_id).update(comment_count=shift('comment_count', -1), updated_time=timezone.now())
+    touch_issue_project(comment.issue_id)
+
+
+def count_subquery(queryset, field):
+    """
+    Sous-requête qui compte les lignes de `queryset` rattachées à la ligne courante par `field`.
+    """
+    counts = queryset.filter(**{field: OuterRef('pk')}).values(field).annotate(total=Count('pk'))
+    return Coalesce(Subquery(counts.values('total')), Value(0))
+
+
+def recompute_counters():
+    """
+    Recalcule tous les compteurs en deux requêtes UPDATE.
+    """
+    Project.objects.update(
+        issue_count=count_subquery(Issue.objects.all(), 'project'),
+        open_issue_count=count_subquery(Issue.objects.filter(status__in=Issue.OPEN_STATUSES), 'project'),
+    )
+    Issue.objects.update(comment_count=count_subquery(Comment.objects.all(), 'issue'))
@@ -0,0 +1,298 @@
+"""
+Bus d'évènements des projets (création, modification et suppression des problèmes et commentaires),
+diffusés aux flux Server-Sent Events (voir projects/sse.py).
+
+Les évènements sont publiés après la validation de la transaction, sous forme de messages JSON,
+par un transport (`EVENT_BUS_BACKEND`) :
+  - `LocalBackend` (par défaut) les remet dans le processus qui les publie ;
+  - `UnixSocketBackend` les remet à tous les processus de la machine (sockets Unix, sans service externe) ;
+  - un transport inter-processus entre machines (Redis pub/sub, LISTEN/NOTIFY de PostgreSQL...) implémente la même
+    interface : `publish(message)` envoie le message à tous les processus, et `start(deliver)` appelle
+    `deliver(message)` dans chacun d'eux pour chaque message reçu, depuis n'importe quel thread.
+
+Dans chaque processus, le bus numérote l'évènement, l'encode une seule fois en JSON et le remet aux abonnés
+des projets concernés, dans la boucle d'évènements de chacun (un seul réveil par boucle, quel que soit
+le nombre d'abonnés). Les files des abonnés contiennent des couples (évènement, JSON).
+"""
+import asyncio
+import itertools
+import json
+import os
+import socket
+import tempfile
+import threading
+from collections import defaultdict
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+# Évènements qui donnent à un utilisateur (`user`) l'accès au projet
+MEMBER_ADDED = ('project.created', 'contributor.added')
+
+
+class LocalBackend:
+    """
+    Transport dans le processus : chaque message est remis immédiatement au bus local.
+    """
+
+    def start(self, deliver):
+        self.deliver = deliver
+
+    def publish(self, message):
+        self.deliver(message)
+
+
+class UnixSocketBackend:
+    """
+    Transport entre les processus d'une même machine : chaque processus lie une socket Unix datagramme
+    `<pid>.sock` dans `EVENT_BUS_SOCKET_DIR`, lue par un thread, et `publish` envoie le message à toutes
+    les sockets du répertoire (y compris la sienne). Les sockets des processus terminés sont supprimées à l'envoi.
+
+    L'envoi ne bloque pas : un processus dont la file de réception est pleine perd le message, comme
+    un abonné qui déborde (ses clients se resynchronisent).
+    """
+
+    max_message_size = 64 * 1024
+
+    def __init__(self, directory=None):
+        self.directory = directory or getattr(settings, 'EVENT_BUS_SOCKET_DIR', None) or os.path.join(
+            tempfile.gettempdir(), 'softdesk-events')
+
+    def start(self, deliver):
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        self.path = os.path.join(self.directory, f'{os.getpid()}.sock')
+        # Socket laissée par un processus terminé qui avait le même pid
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self.receiver = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.receiver.bind(self.path)
+        self.sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.sender.setblocking(False)
+        threading.Thread(target=self.receive, args=(deliver,), name='event-bus', daemon=True).start()
+
+    def receive(self, deliver):
+        while True:
+            message = self.receiver.recv(self.max_message_size)
+            try:
+                deliver(message.decode())
+            except Exception:
+                # Un message illisible ne doit pas arrêter la réception
+                continue
+
+    def publish(self, message):
+        data = message.encode()
+        for name in os.listdir(self.directory):
+            if not name.endswith('.sock'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                self.sender.sendto(data, path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                # Plus personne ne lit cette socket : le processus est terminé
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+            except BlockingIOError:
+                pass
+
+
+class Subscription:
+    """
+    Abonnement d'un flux aux évènements de projets. Les évènements sont mis dans une file bornée :
+    un abonné trop lent est marqué `overflowed` et son flux doit être fermé (le client se resynchronise).
+    Avec `project_filter`, l'abonnement se limite à ce projet (les projets rejoints ensuite sont ignorés).
+    """
+
+    def __init__(self, bus, user_id, project_ids, loop, maxsize, project_filter=None):
+        self.bus = bus
+        self.user_id = user_id
+        self.project_filter = project_filter
+        self.project_ids = set(project_ids)
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize)
+        self.overflowed = False
+
+    def put(self, delivery):
+        """
+        Ajoute l'évènement à la file (dans la boucle de l'abonné).
+        """
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(delivery)
+        except asyncio.QueueFull:
+            # La file pleine n'a pas de lecteur en attente : le prochain `get` verra le débordement
+            self.overflowed = True
+            self.bus.unsubscribe(self)
+
+    async def get(self):
+        """
+        Le prochain couple (évènement, JSON), None pour un signe de vie (voir `Bus.keepalive`)
+        ou si l'abonné a débordé.
+        """
+        if self.overflowed:
+            return None
+        return await self.queue.get()
+
+
+class Bus:
+    """
+    Répartit les évènements reçus du transport entre les abonnés, indexés par projet.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.lock = threading.Lock()
+        self.by_project = defaultdict(set)
+        self.by_user = defaultdict(set)
+        self.ids = itertools.count(1)
+        backend.start(self.dispatch)
+
+    def subscribe(self, user_id, project_ids, loop=None, project_filter=None):
+        subscription = Subscription(self, user_id, project_ids, loop or asyncio.get_running_loop(),
+                                    getattr(settings, 'SSE_QUEUE_SIZE', 100), project_filter)
+        with self.lock:
+            for project_id in subscription.project_ids:
+                self.by_project[project_id].add(subscription)
+            self.by_user[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            for project_id in subscription.project_ids:
+                subscribers = self.by_project.get(project_id)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self.by_project[project_id]
+            subscribers = self.by_user.get(subscription.user_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self.by_user[subscription.user_id]
+
+    def subscriber_count(self):
+        with self.lock:
+            return sum(len(subscribers) for subscribers in self.by_user.values())
+
+    def publish(self, event):
+        self.backend.publish(json.dumps(event))
+
+    def keepalive(self, loop):
+        """
+        Met un signe de vie (None) dans la file des abonnés inactifs de la boucle (appelée dans la boucle).
+        Un seul minuteur par boucle plutôt qu'un par abonné : renvoie le nombre d'abonnés de la boucle.
+        """
+        with self.lock:
+            subscriptions = [subscription for subscribers in self.by_user.values()
+                             for subscription in subscribers if subscription.loop is loop]
+        for subscription in subscriptions:
+            if subscription.queue.empty():
+                subscription.put(None)
+        return len(subscriptions)
+
+    def add_project(self, user_id, project_id):
+        for subscription in self.by_user.get(user_id, ()):
+            if subscription.project_filter not in (None, project_id):
+                continue
+            subscription.project_ids.add(project_id)
+            self.by_project[project_id].add(subscription)
+
+    def remove_project(self, subscriptions, project_id):
+        for subscription in subscriptions:
+            subscription.project_ids.discard(project_id)
+        subscribers = self.by_project.get(project_id)
+        if subscribers is not None:
+            subscribers.difference_update(subscriptions)
+            if not subscribers:
+                del self.by_project[project_id]
+
+    def dispatch(self, message):
+        """
+        Remet un message du transport aux abonnés de son projet (appelée depuis n'importe quel thread).
+
+        Les évènements d'appartenance mettent aussi les abonnements à jour : un utilisateur ajouté au projet
+        (ou son auteur, à la création) reçoit ses évènements dès celui-ci ; un contributeur retiré reçoit
+        encore l'annonce de son retrait, puis plus rien du projet.
+        """
+        event = json.loads(message)
+        event['id'] = next(self.ids)
+        delivery = (event, json.dumps(event))
+        project_id = event['project']
+        with self.lock:
+            if event['type'] in MEMBER_ADDED:
+                self.add_project(event['user'], project_id)
+            subscribers = list(self.by_project.get(project_id, ()))
+            if event['type'] == 'contributor.removed':
+                self.remove_project(list(self.by_user.get(event['user'], ())), project_id)
+            elif event['type'] == 'project.deleted':
+                self.remove_project(subscribers, project_id)
+
+        by_loop = defaultdict(list)
+        for subscription in subscribers:
+            by_loop[subscription.loop].append(subscription)
+        for loop, group in by_loop.items():
+            try:
+                loop.call_soon_threadsafe(deliver, group, delivery)
+            except RuntimeError:
+                # Boucle fermée : ses abonnés ne liront plus rien
+                for subscription in group:
+                    self.unsubscribe(subscription)
+
+
+def deliver(subscriptions, delivery):
+    for subscription in subscriptions:
+        subscription.put(delivery)
+
+
+_bus = None
+_bus_lock = threading.Lock()
+
+
+def get_bus():
+    """
+    Le bus du processus, créé au premier usage avec le transport `EVENT_BUS_BACKEND`.
+    """
+    global _bus
+    with _bus_lock:
+        if _bus is None:
+            backend = import_string(getattr(settings, 'EVENT_BUS_BACKEND', 'projects.events.LocalBackend'))()
+            _bus = Bus(backend)
+        return _bus
+
+
+def publish(events):
+    bus = get_bus()
+    for event in events:
+        bus.publish(event)
+
+
+def publish_on_commit(*events):
+    """
+    Publie les évènements après la validation de la transaction en cours (immédiatement hors transaction).
+    Une erreur du transport est journalisée sans affecter l'écriture, déjà validée.
+    """
+    if events:
+        transaction.on_commit(partial(publish, events), robust=True)
+
+
+def issue_event(kind, issue):
+    event = {'type': f'issue.{kind}', 'project': issue.project_id, 'issue': issue.pk}
+    if kind != 'deleted':
+        event['data'] = {'title': issue.title, 'status': issue.status, 'priority': issue.priority, 'tag': issue.tag}
+    return event
+
+
+def comment_event(kind, comment, project_id):
+    return {'type': f'comment.{kind}', 'project': project_id, 'issue': comment.issue_id, 'comment': comment.pk}
+
+
+def project_event(kind, project):
+    return {'type': f'project.{kind}', 'project': project.pk, 'user': project.author_id}
+
+
+def contributor_event(kind, project_id, user_id):
+    return {'type': f'contributor.{kind}', 'project': project_id, 'user': user_id}
@@ -0,0 +1,68 @@
+import itertools
+import json
+
+from asgiref.sync import sync_to_async
+from rest_framework.utils.encoders import JSONEncoder
+
+from .models import Contributor, Issue, Comment
+
+# Nombre de lignes lues par requête : la mémoire utilisée ne dépend pas de la taille du projet.
+EXPORT_CHUNK_SIZE = 2000
+
+ISSUE_FIELDS = ('id', 'title', 'description', 'priority', 'tag', 'status', 'author_id', 'created_time', 'comment_count')
+COMMENT_FIELDS = ('id', 'issue_id', 'description', 'author_id', 'created_time')
+
+
+def to_line(kind, values):
+    """
+    Une ligne NDJSON : un objet JSON suivi d'un retour à la ligne.
+    """
+    return json.dumps({'kind': kind, **values}, cls=JSONEncoder, ensure_ascii=False) + '\n'
+
+
+def export_project_lines(project):
+    """
+    Génère l'export NDJSON d'un projet : le projet, ses contributeurs, ses problèmes puis ses commentaires.
+
+    Les lignes sont lues par paquets avec `iterator()` sous forme de dictionnaires (`values()`),
+    sans construire d'instances de modèles ni de liste complète en mémoire.
+    """
+    yield to_line('project', {
+        'id': project.id,
+        'title': project.title,
+        'description': project.description,
+        'type': project.type,
+        'author_id': project.author_id,
+        'issue_count': project.issue_count,
+        'open_issue_count': project.open_issue_count,
+    })
+
+    contributors = Contributor.objects.filter(project=project).values('user_id').order_by('id')
+    for values in contributors.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield to_line('contributor', values)
+
+    issues = Issue.objects.filter(project=project).values(*ISSUE_FIELDS).order_by('created_time', 'id')
+    for values in issues.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield to_line('issue', values)
+
+    comments = Comment.objects.filter(issue__project=project).values(*COMMENT_FIELDS).order_by('issue_id', 'created_time')
+    for values in comments.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield to_line('comment', values)
+
+
+async def aiter_lines(lines, size=EXPORT_CHUNK_SIZE):
+    """
+    Parcourt le générateur `lines` depuis la boucle d'évènements (ASGI), par paquets de `size` lignes lus
+    dans le thread des vues synchrones (`sync_to_async`) : la boucle n'attend pas les requêtes SQL
+    et la mémoire reste bornée par un paquet.
+
+    Avec un générateur synchrone, Django 4.2 lirait toute la réponse (`sync_to_async(list)`) avant de l'envoyer.
+    """
+    read = sync_to_async(lambda: ''.join(itertools.islice(lines, size)))
+    try:
+        # Une ligne n'est jamais vide : un paquet vide signale la fin du générateur
+        while chunk := await read():
+            yield chunk
+    finally:
+        # Ferme le curseur de `iterator()` dans le thread qui l'a ouvert, même si le client s'est déconnecté
+        await sync_to_async(lines.close)()
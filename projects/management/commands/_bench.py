@@ -0,0 +1,57 @@
+"""
+Outils communs aux commandes de mesure de performances (bench_*).
+Les données sont générées dans une transaction que la commande annule à la fin.
+"""
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from projects.models import Project, Issue, Comment
+from projects.counters import recompute_counters
+
+
+def create_user(prefix='bench'):
+    return get_user_model().objects.create(username=f'{prefix}-{time.time_ns()}')
+
+
+def seed_project(author, issues, comments_per_issue, batch_size=5000):
+    """
+    Crée un projet avec `issues` problèmes de `comments_per_issue` commentaires chacun.
+    """
+    project = Project.objects.create(author=author, title='Projet de mesure', description='D' * 200, type='WEB')
+    Issue.objects.bulk_create(
+        (Issue(title=f'Problème {i}', description='D' * 500, priority='MOYEN', tag='BUG', status='A_FAIRE',
+               project=project, author=author) for i in range(issues)),
+        batch_size=batch_size,
+    )
+    issue_ids = project.issues.values_list('id', flat=True)
+    Comment.objects.bulk_create(
+        (Comment(description='C' * 300, author=author, issue_id=issue_id)
+         for issue_id in issue_ids.iterator() for _ in range(comments_per_issue)),
+        batch_size=batch_size,
+    )
+    recompute_counters()
+    return project
+
+
+def api_client(user):
+    """
+    Client de test authentifié, utilisable hors des tests (hôte autorisé en DEBUG).
+    """
+    client = APIClient(SERVER_NAME='localhost')
+    client.force_authenticate(user)
+    return client
+
+
+def median_ms(function, repeat):
+    """
+    Exécute `function` `repeat` fois et renvoie (temps médian en ms, dernier résultat).
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), result
@@ -0,0 +1,393 @@
+import http.client
+import json
+import statistics
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import F
+from django.test import Client, override_settings
+from django.urls import URLResolver, get_resolver
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from projects.models import Project, Issue, Comment
+
+from ._bench import create_user
+
+
+class InProcessTransport:
+    """
+    Envoie les requêtes au gestionnaire WSGI de Django dans le processus (middlewares compris),
+    avec un client de test par thread.
+    """
+
+    target = 'in-process'
+
+    def __init__(self):
+        self.local = threading.local()
+
+    def request(self, method, path, body, token):
+        client = getattr(self.local, 'client', None)
+        if client is None:
+            # Une erreur 500 est comptée, pas levée
+            client = self.local.client = Client(raise_request_exception=False)
+        headers = {'authorization': f'Bearer {token}'} if token else {}
+        response = client.generic(method, path, body or b'', content_type='application/json', headers=headers)
+        # L'export est envoyé au fil de la lecture : la mesure comprend toute la réponse
+        content = b''.join(response.streaming_content) if response.streaming else response.content
+        return response.status_code, content
+
+
+class HTTPTransport:
+    """
+    Envoie les requêtes à un serveur lancé à part (gunicorn, uvicorn...), avec une connexion
+    persistante par thread.
+    """
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self.target = url
+        self.connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        self.netloc = parts.netloc
+        self.prefix = parts.path.rstrip('/')
+        self.local = threading.local()
+
+    def request(self, method, path, body, token):
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = self.local.connection = self.connection_class(self.netloc, timeout=60)
+        headers = {'Content-Type': 'application/json'}
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+        try:
+            connection.request(method, self.prefix + path, body=body, headers=headers)
+            response = connection.getresponse()
+            return response.status, response.read()
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            self.local.connection = None
+            raise
+
+
+class Actor:
+    """
+    Un utilisateur du jeu de données et ce qu'il lit : un de ses projets, un problème et un commentaire
+    de ce projet (leurs adresses). Les adresses des objets qu'il crée pendant la mesure sont rangées
+    dans `created`, par type.
+    """
+
+    def __init__(self, user, comment, others):
+        refresh = RefreshToken.for_user(user)
+        self.user_id = user.pk
+        self.username = user.username
+        self.token = str(refresh.access_token)
+        self.refresh = str(refresh)
+        self.project = f'/projects/{comment.issue.project_id}/'
+        self.issue = f'{self.project}issues/{comment.issue_id}/'
+        self.comment = f'{self.issue}comments/{comment.pk}/'
+        # Deux autres utilisateurs, ajoutés puis retirés des projets créés
+        self.others = others
+        self.created = defaultdict(list)
+
+
+class Scenario:
+    """
+    Une route (nom de `config/urls.py`) et une méthode. `build(actor, k)` renvoie le chemin et le corps
+    de la k-ième requête de l'acteur, ou None s'il n'a rien à modifier. Avec `keep`, l'adresse de l'objet
+    créé par une réponse réussie est rangée dans `actor.created[keep]`.
+    """
+
+    def __init__(self, method, name, build, keep=None, admin=False):
+        self.method = method
+        self.name = name
+        self.build = build
+        self.keep = keep
+        self.admin = admin
+
+    @property
+    def key(self):
+        return f'{self.method} {self.name}'
+
+
+def on_created(kind, build, delete=False):
+    """
+    La requête porte sur un objet de type `kind` créé par l'acteur (son adresse) : chacun une seule fois
+    pour une suppression, à tour de rôle sinon.
+    """
+    def wrapper(actor, k):
+        items = actor.created[kind]
+        if delete:
+            return build(actor, k, items[k]) if k < len(items) else None
+        return build(actor, k, items[k % len(items)]) if items else None
+    return wrapper
+
+
+def issue_body(k):
+    return {'title': f'Problème {k}', 'description': 'Problème créé par bench_api', 'priority': 'MOYEN',
+            'tag': 'BUG', 'status': 'A_FAIRE'}
+
+
+def bulk_update(actor, k, issue):
+    """
+    Ferme en une requête tous les problèmes créés par l'acteur dans le projet de `issue`.
+    """
+    project = issue[:issue.index('issues/')]
+    ids = [int(path.split('/')[-2]) for path in actor.created['issue'] if path.startswith(project)]
+    return f'{project}issues/bulk/', {'ids': ids, 'status': 'TERMINE'}
+
+
+def scenarios(run, password):
+    """
+    Toutes les routes de l'API, dans l'ordre : lectures des données existantes, authentification, puis
+    pour chaque ressource création, modifications et suppression de ses propres objets.
+    """
+    def read(name, path):
+        return Scenario('GET', name, lambda actor, k: (path(actor), None))
+
+    def credentials(actor, k):
+        return {'username': actor.username, 'password': password}
+
+    def signup_body(name):
+        username = f'bench-api-{run}-{name}'
+        return {'username': username, 'email': f'{username}@example.com', 'password': password, 'password2': password}
+
+    def project_body(actor, k):
+        return {'title': f'Projet {k}', 'description': 'Projet créé par bench_api', 'type': 'WEB',
+                'author': actor.user_id}
+
+    def remove(actor, k, path):
+        return path, None
+
+    return [
+        read('api-root', lambda actor: '/'),
+        read('signup-list', lambda actor: '/signup/'),
+        read('signup-detail', lambda actor: f'/signup/{actor.user_id}/'),
+        read('projects-list', lambda actor: '/projects/'),
+        read('projects-detail', lambda actor: actor.project),
+        read('projects-export', lambda actor: f'{actor.project}export/'),
+        read('projects-stats', lambda actor: f'{actor.project}stats/'),
+        read('project-issues-list', lambda actor: f'{actor.project}issues/'),
+        read('project-issues-detail', lambda actor: actor.issue),
+        read('project-user_list-list', lambda actor: f'{actor.project}user_list/'),
+        read('issue-comments-list', lambda actor: f'{actor.issue}comments/'),
+        read('issue-comments-detail', lambda actor: actor.comment),
+        read('user_list', lambda actor: '/users/'),
+        read('feed', lambda actor: '/feed/'),
+        read('async-project-list', lambda actor: '/async/projects/'),
+        read('async-project-detail', lambda actor: f'/async{actor.project}'),
+        read('async-issue-list', lambda actor: f'/async{actor.project}issues/'),
+        read('async-comment-list', lambda actor: f'/async{actor.issue}comments/'),
+        read('async-user-list', lambda actor: '/async/users/'),
+        Scenario('GET', 'response_cache_stats', lambda actor, k: ('/cache/stats/', None), admin=True),
+
+        Scenario('POST', 'login', lambda actor, k: ('/login/', credentials(actor, k))),
+        Scenario('POST', 'token_obtain_pair', lambda actor, k: ('/api/token/', credentials(actor, k))),
+        Scenario('POST', 'token_refresh', lambda actor, k: ('/api/token/refresh/', {'refresh': actor.refresh})),
+
+        Scenario('POST', 'signup-list', lambda actor, k: ('/signup/', signup_body(f'{actor.user_id}-{k}')),
+                 keep='user'),
+        Scenario('PUT', 'signup-detail',
+                 on_created('user', lambda actor, k, path: (path, signup_body(path.split('/')[-2])))),
+        Scenario('DELETE', 'signup-detail', on_created('user', remove, delete=True)),
+
+        Scenario('POST', 'projects-list', lambda actor, k: ('/projects/', project_body(actor, k)), keep='project'),
+        Scenario('PATCH', 'projects-detail',
+                 on_created('project', lambda actor, k, path: (path, {'title': f'Projet modifié {k}'}))),
+        Scenario('PUT', 'projects-detail', on_created('project', lambda actor, k, path: (path, project_body(actor, k)))),
+        # Chaque projet créé reçoit deux contributeurs, puis les perd un par un
+        Scenario('POST', 'projects-add-contributor', on_created(
+            'project', lambda actor, k, path: (f'{path}users/', {'contributor_ids': actor.others}), delete=True)),
+        Scenario('DELETE', 'projects-remove-contributor', on_created(
+            'project', lambda actor, k, path: (f'{path}users/{actor.others[0]}/', None), delete=True)),
+        Scenario('DELETE', 'projects-add-contributor', on_created(
+            'project', lambda actor, k, path: (f'{path}users/', {'contributor_ids': actor.others[1:]}), delete=True)),
+
+        Scenario('POST', 'project-issues-list',
+                 on_created('project', lambda actor, k, path: (f'{path}issues/', issue_body(k))), keep='issue'),
+        Scenario('PATCH', 'project-issues-detail',
+                 on_created('issue', lambda actor, k, path: (path, {'status': 'EN_COURS'}))),
+        Scenario('PUT', 'project-issues-detail', on_created('issue', lambda actor, k, path: (path, issue_body(k)))),
+        Scenario('PATCH', 'project-issues-bulk-update', on_created('issue', bulk_update)),
+
+        Scenario('POST', 'issue-comments-list', on_created(
+            'issue', lambda actor, k, path: (f'{path}comments/', {'description': f'Commentaire {k}'})), keep='comment'),
+        Scenario('PATCH', 'issue-comments-detail',
+                 on_created('comment', lambda actor, k, path: (path, {'description': f'Commentaire modifié {k}'}))),
+        Scenario('PUT', 'issue-comments-detail',
+                 on_created('comment', lambda actor, k, path: (path, {'description': f'Commentaire remplacé {k}'}))),
+        Scenario('DELETE', 'issue-comments-detail', on_created('comment', remove, delete=True)),
+        Scenario('DELETE', 'project-issues-detail', on_created('issue', remove, delete=True)),
+        Scenario('DELETE', 'projects-detail', on_created('project', remove, delete=True)),
+    ]
+
+
+def api_route_names():
+    """
+    Les noms des routes de config/urls.py, hors des applications incluses avec un espace de noms
+    (administration, connexion de l'API navigable).
+    """
+    names = set()
+
+    def walk(patterns):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                if not pattern.namespace:
+                    walk(pattern.url_patterns)
+            elif pattern.name:
+                names.add(pattern.name)
+
+    walk(get_resolver().url_patterns)
+    return names
+
+
+def summarize(results, seconds):
+    """
+    Débit et latences (ms) des requêtes d'une route. Une erreur est une exception ou un statut ≥ 400.
+    """
+    timings = sorted(elapsed * 1000 for _, elapsed in results)
+    statuses = Counter(str(status) for status, _ in results)
+    summary = {
+        'requests': len(results),
+        'errors': sum(count for status, count in statuses.items() if not status.isdigit() or int(status) >= 400),
+        'statuses': dict(sorted(statuses.items())),
+        'throughput': round(len(results) / seconds, 1) if results else 0,
+    }
+    if len(timings) > 1:
+        quantiles = statistics.quantiles(timings, n=100, method='inclusive')
+        summary.update(p50_ms=round(quantiles[49], 2), p95_ms=round(quantiles[94], 2), p99_ms=round(quantiles[98], 2))
+    elif timings:
+        summary.update(p50_ms=round(timings[0], 2), p95_ms=round(timings[0], 2), p99_ms=round(timings[0], 2))
+    return summary
+
+
+class Command(BaseCommand):
+    """
+    Mesure toutes les routes de l'API (config/urls.py) sur le jeu de données de `seed_softdesk` :
+    `--requests` requêtes par route et par méthode, envoyées par `--concurrency` threads au nom
+    de `--users` utilisateurs du jeu de données, et rend le débit et les latences p50/p95/p99 en JSON,
+    à comparer d'une version à l'autre avec le même jeu de données et les mêmes options.
+
+    Les lectures portent sur les projets des utilisateurs ; les écritures ne modifient que des objets
+    créés pendant la mesure (créés, modifiés puis supprimés par les routes elles-mêmes, et supprimés
+    à la fin s'il en reste). Le flux d'évènements (/events/, ASGI seulement) a sa propre mesure : bench_sse.
+
+    Par défaut, les requêtes passent par le gestionnaire WSGI de Django dans ce processus : la mesure
+    comprend les middlewares, les vues et la base, pas le serveur, et les threads partagent le GIL.
+    Avec `--url`, elles sont envoyées à un serveur lancé à part, sur la même base de données et avec
+    la même SECRET_KEY (les jetons sont signés ici).
+    """
+
+    help = 'Mesure le débit et les latences de toutes les routes de l\'API et les rend en JSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=100, help='Requêtes par route')
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--users', type=int, default=20, help='Utilisateurs du jeu de données à simuler')
+        parser.add_argument('--prefix', default='seed', help='Préfixe des utilisateurs de seed_softdesk')
+        parser.add_argument('--password', default='softdesk', help='Mot de passe des utilisateurs de seed_softdesk')
+        parser.add_argument('--routes', default='',
+                            help='Noms de routes à mesurer, séparés par des virgules (toutes par défaut) ; '
+                                 'les modifications et suppressions portent sur les objets créés par la mesure')
+        parser.add_argument('--url', default='', help='Adresse d\'un serveur lancé à part (http://127.0.0.1:8000)')
+        parser.add_argument('--output', default='', help='Fichier du rapport JSON (sortie standard par défaut)')
+
+    def load_actors(self, prefix, count):
+        User = get_user_model()
+        users = User.objects.filter(username__startswith=f'{prefix}-')
+        # Le détail d'un commentaire n'est visible que de son auteur et des contributeurs (pas de l'auteur du projet)
+        comments = (Comment.objects.filter(issue__project__author__in=users, author=F('issue__project__author'))
+                    .select_related('issue__project__author').order_by('?')[:count * 10])
+        authors = {}
+        for comment in comments:
+            authors.setdefault(comment.issue.project.author_id, comment)
+        actors = []
+        for comment in list(authors.values())[:count]:
+            author = comment.issue.project.author
+            others = list(users.exclude(pk=author.pk).values_list('pk', flat=True)[:2])
+            if len(others) == 2:
+                actors.append(Actor(author, comment, others))
+        if not actors:
+            raise CommandError(f'Aucun projet commenté des utilisateurs « {prefix}-* » : lancez d\'abord seed_softdesk.')
+        return actors
+
+    def run(self, pool, transport, scenario, actors, admin, requests):
+        jobs = [(actors[i % len(actors)], i // len(actors)) for i in range(requests)]
+
+        def call(job):
+            actor, k = job
+            request = scenario.build(actor, k)
+            if request is None:
+                return None
+            path, body = request
+            token = admin.token if scenario.admin else actor.token
+            start = time.perf_counter()
+            try:
+                status, content = transport.request(scenario.method, path, json.dumps(body).encode()
+                                                    if body is not None else None, token)
+            except (OSError, http.client.HTTPException):
+                return 'exception', time.perf_counter() - start
+            elapsed = time.perf_counter() - start
+            if scenario.keep is not None and status < 300:
+                data = json.loads(content)
+                # L'inscription renvoie l'utilisateur avec ses jetons
+                pk = data['user']['id'] if scenario.keep == 'user' else data['id']
+                actor.created[scenario.keep].append(f'{path}{pk}/')
+            return status, elapsed
+
+        start = time.perf_counter()
+        results = [result for result in pool.map(call, jobs) if result is not None]
+        return summarize(results, time.perf_counter() - start)
+
+    def handle(self, *args, **options):
+        requests, concurrency = options['requests'], options['concurrency']
+        run = time.time_ns()
+        actors = self.load_actors(options['prefix'], options['users'])
+        selected = scenarios(run, options['password'])
+        missing = sorted(api_route_names() - {scenario.name for scenario in selected})
+        if options['routes']:
+            names = set(options['routes'].split(','))
+            selected = [scenario for scenario in selected if scenario.name in names]
+
+        transport = HTTPTransport(options['url']) if options['url'] else InProcessTransport()
+        report = {
+            'target': transport.target,
+            'date': timezone.now().isoformat(),
+            'requests': requests,
+            'concurrency': concurrency,
+            'users': len(actors),
+            'dataset': {model._meta.model_name: model.objects.count()
+                        for model in (get_user_model(), Project, Issue, Comment)},
+            'routes': {},
+            'unmeasured_routes': missing,
+        }
+        admin = create_user('bench-admin')
+        admin.is_staff = True
+        admin.save(update_fields=['is_staff'])
+        admin.token = str(RefreshToken.for_user(admin).access_token)
+        try:
+            with override_settings(ALLOWED_HOSTS=['testserver']), \
+                    ThreadPoolExecutor(concurrency) as pool:
+                for scenario in selected:
+                    summary = self.run(pool, transport, scenario, actors, admin, requests)
+                    report['routes'][scenario.key] = summary
+                    self.stderr.write(f"{scenario.key:<40} {summary['throughput']:>8.1f} req/s "
+                                      f"p50 {summary.get('p50_ms', 0):>8.1f} ms  p99 {summary.get('p99_ms', 0):>8.1f} ms  "
+                                      f"erreurs {summary['errors']}")
+        finally:
+            # Ce qui reste des objets créés si la mesure a été interrompue ou filtrée
+            Project.objects.filter(pk__in=[path.split('/')[-2] for actor in actors
+                                           for path in actor.created['project']]).delete()
+            get_user_model().objects.filter(username__startswith=f'bench-api-{run}-').delete()
+            admin.delete()
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                file.write(output + '\n')
+        else:
+            self.stdout.write(output)
@@ -0,0 +1,87 @@
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, Client, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from ._bench import create_user, seed_project
+
+
+class Command(BaseCommand):
+    """
+    Simule `--clients` clients lents simultanés (chacun met `--slow` secondes à envoyer sa requête)
+    et compare le débit :
+      - WSGI : un pool de `--threads` threads, chaque client lent occupe un thread ;
+      - ASGI, vue synchrone : la boucle d'évènements attend les clients, mais les vues synchrones
+        s'exécutent toutes dans le même thread ;
+      - ASGI, vue asynchrone (`projects.async_views`) : seul le SQL passe par ce thread.
+    Tous les clients arrivent en même temps : les latences sont comptées depuis leur arrivée.
+
+    Les threads et la boucle d'évènements utilisent leurs propres connexions : les données
+    de mesure sont enregistrées dans la base, puis supprimées à la fin.
+    """
+
+    help = 'Compare le débit des routes de lecture sous WSGI et sous ASGI avec des clients lents.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=1000)
+        parser.add_argument('--slow', type=float, default=1.0, help='Durée d\'envoi de chaque requête (s)')
+        parser.add_argument('--threads', type=int, default=32, help='Threads du serveur WSGI')
+
+    def wsgi(self, url, headers, clients, slow, threads):
+        start = time.perf_counter()
+
+        def slow_client():
+            client = Client()
+            # Le thread du serveur attend que le client ait fini d'envoyer sa requête
+            time.sleep(slow)
+            response = client.get(url, headers=headers)
+            assert response.status_code == 200, response.status_code
+            return time.perf_counter() - start
+
+        with ThreadPoolExecutor(threads) as executor:
+            return list(executor.map(lambda _: slow_client(), range(clients)))
+
+    async def asgi(self, url, headers, clients, slow):
+        client = AsyncClient()
+        start = time.perf_counter()
+
+        async def slow_client():
+            await asyncio.sleep(slow)
+            response = await client.get(url, headers=headers)
+            assert response.status_code == 200, response.status_code
+            return time.perf_counter() - start
+
+        return await asyncio.gather(*(slow_client() for _ in range(clients)))
+
+    def handle(self, *args, **options):
+        author = create_user()
+        try:
+            # Une route légère : le coût mesuré est celui de l'attente des clients, pas celui du rendu
+            seed_project(author, 5, 0)
+            headers = {'authorization': f'Bearer {AccessToken.for_user(author)}'}
+            url = '/projects/?limit=20'
+            clients, slow = options['clients'], options['slow']
+            scenarios = {
+                f'WSGI ({options["threads"]} threads)':
+                    lambda: self.wsgi(url, headers, clients, slow, options['threads']),
+                'ASGI, vue synchrone': lambda: asyncio.run(self.asgi(url, headers, clients, slow)),
+                'ASGI, vue asynchrone': lambda: asyncio.run(self.asgi(f'/async{url}', headers, clients, slow)),
+            }
+
+            self.stdout.write(f'{clients} clients, {slow * 1000:.0f} ms d\'envoi chacun')
+            self.stdout.write(f"{'serveur':<24} {'requêtes/s':>11} {'médiane':>10} {'p95':>10}")
+            # Les clients de test envoient toujours l'en-tête Host "testserver"
+            with override_settings(ALLOWED_HOSTS=['testserver']):
+                for name, run in scenarios.items():
+                    start = time.perf_counter()
+                    latencies = run()
+                    rate = clients / (time.perf_counter() - start)
+                    median = statistics.median(latencies) * 1000
+                    p95 = statistics.quantiles(latencies, n=20)[-1] * 1000
+                    self.stdout.write(f'{name:<24} {rate:>11.0f} {median:>7.0f} ms {p95:>7.0f} ms')
+        finally:
+            author.delete()
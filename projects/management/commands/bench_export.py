@@ -0,0 +1,64 @@
+import tracemalloc
+
+from asgiref.sync import async_to_sync
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import AsyncClient, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from ._bench import api_client, create_user, seed_project
+
+
+class Command(BaseCommand):
+    """
+    Compare le pic mémoire du détail d'un projet (ProjectDetailSerializer) et de l'export NDJSON
+    en flux, sous WSGI et sous ASGI, pour plusieurs tailles de projet.
+
+    Sous ASGI, `async_to_sync` exécute les requêtes SQL du flux dans le thread de la commande,
+    donc dans la transaction qui contient les données de mesure.
+    """
+
+    help = "Mesure le pic mémoire du détail d'un projet et de son export NDJSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--issues', type=int, nargs='+', default=[1000, 10000])
+        parser.add_argument('--comments', type=int, default=5, help='Commentaires par problème')
+
+    def peak_memory(self, function):
+        """
+        Pic de mémoire allouée (en Mo) pendant l'appel de `function`.
+        """
+        tracemalloc.start()
+        try:
+            function()
+            return tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        finally:
+            tracemalloc.stop()
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'problèmes':>10} {'détail':>12} {'export':>12} {'export ASGI':>12}")
+        for issues in options['issues']:
+            with transaction.atomic():
+                author = create_user()
+                project = seed_project(author, issues, options['comments'])
+                client = api_client(author)
+
+                def consume_export():
+                    # Le flux est lu paquet par paquet, comme le ferait le serveur
+                    for _ in client.get(f'/projects/{project.pk}/export/').streaming_content:
+                        pass
+
+                async def consume_export_asgi():
+                    headers = {'authorization': f'Bearer {AccessToken.for_user(author)}'}
+                    response = await AsyncClient().get(f'/projects/{project.pk}/export/', headers=headers)
+                    async for _ in response.streaming_content:
+                        pass
+
+                detail = self.peak_memory(lambda: client.get(f'/projects/{project.pk}/'))
+                export = self.peak_memory(consume_export)
+                # Les clients de test asynchrones envoient toujours l'en-tête Host "testserver"
+                with override_settings(ALLOWED_HOSTS=['testserver']):
+                    export_asgi = self.peak_memory(async_to_sync(consume_export_asgi))
+                self.stdout.write(f'{issues:>10} {detail:>9.1f} Mo {export:>9.1f} Mo {export_asgi:>9.1f} Mo')
+
+                transaction.set_rollback(True)
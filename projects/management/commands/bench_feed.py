@@ -0,0 +1,85 @@
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import override_settings
+
+from projects import activity
+from projects.models import Project, Contributor, Activity, FeedEntry
+
+from ._bench import api_client, median_ms
+
+# Taille des paquets d'insertion des données de mesure
+BATCH_SIZE = 5000
+
+
+class Command(BaseCommand):
+    """
+    Compare la diffusion à l'écriture et à la lecture du fil d'activité (`projects.activity`)
+    pour un lecteur membre de 1 ou de 1 000 projets, à volume d'évènements constant :
+    coût d'un évènement (écriture) et d'une page du fil (première page, puis dixième page par curseur).
+    Les données sont générées dans une transaction annulée à la fin (la base n'est pas modifiée).
+    """
+
+    help = "Compare la diffusion à l'écriture et à la lecture du fil d'activité."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--projects', default='1,1000', help='Nombre de projets du lecteur (liste)')
+        parser.add_argument('--activities', type=int, default=50000, help='Nombre total d\'évènements')
+        parser.add_argument('--members', type=int, default=5, help='Membres par projet, lecteur compris')
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def seed(self, projects, activities, members):
+        """
+        Crée `projects` projets dont le lecteur est membre, et leurs évènements déjà diffusés.
+        """
+        stamp = time.time_ns()
+        users = get_user_model().objects.bulk_create(
+            get_user_model()(username=f'bench-feed-{stamp}-{i}') for i in range(members))
+        reader, author = users[0], users[-1]
+        created = Project.objects.bulk_create(
+            Project(author=author, title=f'Projet {i}', description='D', type='WEB') for i in range(projects))
+        Contributor.objects.bulk_create(
+            (Contributor(user=user, project=project) for project in created for user in users[:-1]),
+            batch_size=BATCH_SIZE)
+        events = Activity.objects.bulk_create(
+            (Activity(project=created[i % projects], actor=author, verb=Activity.ISSUE_CREATED,
+                      data={'issue': i, 'title': f'Problème {i}'}) for i in range(activities)),
+            batch_size=BATCH_SIZE)
+        FeedEntry.objects.bulk_create(
+            (FeedEntry(user=user, activity=event) for event in events for user in users), batch_size=BATCH_SIZE)
+        return reader, created[0]
+
+    def read_pages(self, client, pages):
+        """
+        Lit `pages` pages du fil en suivant les curseurs ; renvoie la durée de la dernière (ms).
+        """
+        url = '/feed/'
+        for _ in range(pages):
+            start = time.perf_counter()
+            response = client.get(url)
+            elapsed = (time.perf_counter() - start) * 1000
+            assert response.status_code == 200, response.status_code
+            url = response.data['next']
+        return elapsed
+
+    def handle(self, *args, **options):
+        repeat = options['repeat']
+        self.stdout.write(f"{options['activities']} évènements, {options['members']} membres par projet")
+        self.stdout.write(f"{'projets':>8} {'diffusion':<10} {'écriture':>10} {'page 1':>10} {'page 10':>10}")
+        for projects in [int(value) for value in options['projects'].split(',')]:
+            with transaction.atomic():
+                reader, project = self.seed(projects, options['activities'], options['members'])
+                client = api_client(reader)
+                for mode in ['write', 'read']:
+                    with override_settings(ACTIVITY_FEED_FANOUT=mode):
+                        write_ms, _ = median_ms(lambda: activity.record(project.pk, [
+                            Activity(project=project, actor=reader, verb=Activity.COMMENT_CREATED, data={})
+                        ]), repeat)
+                        first_ms = statistics.median(self.read_pages(client, 1) for _ in range(repeat))
+                        tenth_ms = statistics.median(self.read_pages(client, 10) for _ in range(repeat))
+                    self.stdout.write(f'{projects:>8} {mode:<10} {write_ms:>7.2f} ms {first_ms:>7.1f} ms '
+                                      f'{tenth_ms:>7.1f} ms')
+                transaction.set_rollback(True)
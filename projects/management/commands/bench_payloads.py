@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from ._bench import api_client, create_user, median_ms, seed_project
+
+
+class Command(BaseCommand):
+    """
+    Compare la taille et la latence des réponses complètes avec `?fields=` / `?expand=`.
+    """
+
+    help = 'Mesure la taille et la latence des réponses avec et sans ?fields= / ?expand=.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--issues', type=int, default=100)
+        parser.add_argument('--comments', type=int, default=50, help='Commentaires par problème')
+        parser.add_argument('--repeat', type=int, default=10)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            author = create_user()
+            project = seed_project(author, options['issues'], options['comments'])
+            issue = project.issues.order_by('id').first()
+            client = api_client(author)
+
+            routes = {
+                'projects/': '?fields=id,title',
+                f'projects/{project.pk}/': '?fields=id,title,issue_count,open_issue_count',
+                f'projects/{project.pk}/issues/': '?fields=id,title,status',
+                f'projects/{project.pk}/issues/{issue.pk}/comments/': '?fields=id,description',
+            }
+            self.stdout.write(f"{'route':<40} {'complet':>22} {'réduit':>22}")
+            for route, sparse in routes.items():
+                results = []
+                for query in ('', sparse):
+                    duration, response = median_ms(lambda: client.get(f'/{route}{query}'), options['repeat'])
+                    results.append(f'{len(response.content):>10} o {duration:>7.1f} ms')
+                self.stdout.write(f'{route:<40} {results[0]:>22} {results[1]:>22}')
+
+            transaction.set_rollback(True)
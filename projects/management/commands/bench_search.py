@@ -0,0 +1,62 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from projects.models import Comment
+from projects.search import search
+
+from ._bench import create_user, median_ms, seed_project
+
+WORDS = (
+    'serveur base requête connexion page erreur utilisateur projet problème commentaire export '
+    'import fichier lenteur plantage affichage tableau formulaire validation session jeton cache '
+    'mémoire disque réseau réponse courriel notification recherche filtre tri pagination'
+).split()
+
+
+class Command(BaseCommand):
+    """
+    Compare la recherche FTS5 (`projects.search`) avec un parcours `icontains` sur les commentaires,
+    dans une transaction annulée à la fin (la base n'est pas modifiée).
+    """
+
+    help = 'Mesure ?search= (FTS5) face à icontains sur un grand nombre de commentaires.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--comments', type=int, default=1000000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        rng = random.Random(0)
+        with transaction.atomic():
+            start = time.perf_counter()
+            author = create_user()
+            issues = max(1, options['comments'] // 100)
+            project = seed_project(author, issues, 0)
+            issue_ids = list(project.issues.values_list('id', flat=True))
+            Comment.objects.bulk_create(
+                (Comment(description=' '.join(rng.choices(WORDS, k=40)) + f' ref{i}', author=author,
+                         issue_id=issue_ids[i % issues]) for i in range(options['comments'])),
+                batch_size=5000,
+            )
+            self.stdout.write(f'Données générées et indexées en {time.perf_counter() - start:.1f} s')
+
+            comments = Comment.objects.filter(issue__project=project)
+            # Un mot fréquent, un mot rare (une seule ligne) et deux mots
+            queries = ['plantage', f'ref{options["comments"] // 2}', 'jeton expiré']
+            self.stdout.write(f"{'recherche':<20} {'résultats':>10} {'icontains':>12} {'FTS5':>12}")
+            for text in queries:
+                scan = comments
+                for word in text.split():
+                    scan = scan.filter(description__icontains=word)
+
+                def first_page(queryset):
+                    return queryset.count(), list(queryset.values_list('id', flat=True)[:20])
+
+                scan_ms, (count, _) = median_ms(lambda: first_page(scan.order_by('id')), options['repeat'])
+                fts_ms, (fts_count, _) = median_ms(lambda: first_page(search(comments, text)), options['repeat'])
+                self.stdout.write(f'{text:<20} {fts_count:>10} {scan_ms:>9.1f} ms {fts_ms:>9.1f} ms')
+
+            transaction.set_rollback(True)
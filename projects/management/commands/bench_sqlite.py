@@ -0,0 +1,126 @@
+import multiprocessing
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, close_old_connections, connection, transaction
+
+from projects.models import Project, Issue
+
+from ._bench import create_user
+
+
+def use_database(name, profile):
+    """
+    Fait pointer la connexion `default` du processus vers la base `name`, avec le profil de connexion `profile`.
+    """
+    connection.close()
+    profile = settings.SQLITE_PROFILES[profile]
+    connection.settings_dict.update(NAME=name, CONN_MAX_AGE=profile['CONN_MAX_AGE'],
+                                    CONN_HEALTH_CHECKS=profile.get('CONN_HEALTH_CHECKS', False),
+                                    OPTIONS=dict(profile['OPTIONS']))
+
+
+def worker(name, profile, project_id, author_id, duration, writes, seed):
+    """
+    Enchaîne des requêtes simulées pendant `duration` secondes : une proportion `writes` d'écritures
+    (lecture du projet puis création d'un problème, dans une transaction, comme une vue),
+    des lectures sinon (une page de problèmes). Chaque requête se termine comme une requête HTTP
+    (`close_old_connections`). Renvoie [(écriture, durée en s, verrouillée)].
+    """
+    use_database(name, profile)
+    rng = random.Random(seed)
+    results = []
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        write = rng.random() < writes
+        start = time.perf_counter()
+        locked = False
+        try:
+            if write:
+                with transaction.atomic():
+                    project = Project.objects.get(pk=project_id)
+                    Issue.objects.create(title='Problème', description='D' * 200, priority='MOYEN', tag='BUG',
+                                         status='A_FAIRE', project=project, author_id=author_id)
+            else:
+                list(Issue.objects.filter(project_id=project_id).order_by('-id')[:20])
+        except OperationalError as exc:
+            if 'locked' not in str(exc):
+                raise
+            locked = True
+        results.append((write, time.perf_counter() - start, locked))
+        close_old_connections()
+    connection.close()
+    return results
+
+
+def percentile(values, n):
+    if len(values) < 2:
+        return values[0] if values else 0
+    return statistics.quantiles(values, n=100)[n - 1]
+
+
+class Command(BaseCommand):
+    """
+    Soumet une base SQLite à `--processes` processus qui lisent et écrivent en même temps, avec chacun
+    des profils de connexion de `SQLITE_PROFILES` (config/settings.py), et compare le débit, les erreurs
+    « database is locked » et les latences (p50 et p99) des lectures et des écritures.
+
+    Chaque profil part d'une copie neuve d'une base migrée dans un répertoire temporaire :
+    la base du projet n'est pas modifiée.
+    """
+
+    help = 'Compare les profils de connexion SQLite sous des lectures et écritures concurrentes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=8)
+        parser.add_argument('--duration', type=float, default=10.0, help='Durée de chaque mesure (s)')
+        parser.add_argument('--writes', type=float, default=0.2, help='Proportion d\'écritures')
+        parser.add_argument('--profiles', default='django,production')
+
+    def prepare(self, directory):
+        """
+        Crée une base migrée (journal d'annulation) avec un projet et son auteur.
+        """
+        template = os.path.join(directory, 'template.sqlite3')
+        use_database(template, 'django')
+        call_command('migrate', verbosity=0)
+        author = create_user()
+        project = Project.objects.create(author=author, title='Projet de mesure', description='D', type='WEB')
+        connection.close()
+        return template, project.pk, author.pk
+
+    def handle(self, *args, **options):
+        processes, duration, writes = options['processes'], options['duration'], options['writes']
+        # Les processus fils héritent de la configuration de Django ; chacun ouvre ses propres connexions
+        context = multiprocessing.get_context('fork')
+        directory = tempfile.mkdtemp()
+        try:
+            template, project_id, author_id = self.prepare(directory)
+            self.stdout.write(f'{processes} processus, {duration:.0f} s, {writes:.0%} d\'écritures')
+            self.stdout.write(f"{'profil':<12} {'req/s':>7} {'verrous':>8} {'lecture p50':>12} {'p99':>9} "
+                              f"{'écriture p50':>13} {'p99':>9}")
+            for profile in options['profiles'].split(','):
+                name = os.path.join(directory, f'{profile}.sqlite3')
+                shutil.copy(template, name)
+                with context.Pool(processes) as pool:
+                    runs = pool.starmap(worker, [
+                        (name, profile, project_id, author_id, duration, writes, seed) for seed in range(processes)
+                    ])
+                results = [result for run in runs for result in run]
+                reads = [elapsed * 1000 for write, elapsed, locked in results if not write and not locked]
+                written = [elapsed * 1000 for write, elapsed, locked in results if write and not locked]
+                locks = sum(locked for _, _, locked in results)
+                self.stdout.write(
+                    f'{profile:<12} {len(results) / duration:>7.0f} {locks:>8} '
+                    f'{statistics.median(reads):>9.1f} ms {percentile(reads, 99):>6.1f} ms '
+                    f'{statistics.median(written):>10.1f} ms {percentile(written, 99):>6.1f} ms')
+        finally:
+            connection.close()
+            shutil.rmtree(directory)
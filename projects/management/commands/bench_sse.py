@@ -0,0 +1,106 @@
+import asyncio
+import resource
+import statistics
+import threading
+import time
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from rest_framework_simplejwt.tokens import AccessToken
+
+from projects.events import get_bus
+from projects.sse import SSE_PATH, EventStreamApplication
+
+from ._bench import create_user, seed_project
+
+
+class Command(BaseCommand):
+    """
+    Mesure ce que coûte le flux d'évènements (`/events/`, projects/sse.py) à un processus ASGI :
+      - `--subscribers` clients simulés ouvrent le flux dans la même boucle d'évènements
+        (débit d'ouverture, et mémoire par abonné inactif : hausse de la mémoire résidente maximale, Linux) ;
+      - un autre thread publie `--events` évènements sur le bus, comme un thread de vue après validation ;
+        la latence est le délai entre la publication et l'envoi de la trame à chaque client, et la diffusion
+        complète celui du dernier client servi ;
+      - tous les clients se déconnectent : le bus ne doit plus avoir d'abonné.
+
+    La boucle d'évènements utilise sa propre connexion : les données de mesure sont enregistrées
+    dans la base, puis supprimées à la fin.
+    """
+
+    help = 'Mesure la mémoire par abonné du flux d\'évènements et la latence de diffusion.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--subscribers', type=int, default=10000)
+        parser.add_argument('--events', type=int, default=20)
+        parser.add_argument('--interval', type=float, default=0.5, help='Délai entre deux évènements (s)')
+
+    async def run(self, project, token, subscribers, events, interval):
+        bus = get_bus()
+        published = {}
+        latencies = defaultdict(list)
+        disconnected = asyncio.Event()
+        scope = {'type': 'http', 'method': 'GET', 'path': SSE_PATH, 'query_string': b'',
+                 'headers': [(b'authorization', f'Bearer {token}'.encode())]}
+        application = EventStreamApplication(None)
+
+        async def receive():
+            await disconnected.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            body = message.get('body', b'')
+            if body.startswith(b'id: '):
+                # Chaque évènement publié porte son numéro dans `issue`
+                number = body[body.index(b'"issue": ') + 9:]
+                number = int(number[:number.index(b',')])
+                latencies[number].append(time.perf_counter() - published[number])
+
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        start = time.perf_counter()
+        streams = []
+        for _ in range(subscribers):
+            streams.append(asyncio.ensure_future(application(scope, receive, send)))
+            # Ouverture progressive, comme des clients qui se connectent les uns après les autres
+            if len(streams) % 100 == 0:
+                await asyncio.sleep(0)
+        while bus.subscriber_count() < subscribers:
+            await asyncio.sleep(0.01)
+        open_seconds = time.perf_counter() - start
+        memory = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss) * 1024
+
+        def publisher():
+            for number in range(events):
+                time.sleep(interval)
+                published[number] = time.perf_counter()
+                bus.publish({'type': 'issue.updated', 'project': project.pk, 'issue': number})
+
+        thread = threading.Thread(target=publisher)
+        thread.start()
+        while sum(map(len, latencies.values())) < subscribers * events:
+            await asyncio.sleep(0.01)
+        thread.join()
+
+        disconnected.set()
+        await asyncio.gather(*streams)
+        return open_seconds, memory, latencies, bus.subscriber_count()
+
+    def handle(self, *args, **options):
+        author = create_user()
+        try:
+            project = seed_project(author, 1, 0)
+            subscribers, events = options['subscribers'], options['events']
+            open_seconds, memory, latencies, remaining = asyncio.run(self.run(
+                project, AccessToken.for_user(author), subscribers, events, options['interval']))
+
+            self.stdout.write(f'{subscribers} abonnés ouverts en {open_seconds:.1f} s '
+                              f'({subscribers / open_seconds:.0f}/s), {memory / subscribers / 1024:.1f} Kio par abonné')
+            every = [latency for event in latencies.values() for latency in event]
+            quantiles = statistics.quantiles(every, n=100)
+            complete = statistics.median(max(event) for event in latencies.values())
+            self.stdout.write(f'{events} évènements x {subscribers} abonnés : latence médiane '
+                              f'{statistics.median(every) * 1000:.1f} ms, p99 {quantiles[98] * 1000:.1f} ms, '
+                              f'diffusion complète {complete * 1000:.1f} ms (médiane)')
+            self.stdout.write(f'Abonnés restants après déconnexion : {remaining}')
+        finally:
+            author.delete()
@@ -0,0 +1,88 @@
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from projects.models import Project, Issue, Comment
+from projects.stats import compute_stats, issue_groups, stats_cache_key, top_authors
+
+from ._bench import api_client, median_ms
+
+
+class Command(BaseCommand):
+    """
+    Mesure les statistiques d'un projet (`projects/<pk>/stats/`) : chaque requête GROUP BY,
+    le calcul complet, puis la réponse de l'API servie depuis le cache.
+    Les données sont générées dans une transaction annulée à la fin (la base n'est pas modifiée).
+    """
+
+    help = "Mesure le calcul des statistiques d'un projet de --issues problèmes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--issues', type=int, default=500000)
+        parser.add_argument('--authors', type=int, default=50)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def seed(self, issues, authors):
+        rng = random.Random(0)
+        users = get_user_model().objects.bulk_create(
+            get_user_model()(username=f'bench-stats-{time.time_ns()}-{i}') for i in range(authors))
+        project = Project.objects.create(author=users[0], title='Projet de mesure', description='D' * 200, type='WEB')
+        statuses = [value for value, _ in Issue.STATUS_CHOICES]
+        priorities = [value for value, _ in Issue.PRIORITY_CHOICES]
+        tags = [value for value, _ in Issue.TAG_CHOICES]
+        # Nombre de commentaires par problème : la plupart en ont peu, quelques-uns beaucoup
+        comment_counts = [min(int(rng.expovariate(0.5)), 30) for _ in range(issues)]
+        Issue.objects.bulk_create(
+            (Issue(title=f'Problème {i}', description='D' * 200, status=rng.choice(statuses),
+                   priority=rng.choice(priorities), tag=rng.choice(tags), project=project,
+                   author=rng.choice(users), comment_count=comment_counts[i]) for i in range(issues)),
+            batch_size=5000,
+        )
+        issue_ids = project.issues.order_by('id').values_list('id', flat=True)
+        Comment.objects.bulk_create(
+            (Comment(description='C' * 100, author=rng.choice(users), issue_id=issue_id)
+             for issue_id, count in zip(issue_ids.iterator(), comment_counts) for _ in range(count)),
+            batch_size=5000,
+        )
+        Project.objects.filter(pk=project.pk).update(issue_count=issues)
+        project.refresh_from_db()
+        return project
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            start = time.perf_counter()
+            project = self.seed(options['issues'], options['authors'])
+            comments = Comment.objects.filter(issue__project=project).count()
+            self.stdout.write(f'{options["issues"]} problèmes et {comments} commentaires générés '
+                              f'en {time.perf_counter() - start:.1f} s')
+
+            repeat = options['repeat']
+            measures = {
+                'problèmes par statut/priorité/étiquette/commentaires': lambda: list(issue_groups(project)),
+                'auteurs de problèmes': lambda: top_authors(Issue.objects.filter(project=project)),
+                'auteurs de commentaires': lambda: top_authors(Comment.objects.filter(issue__project=project)),
+                'calcul complet (sans cache)': lambda: compute_stats(project),
+            }
+            for name, function in measures.items():
+                elapsed, _ = median_ms(function, repeat)
+                self.stdout.write(f'{name:<55} {elapsed:>9.1f} ms')
+
+            client = api_client(project.author)
+            url = f'/projects/{project.pk}/stats/'
+            cache.delete(stats_cache_key(project.pk, project.version))
+            cold, response = median_ms(lambda: client.get(url), 1)
+            assert response.status_code == 200, response.status_code
+            warm, _ = median_ms(lambda: client.get(url), repeat)
+            etag = response['ETag']
+            not_modified, response = median_ms(lambda: client.get(url, HTTP_IF_NONE_MATCH=etag), repeat)
+            assert response.status_code == 304, response.status_code
+            self.stdout.write(f'{"API, premier appel":<55} {cold:>9.1f} ms')
+            self.stdout.write(f'{"API, depuis le cache":<55} {warm:>9.1f} ms')
+            self.stdout.write(f'{"API, 304 (If-None-Match)":<55} {not_modified:>9.1f} ms')
+
+            cache.delete(stats_cache_key(project.pk, project.version))
+            transaction.set_rollback(True)
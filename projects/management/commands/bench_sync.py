@@ -0,0 +1,57 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import override_settings
+from django.utils import timezone
+
+from projects.models import Issue
+
+from ._bench import api_client, create_user, median_ms, seed_project
+
+
+class Command(BaseCommand):
+    """
+    Compare une synchronisation complète des problèmes d'un projet (`?since=` vide)
+    et une synchronisation incrémentale après `--changes` modifications et suppressions.
+    Les données sont générées dans une transaction annulée à la fin (la base n'est pas modifiée).
+    """
+
+    help = 'Mesure la synchronisation incrémentale (?since=) face au téléchargement complet.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--issues', type=int, default=20000)
+        parser.add_argument('--changes', type=int, default=10)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        with transaction.atomic(), override_settings(SYNC_CURSOR_MARGIN=0):
+            author = create_user()
+            project = seed_project(author, options['issues'], 1)
+            client = api_client(author)
+            url = f'/projects/{project.pk}/issues/'
+
+            def sync(cursor=''):
+                response = client.get(url, {'since': cursor})
+                assert response.status_code == 200, response.status_code
+                return response
+
+            full_ms, response = median_ms(sync, options['repeat'])
+            full_bytes = len(response.content)
+            cursor = response.data['cursor']
+
+            # Modifications (dont une écriture en masse) et suppressions après le curseur
+            time.sleep(0.01)
+            ids = list(project.issues.order_by('?').values_list('id', flat=True)[:options['changes']])
+            half = len(ids) // 2
+            Issue.objects.filter(id__in=ids[:half]).update(status='TERMINE', updated_time=timezone.now())
+            for issue in Issue.objects.filter(id__in=ids[half:]):
+                issue.delete()
+
+            delta_ms, response = median_ms(lambda: sync(cursor), options['repeat'])
+            changed, deleted = len(response.data['changed']), len(response.data['deleted'])
+            self.stdout.write(f"{'synchronisation':<16} {'objets':>8} {'octets':>12} {'durée':>12}")
+            self.stdout.write(f"{'complète':<16} {options['issues']:>8} {full_bytes:>12} {full_ms:>9.1f} ms")
+            self.stdout.write(f"{'incrémentale':<16} {changed + deleted:>8} {len(response.content):>12} "
+                              f"{delta_ms:>9.1f} ms")
+            transaction.set_rollback(True)
@@ -0,0 +1,85 @@
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from projects.membership import visible_to
+from projects.models import Project, Contributor, Issue
+
+
+class Command(BaseCommand):
+    """
+    Compare la requête de visibilité historique (jointure OR + DISTINCT) avec `visible_to`,
+    sur des données générées dans une transaction annulée à la fin (la base n'est pas modifiée).
+    """
+
+    help = 'Mesure les requêtes "projets visibles par un utilisateur" sur un grand volume de données.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000)
+        parser.add_argument('--projects', type=int, default=100000)
+        parser.add_argument('--contributors', type=int, default=1000000)
+        parser.add_argument('--samples', type=int, default=20, help='Nombre d\'utilisateurs mesurés')
+
+    def seed(self, users, projects, contributors):
+        User = get_user_model()
+        prefix = f'bench-visibility-{time.time_ns()}'
+        User.objects.bulk_create([User(username=f'{prefix}-{i}') for i in range(users)], batch_size=5000)
+        user_ids = list(User.objects.filter(username__startswith=prefix).order_by('id').values_list('id', flat=True))
+
+        Project.objects.bulk_create(
+            [Project(author_id=user_ids[i % users], title='P', description='D', type='WEB') for i in range(projects)],
+            batch_size=5000,
+        )
+        project_ids = list(Project.objects.filter(author_id__in=user_ids).order_by('id').values_list('id', flat=True))
+
+        # Chaque projet reçoit le même nombre de contributeurs, tous distincts
+        per_project = contributors // projects
+        Contributor.objects.bulk_create(
+            (Contributor(project_id=project_id, user_id=user_ids[(p + 1 + j) % users])
+             for p, project_id in enumerate(project_ids) for j in range(per_project)),
+            batch_size=5000,
+        )
+        return user_ids, project_ids
+
+    def measure(self, build, user_ids):
+        """
+        Temps médian (ms) du comptage puis de la première page, pour chaque utilisateur échantillonné.
+        """
+        timings = []
+        for user_id in user_ids:
+            queryset = build(get_user_model()(pk=user_id))
+            start = time.perf_counter()
+            queryset.count()
+            list(queryset.order_by('id').values_list('id', flat=True)[:100])
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings)
+
+    def handle(self, *args, **options):
+        strategies = {
+            'projects: OR join + DISTINCT': lambda user: Project.objects.filter(
+                Q(author=user) | Q(contributors=user)).distinct(),
+            'projects: visible_to': lambda user: Project.objects.filter(visible_to(user)),
+            'issues: OR join': lambda user: Issue.objects.filter(
+                Q(project__author=user) | Q(project__contributors=user)),
+            'issues: visible_to': lambda user: Issue.objects.filter(visible_to(user, 'project')),
+        }
+
+        with transaction.atomic():
+            start = time.perf_counter()
+            user_ids, project_ids = self.seed(options['users'], options['projects'], options['contributors'])
+            Issue.objects.bulk_create(
+                [Issue(title='I', description='D', priority='FAIBLE', tag='BUG', status='A_FAIRE',
+                       project_id=project_id, author_id=user_ids[0]) for project_id in project_ids],
+                batch_size=5000,
+            )
+            self.stdout.write(f'Données générées en {time.perf_counter() - start:.1f} s')
+
+            sample = user_ids[::max(1, len(user_ids) // options['samples'])][:options['samples']]
+            for name, build in strategies.items():
+                self.stdout.write(f'{name:<32} {self.measure(build, sample):8.2f} ms (médiane)')
+
+            transaction.set_rollback(True)
@@ -0,0 +1,88 @@
+import re
+from types import SimpleNamespace
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.utils import timezone
+
+from projects.models import Project, Contributor, Issue, Comment
+from projects.stats import issue_groups
+from projects.views import ProjectViewSet, IssueViewSet, CommentViewSet
+
+
+class Command(BaseCommand):
+    """
+    Affiche le plan d'exécution (EXPLAIN QUERY PLAN sur SQLite) de chaque queryset
+    de projects/views.py, et les index utilisés.
+    """
+
+    help = "Affiche le plan d'exécution des querysets des vues et les index utilisés."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, help="ID de l'utilisateur (par défaut : l'auteur du premier projet)")
+        parser.add_argument('--project', type=int, help='ID du projet (par défaut : le premier projet)')
+
+    def get_view_queryset(self, viewset_class, action, user, query_params=None, **kwargs):
+        """
+        Construit la queryset d'une vue comme pour une vraie requête.
+        """
+        view = viewset_class()
+        view.action = action
+        view.kwargs = kwargs
+        view.request = SimpleNamespace(user=user, method='GET', query_params=query_params or {})
+        return view.get_queryset()
+
+    def get_querysets(self, user, project, issue):
+        project_pk = str(project.pk)
+        issue_pk = str(issue.pk) if issue else '0'
+        issues = self.get_view_queryset(IssueViewSet, 'list', user, project_pk=project_pk)
+        # Le préchargement des commentaires filtre sur les problèmes de la page
+        issue_ids = list(Issue.objects.filter(project=project).values_list('id', flat=True)[:100])
+        comments = self.get_view_queryset(CommentViewSet, 'list', user, project_pk=project_pk, issue_pk=issue_pk)
+        return {
+            'ProjectViewSet.list': self.get_view_queryset(ProjectViewSet, 'list', user).order_by('id'),
+            'ProjectViewSet.retrieve': self.get_view_queryset(ProjectViewSet, 'retrieve', user).filter(pk=project.pk),
+            'ProjectViewSet.retrieve (issues)': Issue.objects.filter(project=project).order_by('created_time'),
+            'ProjectViewSet.stats (issues)': issue_groups(project),
+            'ProjectViewSet.stats (authors)': Issue.objects.filter(project=project).values('author_id').annotate(
+                count=Count('id')),
+            'IssueViewSet.list': issues.order_by('created_time', 'id'),
+            'IssueViewSet.list (status, priority)': self.get_view_queryset(
+                IssueViewSet, 'list', user, query_params={'status': 'A_FAIRE,EN_COURS', 'priority': 'ELEVEE'},
+                project_pk=project_pk),
+            'IssueViewSet.list (tag)': self.get_view_queryset(
+                IssueViewSet, 'list', user, query_params={'tag': 'BUG', 'ordering': '-created_time'},
+                project_pk=project_pk),
+            'IssueViewSet.list (author)': self.get_view_queryset(
+                IssueViewSet, 'list', user, query_params={'author': str(user.pk)}, project_pk=project_pk),
+            'IssueViewSet.list (since)': issues.filter(updated_time__gte=timezone.now()),
+            'IssueViewSet.list (comments)': Comment.objects.filter(issue__in=issue_ids).select_related('author'),
+            'CommentViewSet.list': comments.order_by('created_time', 'id'),
+            'ProjectUserViewSet.list': project.contributors.all(),
+            'membership (authored)': Project.objects.filter(author=user).values('id'),
+            'membership (contributed)': Contributor.objects.filter(user=user).values('project_id'),
+            'add_contributor (unique)': Contributor.objects.filter(user=user, project=project),
+        }
+
+    def handle(self, *args, **options):
+        project = Project.objects.order_by('id')
+        if options['project']:
+            project = project.filter(pk=options['project'])
+        project = project.first()
+        if project is None:
+            raise CommandError('Aucun projet en base : créez des données avant de lancer cette commande.')
+
+        user = get_user_model().objects.get(pk=options['user']) if options['user'] else project.author
+        issue = project.issues.order_by('id').first()
+
+        for name, queryset in self.get_querysets(user, project, issue).items():
+            plan = queryset.explain()
+            indexes = sorted(set(re.findall(r'USING (?:COVERING )?INDEX (\w+)', plan)))
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(plan)
+            if indexes:
+                self.stdout.write(self.style.SUCCESS('Index : ' + ', '.join(indexes)))
+            else:
+                self.stdout.write(self.style.WARNING('Aucun index secondaire utilisé'))
+            self.stdout.write('')
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from projects.counters import recompute_counters
+
+
+class Command(BaseCommand):
+    """
+    Recalcule en masse les compteurs dénormalisés (issue_count, open_issue_count, comment_count),
+    par exemple après des écritures en masse qui ne déclenchent pas de signaux.
+    """
+
+    help = 'Recalcule les compteurs de problèmes des projets et de commentaires des problèmes.'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            recompute_counters()
+        self.stdout.write(self.style.SUCCESS('Compteurs recalculés.'))
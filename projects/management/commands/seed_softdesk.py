@@ -0,0 +1,152 @@
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from projects import activity
+from projects.counters import recompute_counters
+from projects.models import Project, Contributor, Issue, Comment
+
+WORDS = ('api', 'application', 'authentification', 'base', 'cache', 'client', 'commentaire', 'compte',
+         'configuration', 'connexion', 'contributeur', 'données', 'écran', 'erreur', 'export', 'fichier',
+         'filtre', 'formulaire', 'index', 'jeton', 'liste', 'mémoire', 'menu', 'mobile', 'mot de passe',
+         'notification', 'page', 'paiement', 'performance', 'profil', 'projet', 'recherche', 'requête',
+         'serveur', 'session', 'statut', 'synchronisation', 'tableau de bord', 'test', 'utilisateur')
+
+ISSUE_VERBS = ('Corriger', 'Ajouter', 'Améliorer', 'Refaire', 'Documenter', 'Tester', 'Accélérer', 'Supprimer')
+
+# Répartitions observées sur un projet type : la plupart des problèmes sont terminés ou à faire
+PROJECT_TYPES = (('WEB', 5), ('IOS', 2), ('ANDROID', 3))
+STATUSES = (('A_FAIRE', 35), ('EN_COURS', 25), ('TERMINE', 40))
+PRIORITIES = (('FAIBLE', 30), ('MOYEN', 50), ('ELEVEE', 20))
+TAGS = (('BUG', 45), ('AMELIORATION', 30), ('TACHE', 25))
+
+
+def weighted(rng, choices):
+    values, weights = zip(*choices)
+    return rng.choices(values, weights)[0]
+
+
+def around(rng, mean):
+    """
+    Un effectif aléatoire de moyenne `mean`, très inégal (loi exponentielle) : beaucoup de petits projets
+    ou de problèmes sans commentaire, quelques très gros.
+    """
+    return int(rng.expovariate(1 / mean)) if mean > 0 else 0
+
+
+def sentences(rng, low, high, count=500):
+    """
+    Un lot de `count` phrases de `low` à `high` mots, dans lequel les textes sont tirés
+    (générer chaque texte coûterait plus cher que son insertion).
+    """
+    return [' '.join(rng.choices(WORDS, k=rng.randint(low, high))).capitalize() for _ in range(count)]
+
+
+class Command(BaseCommand):
+    """
+    Génère un jeu de données réaliste pour les mesures de performances (bench_api et les autres bench_*) :
+    des utilisateurs `<prefix>-<n>` qui partagent le mot de passe `--password` (haché une seule fois),
+    des projets avec leurs contributeurs, des problèmes et des commentaires écrits par les membres
+    de chaque projet, et le fil d'activité correspondant.
+
+    Les effectifs par projet et par problème sont des moyennes, avec une répartition très inégale.
+    Tout est inséré en masse dans une transaction ; les compteurs dénormalisés sont recalculés à la fin.
+    Avec la même graine (`--seed`), le jeu de données est le même.
+    """
+
+    help = 'Génère en masse des utilisateurs, projets, contributeurs, problèmes et commentaires.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--projects', type=int, default=200)
+        parser.add_argument('--contributors', type=float, default=8, help='Contributeurs par projet (moyenne)')
+        parser.add_argument('--issues', type=float, default=50, help='Problèmes par projet (moyenne)')
+        parser.add_argument('--comments', type=float, default=4, help='Commentaires par problème (moyenne)')
+        parser.add_argument('--prefix', default='seed', help='Préfixe des noms des utilisateurs générés')
+        parser.add_argument('--password', default='softdesk')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--clear', action='store_true',
+                            help='Supprime d\'abord les utilisateurs du préfixe et toutes leurs données')
+
+    def handle(self, *args, **options):
+        if options['users'] < 1:
+            raise CommandError('--users doit être au moins 1.')
+        rng = random.Random(options['seed'])
+        prefix, batch_size = options['prefix'], options['batch_size']
+        texts = {'title': sentences(rng, 1, 4), 'short': sentences(rng, 3, 40), 'long': sentences(rng, 10, 80)}
+        User = get_user_model()
+        existing = User.objects.filter(username__startswith=f'{prefix}-')
+
+        start = time.perf_counter()
+        with transaction.atomic():
+            if options['clear']:
+                # Les projets d'abord : leurs problèmes et commentaires partent sans mise à jour des compteurs
+                Project.objects.filter(author__in=existing).delete()
+                existing.delete()
+            elif existing.exists():
+                raise CommandError(f'Des utilisateurs « {prefix}-* » existent déjà : utilisez --clear ou un autre --prefix.')
+
+            password = make_password(options['password'])
+            users = User.objects.bulk_create(
+                [User(username=f'{prefix}-{n}', email=f'{prefix}-{n}@example.com', password=password)
+                 for n in range(options['users'])],
+                batch_size=batch_size,
+            )
+            user_ids = [user.pk for user in users]
+
+            projects = Project.objects.bulk_create(
+                [Project(author_id=rng.choice(user_ids), title=rng.choice(texts['title']),
+                         description=rng.choice(texts['short']), type=weighted(rng, PROJECT_TYPES))
+                 for _ in range(options['projects'])],
+                batch_size=batch_size,
+            )
+
+            totals = {'contributors': 0, 'issues': 0, 'comments': 0}
+            for project in projects:
+                self.seed_project(rng, texts, project, user_ids, options, totals)
+            recompute_counters()
+
+        self.stdout.write(
+            f"{len(users)} utilisateurs, {len(projects)} projets, {totals['contributors']} contributeurs, "
+            f"{totals['issues']} problèmes, {totals['comments']} commentaires "
+            f"créés en {time.perf_counter() - start:.1f} s")
+
+    def seed_project(self, rng, texts, project, user_ids, options, totals):
+        """
+        Crée les contributeurs, problèmes et commentaires d'un projet, et son fil d'activité.
+        Les problèmes et commentaires sont écrits par les membres du projet.
+        """
+        batch_size = options['batch_size']
+        count = min(around(rng, options['contributors']), len(user_ids) - 1)
+        contributor_ids = [user_id for user_id in rng.sample(user_ids, count + 1) if user_id != project.author_id]
+        contributor_ids = contributor_ids[:count]
+        Contributor.objects.bulk_create(
+            [Contributor(user_id=user_id, project=project) for user_id in contributor_ids], batch_size=batch_size)
+        members = [project.author_id, *contributor_ids]
+
+        issues = Issue.objects.bulk_create(
+            [Issue(title=f"{rng.choice(ISSUE_VERBS)} {rng.choice(texts['title']).lower()}",
+                   description=rng.choice(texts['long']), priority=weighted(rng, PRIORITIES), tag=weighted(rng, TAGS),
+                   status=weighted(rng, STATUSES), project=project, author_id=rng.choice(members))
+             for _ in range(around(rng, options['issues']))],
+            batch_size=batch_size,
+        )
+        comments = Comment.objects.bulk_create(
+            [Comment(description=rng.choice(texts['short']), author_id=rng.choice(members), issue=issue)
+             for issue in issues for _ in range(around(rng, options['comments']))],
+            batch_size=batch_size,
+        )
+
+        # bulk_create ne déclenche pas les signaux : le fil d'activité est enregistré ici
+        activity.contributors_added(project.pk, contributor_ids)
+        activity.record(project.pk, [activity.issue_activity(issue) for issue in issues]
+                        + [activity.comment_activity(comment, project.pk) for comment in comments])
+
+        totals['contributors'] += len(contributor_ids)
+        totals['issues'] += len(issues)
+        totals['comments'] += len(comments)
@@ -0,0 +1,134 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections, router
+from django.db.models import Q
+
+from .models import Project, Contributor
+
+
+class Membership:
+    """
+    Les projets d'un utilisateur : ceux dont il est l'auteur et ceux auxquels il contribue.
+    Les vérifications de permissions deviennent de simples recherches dans des ensembles.
+    """
+
+    def __init__(self, authored, contributed):
+        self.authored = frozenset(authored)
+        self.contributed = frozenset(contributed)
+        self.visible = self.authored | self.contributed
+
+    def is_author(self, project_id):
+        return project_id in self.authored
+
+    def is_contributor(self, project_id):
+        return project_id in self.contributed
+
+    def can_see(self, project_id):
+        return project_id in self.visible
+
+
+def visible_project_ids(user):
+    """
+    Sous-requête des identifiants des projets visibles par l'utilisateur : ceux dont il est l'auteur,
+    plus ceux auxquels il contribue.
+
+    Les deux branches sont des sous-requêtes indépendantes de la ligne courante (servies par les index
+    sur author et sur (user, project)), que SQLite combine comme une UNION : pas de jointure à dédoublonner.
+    """
+    contributed = Contributor.objects.filter(user=user).values('project_id')
+    return Project.objects.filter(Q(author=user) | Q(pk__in=contributed)).values('pk')
+
+
+def visible_to(user, project_lookup=None):
+    """
+    Condition "projet visible par l'utilisateur", à passer à `filter()`.
+    `project_lookup` est le chemin vers le projet depuis le modèle filtré
+    ('project' pour Issue, 'issue__project' pour Comment, None pour Project).
+    """
+    if project_lookup is None:
+        contributed = Contributor.objects.filter(user=user).values('project_id')
+        return Q(author=user) | Q(pk__in=contributed)
+    return Q(**{f'{project_lookup}__in': visible_project_ids(user)})
+
+
+def project_member_ids(project_id):
+    """
+    L'auteur et les contributeurs d'un projet, en une requête.
+    """
+    author = Project.objects.filter(pk=project_id).values_list('author_id', flat=True)
+    contributors = Contributor.objects.filter(project_id=project_id).values_list('user_id', flat=True)
+    return set(author.union(contributors, all=True))
+
+
+def membership_cache_key(user_id):
+    return f'projects:membership:{user_id}'
+
+
+def load_membership(user):
+    """
+    Calcule l'appartenance de l'utilisateur aux projets avec deux requêtes.
+    Elle décide des permissions : elle est lue sur la base principale, jamais sur un réplica en retard
+    (un contributeur retiré perd l'accès immédiatement).
+    """
+    if not user.is_authenticated:
+        return Membership((), ())
+    authored = Project.objects.using(DEFAULT_DB_ALIAS).filter(author=user).values_list('id', flat=True)
+    contributed = Contributor.objects.using(DEFAULT_DB_ALIAS).filter(user=user).values_list('project_id', flat=True)
+    return Membership(authored, contributed)
+
+
+def get_membership(request):
+    """
+    Renvoie l'appartenance de l'utilisateur connecté, calculée une seule fois par requête.
+
+    Si `MEMBERSHIP_CACHE_TIMEOUT` est défini, elle est aussi mise en cache par utilisateur
+    entre les requêtes (invalidée par les signaux de `projects.signals`).
+    """
+    http_request = getattr(request, '_request', request)
+    membership = getattr(http_request, '_membership', None)
+    if membership is not None:
+        return membership
+
+    user = request.user
+    timeout = getattr(settings, 'MEMBERSHIP_CACHE_TIMEOUT', 0)
+    if timeout and user.is_authenticated:
+        key = membership_cache_key(user.id)
+        membership = cache.get(key)
+        if membership is None:
+            membership = load_membership(user)
+            cache.set(key, membership, timeout)
+    else:
+        membership = load_membership(user)
+
+    http_request._membership = membership
+    return membership
+
+
+def invalidate_membership(*user_ids):
+    """
+    Supprime du cache l'appartenance des utilisateurs donnés.
+    À appeler après toute écriture qui ne déclenche pas de signaux (bulk_create, update...).
+    """
+    cache.delete_many([membership_cache_key(user_id) for user_id in user_ids])
+
+
+def delete_contributors(project_id, user_ids):
+    """
+    Retire les utilisateurs donnés du projet en une requête (DELETE ... RETURNING) et renvoie
+    l'ensemble des utilisateurs effectivement retirés.
+    Comme bulk_create, la suppression ne déclenche pas les signaux : l'appelant applique leurs effets au lot.
+    """
+    if not user_ids:
+        return set()
+    connection = connections[router.db_for_write(Contributor)]
+    quote = connection.ops.quote_name
+    meta = Contributor._meta
+    project_column, user_column = meta.get_field('project').column, meta.get_field('user').column
+    placeholders = ', '.join(['%s'] * len(user_ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {quote(meta.db_table)} WHERE {quote(project_column)} = %s '
+            f'AND {quote(user_column)} IN ({placeholders}) RETURNING {quote(user_column)}',
+            [project_id, *user_ids],
+        )
+        return {user_id for user_id, in cursor.fetchall()}
@@ -0,0 +1,53 @@
+# Generated by Django 4.2.3 on 2026-10-18 00:28
+
+from django.db import migrations, models
+
+
+def remove_duplicate_contributors(apps, schema_editor):
+    """
+    Supprime les doublons (user, project) avant d'ajouter la contrainte d'unicité,
+    en gardant la contribution la plus ancienne.
+    """
+    Contributor = apps.get_model("projects", "Contributor")
+    kept = (
+        Contributor.objects.values("user", "project")
+        .annotate(first_id=models.Min("id"))
+        .values("first_id")
+    )
+    Contributor.objects.exclude(id__in=kept).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0004_cursor_pagination_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_contributors, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                fields=["issue", "created_time"], name="comment_issue_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="issue",
+            index=models.Index(
+                fields=["project", "created_time"], name="issue_project_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="issue",
+            index=models.Index(
+                fields=["project", "status", "priority"],
+                name="issue_project_status_idx",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="contributor",
+            constraint=models.UniqueConstraint(
+                fields=("user", "project"), name="unique_contributor"
+            ),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 4.2.3 on 2026-10-18 00:35
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+# Statuts ouverts à la date de la migration (Issue.OPEN_STATUSES)
+OPEN_STATUSES = ("A_FAIRE", "EN_COURS")
+
+
+def count_subquery(queryset, field):
+    counts = queryset.filter(**{field: OuterRef("pk")}).values(field).annotate(total=Count("pk"))
+    return Coalesce(Subquery(counts.values("total")), Value(0))
+
+
+def fill_counters(apps, schema_editor):
+    """
+    Calcule les compteurs des projets et problèmes existants.
+    """
+    Project = apps.get_model("projects", "Project")
+    Issue = apps.get_model("projects", "Issue")
+    Comment = apps.get_model("projects", "Comment")
+    Project.objects.update(
+        issue_count=count_subquery(Issue.objects.all(), "project"),
+        open_issue_count=count_subquery(Issue.objects.filter(status__in=OPEN_STATUSES), "project"),
+    )
+    Issue.objects.update(comment_count=count_subquery(Comment.objects.all(), "issue"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0005_contributor_unique_and_lookup_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="issue",
+            name="comment_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="issue_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="open_issue_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
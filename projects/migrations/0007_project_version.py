@@ -0,0 +1,18 @@
+# Generated by Django 4.2.3 on 2026-10-18 01:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0006_denormalized_counters"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="project",
+            name="version",
+            field=models.PositiveBigIntegerField(default=1),
+        ),
+    ]
@@ -0,0 +1,69 @@
+from django.db import migrations
+
+# Index FTS5 à contenu externe et triggers qui les tiennent à jour, tels qu'à cette migration.
+# projects.search garde sa propre copie des triggers, réinstallés après chaque migration (post_migrate).
+CREATE_SQL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS projects_issue_fts USING fts5(title, description, "
+    "content='projects_issue', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS projects_issue_fts_ai AFTER INSERT ON projects_issue BEGIN "
+    "INSERT INTO projects_issue_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS projects_issue_fts_ad AFTER DELETE ON projects_issue BEGIN "
+    "INSERT INTO projects_issue_fts(projects_issue_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS projects_issue_fts_au AFTER UPDATE OF title, description ON projects_issue BEGIN "
+    "INSERT INTO projects_issue_fts(projects_issue_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO projects_issue_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "INSERT INTO projects_issue_fts(projects_issue_fts) VALUES('rebuild')",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS projects_comment_fts USING fts5(description, "
+    "content='projects_comment', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS projects_comment_fts_ai AFTER INSERT ON projects_comment BEGIN "
+    "INSERT INTO projects_comment_fts(rowid, description) VALUES (new.id, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS projects_comment_fts_ad AFTER DELETE ON projects_comment BEGIN "
+    "INSERT INTO projects_comment_fts(projects_comment_fts, rowid, description) "
+    "VALUES ('delete', old.id, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS projects_comment_fts_au AFTER UPDATE OF description ON projects_comment BEGIN "
+    "INSERT INTO projects_comment_fts(projects_comment_fts, rowid, description) "
+    "VALUES ('delete', old.id, old.description); "
+    "INSERT INTO projects_comment_fts(rowid, description) VALUES (new.id, new.description); END",
+    "INSERT INTO projects_comment_fts(projects_comment_fts) VALUES('rebuild')",
+]
+
+DROP_SQL = [
+    "DROP TRIGGER IF EXISTS projects_issue_fts_ai",
+    "DROP TRIGGER IF EXISTS projects_issue_fts_ad",
+    "DROP TRIGGER IF EXISTS projects_issue_fts_au",
+    "DROP TABLE IF EXISTS projects_issue_fts",
+    "DROP TRIGGER IF EXISTS projects_comment_fts_ai",
+    "DROP TRIGGER IF EXISTS projects_comment_fts_ad",
+    "DROP TRIGGER IF EXISTS projects_comment_fts_au",
+    "DROP TABLE IF EXISTS projects_comment_fts",
+]
+
+
+def create_search_indexes(apps, schema_editor):
+    """
+    Crée les index FTS5 et leurs triggers, puis indexe les lignes existantes (SQLite uniquement).
+    """
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for statement in CREATE_SQL:
+        schema_editor.execute(statement)
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for statement in DROP_SQL:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0007_project_version"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
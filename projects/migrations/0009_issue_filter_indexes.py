@@ -0,0 +1,21 @@
+# Generated by Django 4.2.3 on 2026-10-18 01:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0008_search_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="issue",
+            index=models.Index(fields=["project", "tag", "created_time"], name="issue_project_tag_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="issue",
+            index=models.Index(fields=["project", "author", "created_time"], name="issue_project_author_idx"),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.3 on 2026-10-18 01:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0009_issue_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="issue",
+            name="issue_project_status_idx",
+        ),
+        migrations.AddIndex(
+            model_name="issue",
+            index=models.Index(fields=["project", "status", "priority", "tag", "comment_count"], name="issue_project_status_idx"),
+        ),
+    ]
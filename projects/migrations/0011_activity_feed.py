@@ -0,0 +1,39 @@
+# Generated by Django 4.2.3 on 2026-10-18 01:31
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("projects", "0010_issue_stats_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Activity",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("verb", models.CharField(choices=[("ISSUE_CREATED", "Problème créé"), ("ISSUE_STATUS_CHANGED", "Statut modifié"), ("COMMENT_CREATED", "Commentaire ajouté"), ("CONTRIBUTOR_ADDED", "Contributeur ajouté"), ("CONTRIBUTOR_REMOVED", "Contributeur retiré")], max_length=20)),
+                ("data", models.JSONField(default=dict)),
+                ("created_time", models.DateTimeField(auto_now_add=True)),
+                ("actor", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="activities", to=settings.AUTH_USER_MODEL)),
+                ("project", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="activities", to="projects.project")),
+            ],
+        ),
+        migrations.CreateModel(
+            name="FeedEntry",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("activity", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="feed_entries", to="projects.activity")),
+                ("user", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="feed_entries", to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="feedentry",
+            constraint=models.UniqueConstraint(fields=("user", "activity"), name="unique_feed_entry"),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 4.2.3 on 2026-10-18 01:40
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F
+
+
+def fill_updated_time(apps, schema_editor):
+    """
+    Les problèmes et commentaires existants sont datés de leur création.
+    """
+    for name in ("Issue", "Comment"):
+        apps.get_model("projects", name).objects.update(updated_time=F("created_time"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0011_activity_feed"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="project",
+            name="updated_time",
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="issue",
+            name="updated_time",
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="comment",
+            name="updated_time",
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_updated_time, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="issue",
+            index=models.Index(fields=["project", "updated_time"], name="issue_project_updated_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(fields=["issue", "updated_time"], name="comment_issue_updated_idx"),
+        ),
+        migrations.CreateModel(
+            name="Tombstone",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("model", models.CharField(choices=[("project", "Projet"), ("issue", "Problème"), ("comment", "Commentaire")], max_length=7)),
+                ("object_id", models.BigIntegerField()),
+                ("scope_id", models.BigIntegerField()),
+                ("deleted_time", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "indexes": [models.Index(fields=["model", "scope_id", "deleted_time"], name="tombstone_scope_idx")],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.3 on 2026-10-18 02:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0012_updated_time_and_tombstones"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="comment",
+            name="comment_created_id_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="comment",
+            name="comment_issue_created_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="issue",
+            name="issue_created_id_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="issue",
+            name="issue_project_created_idx",
+        ),
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                fields=["issue", "created_time", "id"], name="comment_issue_created_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="issue",
+            index=models.Index(
+                fields=["project", "created_time", "id"], name="issue_project_created_id_idx"
+            ),
+        ),
+    ]
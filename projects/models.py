@@ -21,6 +21,18 @@ class Project(models.Model):
     
     # Modèle "Contributor" est un modèle intermédiaire, il représente la relation "contribuer à" entre l'utilisateur et projet.
     contributors = models.ManyToManyField(get_user_model(), through='Contributor', related_name='contributed_projects')
+
+    # Compteurs dénormalisés, maintenus par les signaux (voir projects/counters.py)
+    issue_count = models.PositiveIntegerField(default=0)
+    open_issue_count = models.PositiveIntegerField(default=0)
+
+    # Version du projet, incrémentée à chaque écriture sur le projet, ses contributeurs, problèmes ou commentaires.
+    # Elle sert à calculer l'ETag des réponses (voir projects/conditional.py).
+    version = models.PositiveBigIntegerField(default=1)
+
+    # Date de la dernière modification du projet, de ses contributeurs, problèmes ou commentaires
+    # (les écritures en masse la mettent à jour avec la version). Elle sert à la synchronisation (`?since=`).
+    updated_time = models.DateTimeField(auto_now=True)
     
 
 class Contributor(models.Model):
@@ -34,6 +46,10 @@ class Contributor(models.Model):
     # Clé étrangère vers le modèle Project. Si le projet est supprimé, toutes les contributions à ce projet sont supprimées.
     project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='project_contributors')
 
+    class Meta:
+        # Un utilisateur ne peut contribuer qu'une seule fois au même projet
+        constraints = [models.UniqueConstraint(fields=['user', 'project'], name='unique_contributor')]
+
 
 class Issue(models.Model):
     """
@@ -55,6 +71,9 @@ class Issue(models.Model):
     STATUS_CHOICES = [('A_FAIRE', 'A faire'), 
                       ('EN_COURS', 'En cours'), 
                       ('TERMINE', 'Terminé')]
+
+    # Statuts comptés comme "ouverts" dans Project.open_issue_count
+    OPEN_STATUSES = ('A_FAIRE', 'EN_COURS')
     
     title = models.CharField(max_length=200)
     description = models.TextField()
@@ -71,6 +90,37 @@ class Issue(models.Model):
     # La date et l'heure de la création du prblème
     created_time = models.DateTimeField(auto_now_add=True)
 
+    # La date et l'heure de la dernière modification du problème (ou de son nombre de commentaires)
+    updated_time = models.DateTimeField(auto_now=True)
+
+    # Compteur dénormalisé, maintenu par les signaux (voir projects/counters.py)
+    comment_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            # Problèmes d'un projet, triés par date de création puis identifiant (pagination par curseur)
+            models.Index(fields=['project', 'created_time', 'id'], name='issue_project_created_id_idx'),
+            # Problèmes d'un projet filtrés par statut et priorité ; l'étiquette et le nombre de commentaires
+            # en font un index couvrant pour les statistiques du projet (voir projects/stats.py)
+            models.Index(fields=['project', 'status', 'priority', 'tag', 'comment_count'], name='issue_project_status_idx'),
+            # Problèmes d'un projet filtrés par étiquette ou par auteur, triés par date de création
+            models.Index(fields=['project', 'tag', 'created_time'], name='issue_project_tag_idx'),
+            models.Index(fields=['project', 'author', 'created_time'], name='issue_project_author_idx'),
+            # Problèmes d'un projet modifiés depuis une date (synchronisation)
+            models.Index(fields=['project', 'updated_time'], name='issue_project_updated_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Statut lu en base, pour détecter un changement de statut lors de l'enregistrement
+        instance._loaded_status = instance.__dict__.get('status')
+        return instance
+
+    @property
+    def is_open(self):
+        return self.status in self.OPEN_STATUSES
+
 
 class Comment(models.Model):
     """
@@ -87,3 +137,89 @@ class Comment(models.Model):
     
     # La date et l'heure de la création du commentaire
     created_time = models.DateTimeField(auto_now_add=True)
+
+    # La date et l'heure de la dernière modification du commentaire
+    updated_time = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Commentaires d'un problème, triés par date de création puis identifiant (pagination par curseur)
+            models.Index(fields=['issue', 'created_time', 'id'], name='comment_issue_created_id_idx'),
+            # Commentaires d'un problème modifiés depuis une date (synchronisation)
+            models.Index(fields=['issue', 'updated_time'], name='comment_issue_updated_idx'),
+        ]
+
+
+
+class Activity(models.Model):
+    """
+    Ce modèle représente un évènement d'un projet : création d'un problème, changement de statut,
+    nouveau commentaire, arrivée ou départ d'un contributeur. Il alimente le fil d'activité (voir projects/activity.py).
+    """
+
+    ISSUE_CREATED = 'ISSUE_CREATED'
+    ISSUE_STATUS_CHANGED = 'ISSUE_STATUS_CHANGED'
+    COMMENT_CREATED = 'COMMENT_CREATED'
+    CONTRIBUTOR_ADDED = 'CONTRIBUTOR_ADDED'
+    CONTRIBUTOR_REMOVED = 'CONTRIBUTOR_REMOVED'
+
+    VERB_CHOICES = [(ISSUE_CREATED, 'Problème créé'),
+                    (ISSUE_STATUS_CHANGED, 'Statut modifié'),
+                    (COMMENT_CREATED, 'Commentaire ajouté'),
+                    (CONTRIBUTOR_ADDED, 'Contributeur ajouté'),
+                    (CONTRIBUTOR_REMOVED, 'Contributeur retiré')]
+
+    # Si le projet est supprimé, son activité est supprimée.
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='activities')
+
+    # L'utilisateur à l'origine de l'évènement (le contributeur lui-même pour les arrivées et départs)
+    actor = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, related_name='activities')
+
+    verb = models.CharField(max_length=20, choices=VERB_CHOICES)
+
+    # Détails de l'évènement (identifiant et titre du problème, statuts, identifiant du commentaire...).
+    # Ce ne sont pas des clés étrangères : l'historique reste lisible après la suppression d'un problème.
+    data = models.JSONField(default=dict)
+
+    created_time = models.DateTimeField(auto_now_add=True)
+
+
+class FeedEntry(models.Model):
+    """
+    Ce modèle représente une entrée du fil d'activité d'un utilisateur, écrite pour chaque membre
+    du projet au moment de l'évènement (diffusion à l'écriture, voir projects/activity.py).
+    """
+
+    # Si l'utilisateur ou l'évènement est supprimé, l'entrée est supprimée.
+    user = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, related_name='feed_entries')
+    activity = models.ForeignKey(Activity, on_delete=models.CASCADE, related_name='feed_entries')
+
+    class Meta:
+        # Une entrée par utilisateur et par évènement ; l'index sert aussi à lire le fil, du plus récent au plus ancien
+        constraints = [models.UniqueConstraint(fields=['user', 'activity'], name='unique_feed_entry')]
+
+
+class Tombstone(models.Model):
+    """
+    Ce modèle garde la trace d'une suppression, pour que les clients synchronisés (`?since=`)
+    retirent l'objet de leur copie locale (voir projects/sync.py).
+    """
+
+    PROJECT = 'project'
+    ISSUE = 'issue'
+    COMMENT = 'comment'
+
+    MODEL_CHOICES = [(PROJECT, 'Projet'), (ISSUE, 'Problème'), (COMMENT, 'Commentaire')]
+
+    model = models.CharField(max_length=7, choices=MODEL_CHOICES)
+    object_id = models.BigIntegerField()
+
+    # La liste où l'objet a disparu : l'utilisateur pour un projet (supprimé, ou dont il a été retiré),
+    # le projet pour un problème, le problème pour un commentaire. Ce n'est pas une clé étrangère :
+    # la trace survit à la suppression de son parent.
+    scope_id = models.BigIntegerField()
+
+    deleted_time = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['model', 'scope_id', 'deleted_time'], name='tombstone_scope_idx')]
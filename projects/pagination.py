@@ -0,0 +1,84 @@
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+
+from .models import FeedEntry
+
+
+class KeysetPagination(LimitOffsetPagination):
+    """
+    Pagination par décalage (limit/offset) par défaut, avec un mode curseur (keyset) :
+    on l'active avec `?pagination=cursor` ou dès qu'un paramètre `cursor` est présent.
+
+    En mode curseur, la page N coûte autant que la première page (pas d'OFFSET)
+    et aucune requête COUNT(*) n'est exécutée. Le tri est alors celui du curseur :
+    `?ordering=` et `?search=` (tri par pertinence) sont refusés.
+    """
+
+    # Champs de tri du mode curseur, couverts par un index composite sur le modèle
+    # (précédés du projet ou du problème parent).
+    cursor_ordering = ('created_time', 'id')
+    cursor_query_param = 'cursor'
+    mode_query_param = 'pagination'
+    # Paramètres qui imposent un autre tri que celui du curseur
+    ordering_query_params = ('ordering', 'search')
+
+    cursor_paginator = None
+
+    def is_cursor_mode(self, request):
+        return (
+            self.cursor_query_param in request.query_params
+            or request.query_params.get(self.mode_query_param) == 'cursor'
+        )
+
+    def get_cursor_paginator(self):
+        paginator = CursorPagination()
+        paginator.ordering = self.cursor_ordering
+        paginator.cursor_query_param = self.cursor_query_param
+        # Le paramètre `limit` reste utilisable pour choisir la taille de page.
+        paginator.page_size_query_param = self.limit_query_param
+        paginator.max_page_size = self.max_limit
+        return paginator
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.is_cursor_mode(request):
+            conflicts = [param for param in self.ordering_query_params if request.query_params.get(param)]
+            if conflicts:
+                raise ValidationError({param: ['Incompatible avec la pagination par curseur.'] for param in conflicts})
+            self.cursor_paginator = self.get_cursor_paginator()
+            return self.cursor_paginator.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def to_html(self):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.to_html()
+        return super().to_html()
+
+
+class ProjectKeysetPagination(KeysetPagination):
+    """
+    Pagination des projets : le mode curseur trie sur la clé primaire.
+    """
+
+    cursor_ordering = ('id',)
+
+
+class FeedPagination(CursorPagination):
+    """
+    Pagination par curseur du fil d'activité, du plus récent au plus ancien.
+    Les identifiants des évènements croissent avec le temps : le curseur porte sur l'identifiant
+    de l'évènement, servi par l'index (user, activity) en diffusion à l'écriture.
+    """
+
+    page_size = 20
+    page_size_query_param = 'limit'
+    max_page_size = 100
+
+    def get_ordering(self, request, queryset, view):
+        if queryset.model is FeedEntry:
+            return ('-activity_id',)
+        return ('-id',)
@@ -1,52 +1,67 @@
 from rest_framework import permissions
 from rest_framework.exceptions import PermissionDenied
 
+from .membership import get_membership
+from .models import Project, Comment
+
+
+def get_project_id(obj):
+    """
+    Renvoie l'identifiant du projet d'un projet, d'un problème ou d'un commentaire.
+    """
+    if isinstance(obj, Project):
+        return obj.id
+    if isinstance(obj, Comment):
+        return obj.issue.project_id
+    return obj.project_id
+
+
 class IsAuthor(permissions.BasePermission):
     """
     Vérifie si l'utilisateur qui fait la requête est l'auteur du projet.
     """
-    
+
     def has_object_permission(self, request, view, obj):
-        if request.user == obj.author:
+        if request.user.id == obj.author_id:
             return True
         else:
             raise PermissionDenied("Vous n'êtes pas autorisé, vous n'êtes pas l'auteur de ce projet")
-    
+
 class IsContributor(permissions.BasePermission):
     """
     Vérifie si l'utilisateur qui fait la requête est un contributeur du projet.
     """
-    
+
     def has_object_permission(self, request, view, obj):
-        return obj.contributors.filter(user=request.user).exists()
+        return get_membership(request).is_contributor(get_project_id(obj))
+
 
 
-    
 class IsIssueAuthor(permissions.BasePermission):
     """
    Vérifie si l'utilisateur qui fait la requête est l'auteur du problème.
     """
-    
+
     def has_object_permission(self, request, view, obj):
-        return obj.author == request.user
+        return obj.author_id == request.user.id
+
 
-    
 class IsCommentAuthor(permissions.BasePermission):
     """
     Vérifie si l'utilisateur qui fait la requête est l'auteur du commentaire.
     """
-    
+
     def has_object_permission(self, request, view, obj):
-        return obj.author == request.user
+        return obj.author_id == request.user.id
 
 
 class IsAuthorOrContributor(permissions.BasePermission):
     """
     Vérifie si l'utilisateur qui fait la requête est l'auteur ou un contributeur du projet.
     """
-    
+
     def has_object_permission(self, request, view, obj):
-        is_author_or_contributor = request.user == obj.author or obj.project_contributors.filter(user=request.user).exists()
+        is_author_or_contributor = obj.author_id == request.user.id or get_membership(request).can_see(get_project_id(obj))
         if not is_author_or_contributor:
             raise PermissionDenied("Vous n'êtes pas autorisé à créer un problème pour ce projet")
         return is_author_or_contributor
@@ -56,8 +71,8 @@ class IsIssueAuthorOrContributor(permissions.BasePermission):
     """
     Vérifie si l'utilisateur qui fait la requête est l'auteur ou un contributeur du problème.
     """
-    
+
     def has_object_permission(self, request, view, obj):
-        return request.user == obj.author or obj.project.project_contributors.filter(user=request.user).exists()
+        return obj.author_id == request.user.id or get_membership(request).is_contributor(get_project_id(obj))
 
 
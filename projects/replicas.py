@@ -0,0 +1,148 @@
+"""
+Lectures sur des réplicas de la base : les requêtes en lecture seule (GET, HEAD, OPTIONS) des vues qui
+utilisent `ReplicaReadMixin` sont servies par l'un des alias de `DATABASE_REPLICAS` ; toutes les écritures,
+et toutes les autres requêtes, vont à la base principale (`default`).
+
+Un réplica peut être en retard sur la base principale. Pour qu'un utilisateur voie toujours ses propres
+écritures, une requête qui écrit rend son auteur « collant » pendant `REPLICA_STICKY_SECONDS` secondes :
+ses requêtes suivantes lisent la base principale (le marqueur est dans le cache de Django, qui doit être
+partagé entre les processus : voir `check_shared_cache`). Dans la requête elle-même, les lectures qui suivent une écriture vont aussi à la
+base principale. L'appartenance aux projets, qui décide des permissions, est toujours lue sur la base
+principale (voir `membership.load_membership`).
+
+Sans `DATABASE_REPLICAS`, tout va à la base principale, comme avant.
+"""
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.permissions import SAFE_METHODS
+
+# Aiguillage de la requête en cours (`RequestRouting`), posé par `ReplicaRoutingMiddleware`
+_routing = ContextVar('projects_replica_routing', default=None)
+
+
+class RequestRouting:
+    def __init__(self):
+        # Alias du réplica des lectures de la requête, ou None pour la base principale
+        self.replica = None
+        self.wrote = False
+
+
+def replica_aliases():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+# Caches propres à chaque processus (ou sans mémoire) : le marqueur n'y serait pas vu des autres processus
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Vérification système : avec des réplicas, le cache par défaut doit être partagé entre les processus,
+    sans quoi un utilisateur servi par un autre processus que celui de son écriture peut lire un réplica en retard.
+    """
+    backend = settings.CACHES.get('default', {}).get('BACKEND')
+    if replica_aliases() and backend in PROCESS_LOCAL_CACHES:
+        return [checks.Error(
+            f'DATABASE_REPLICAS est défini mais le cache par défaut ({backend}) est propre à chaque processus.',
+            hint='Utilisez un cache partagé (Redis, Memcached, FileBasedCache sur un même disque) : '
+                 'il garde les utilisateurs qui viennent d\'écrire sur la base principale.',
+            id='projects.E001',
+        )]
+    return []
+
+
+def sticky_key(user_id):
+    return f'projects:replicas:sticky:{user_id}'
+
+
+def reading_from_replica():
+    """
+    Vrai si les lectures de la requête en cours vont à un réplica (données éventuellement en retard).
+    """
+    state = _routing.get()
+    return state is not None and state.replica is not None and not state.wrote
+
+
+def route_to_replica(request):
+    """
+    Envoie les lectures de la requête à un réplica si elle est en lecture seule
+    et si l'utilisateur n'a pas écrit récemment.
+    """
+    state = _routing.get()
+    aliases = replica_aliases()
+    if state is None or not aliases or request.method not in SAFE_METHODS:
+        return
+    user = request.user
+    if user.is_authenticated and cache.get(sticky_key(user.id)):
+        return
+    state.replica = random.choice(aliases)
+
+
+class ReplicaRouter:
+    """
+    Routeur de bases de données (`DATABASE_ROUTERS`) : lectures sur le réplica choisi pour la requête,
+    écritures et migrations sur la base principale.
+    """
+
+    def db_for_read(self, model, **hints):
+        if reading_from_replica():
+            return _routing.get().replica
+        return None
+
+    def db_for_write(self, model, **hints):
+        state = _routing.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Les réplicas sont des copies de la base principale : mêmes objets
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Le schéma des réplicas vient de la réplication
+        if db in replica_aliases():
+            return False
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Pose l'aiguillage de chaque requête et, si elle a écrit, rend son auteur collant à la base principale.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = RequestRouting()
+        token = _routing.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _routing.reset(token)
+
+        # DRF a remplacé `request.user` par l'utilisateur authentifié par son jeton
+        user = getattr(request, 'user', None)
+        if state.wrote and replica_aliases() and user is not None and user.is_authenticated:
+            cache.set(sticky_key(user.id), True, getattr(settings, 'REPLICA_STICKY_SECONDS', 10))
+        return response
+
+
+class ReplicaReadMixin:
+    """
+    Sert les requêtes en lecture seule de la vue depuis un réplica (voir `route_to_replica`).
+    L'utilisateur est authentifié avant, sur la base principale.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        route_to_replica(request)
+        super().initial(request, *args, **kwargs)
@@ -0,0 +1,154 @@
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.response import Response
+
+from .membership import project_member_ids
+from .models import Issue
+from .replicas import reading_from_replica
+
+
+def is_enabled():
+    return bool(getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 0))
+
+
+def get_cache():
+    """
+    Le cache des réponses : un alias de CACHES (mémoire locale, fichiers, Redis...).
+    """
+    return caches[getattr(settings, 'RESPONSE_CACHE_ALIAS', 'default')]
+
+
+def generation_key(scope, pk):
+    return f'projects:response:gen:{scope}:{pk}'
+
+
+def get_generations(scopes):
+    """
+    Renvoie le jeton de génération de chaque portée (('project', pk) ou ('user', pk)).
+    Un jeton absent est créé : les réponses mises en cache avec un ancien jeton ne sont plus lues.
+    """
+    cache = get_cache()
+    keys = [generation_key(scope, pk) for scope, pk in scopes]
+    tokens = cache.get_many(keys)
+    missing = {key: uuid.uuid4().hex for key in keys if key not in tokens}
+    if missing:
+        cache.set_many(missing, None)
+        tokens.update(missing)
+    return [tokens[key] for key in keys]
+
+
+def invalidate(scopes):
+    """
+    Remplace les jetons de génération des portées données par de nouveaux jetons aléatoires
+    (un compteur pourrait revenir à une ancienne valeur après une éviction du cache).
+    """
+    if is_enabled() and scopes:
+        get_cache().set_many({generation_key(scope, pk): uuid.uuid4().hex for scope, pk in scopes}, None)
+
+
+def invalidate_project(project_id, member_lists=True):
+    """
+    Invalide les réponses qui dépendent d'un projet : ses listes imbriquées et,
+    si `member_lists` est vrai, la liste des projets de chacun de ses membres.
+    """
+    if not is_enabled():
+        return
+    scopes = [('project', project_id)]
+    if member_lists:
+        scopes += [('user', user_id) for user_id in project_member_ids(project_id)]
+    invalidate(scopes)
+
+
+def invalidate_issue_project(issue_id):
+    """
+    Invalide les listes imbriquées du projet d'un problème (les commentaires n'apparaissent pas dans la liste des projets).
+    """
+    if is_enabled():
+        project_id = Issue.objects.filter(pk=issue_id).values_list('project_id', flat=True).first()
+        if project_id is not None:
+            invalidate([('project', project_id)])
+
+
+def record(route, outcome):
+    """
+    Compte les succès et les échecs du cache par route.
+    """
+    cache = get_cache()
+    key = f'projects:response:stats:{route}:{outcome}'
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+
+
+def get_stats(routes):
+    """
+    Renvoie {route: {'hits': n, 'misses': n}} pour la supervision.
+    """
+    keys = {(route, outcome): f'projects:response:stats:{route}:{outcome}'
+            for route in routes for outcome in ('hits', 'misses')}
+    values = get_cache().get_many(keys.values())
+    return {
+        route: {outcome: values.get(keys[route, outcome], 0) for outcome in ('hits', 'misses')}
+        for route in routes
+    }
+
+
+class ResponseCacheMixin:
+    """
+    Met en cache la réponse de l'action `list` par utilisateur, route (`basename` du routeur)
+    et paramètres de requête.
+
+    La clé contient les jetons de génération des portées de `cache_scopes` : les signaux
+    de projects/signals.py les renouvellent à chaque écriture, ce qui invalide précisément
+    les réponses concernées sans parcourir le cache.
+    """
+
+    # Portées de la réponse, obligatoires : couples (portée, argument d'URL qui l'identifie),
+    # l'argument None désignant l'utilisateur de la requête. Par exemple [('project', 'project_pk')].
+    cache_scopes = None
+
+    @classmethod
+    def as_view(cls, *args, **kwargs):
+        if not cls.cache_scopes:
+            raise ImproperlyConfigured(f'{cls.__name__} doit définir cache_scopes.')
+        return super().as_view(*args, **kwargs)
+
+    def get_cache_scopes(self):
+        return [(scope, self.request.user.id if kwarg is None else self.kwargs[kwarg])
+                for scope, kwarg in self.cache_scopes]
+
+    def get_cache_key(self, request):
+        digest = hashlib.sha256()
+        parts = [request.user.id, request.get_full_path(), request.accepted_renderer.format]
+        for part in parts + get_generations(self.get_cache_scopes()):
+            digest.update(str(part).encode())
+            digest.update(b'\0')
+        return f'projects:response:{self.basename}:{digest.hexdigest()}'
+
+    def cached(self, handler, request, *args, **kwargs):
+        if not is_enabled() or request.method != 'GET':
+            return handler(request, *args, **kwargs)
+
+        cache = get_cache()
+        key = self.get_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            record(self.basename, 'hits')
+            return Response(data)
+
+        record(self.basename, 'misses')
+        response = handler(request, *args, **kwargs)
+        # Une réponse lue sur un réplica peut précéder la dernière écriture : elle ne doit pas
+        # être servie à tous sous la génération actuelle
+        if isinstance(response, Response) and response.status_code == 200 and not reading_from_replica():
+            cache.set(key, response.data, settings.RESPONSE_CACHE_TIMEOUT)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached(super().list, request, *args, **kwargs)
@@ -0,0 +1,99 @@
+"""
+Recherche plein texte (`?search=`) sur les problèmes et les commentaires.
+
+Sous SQLite, les index sont des tables virtuelles FTS5 à contenu externe (le texte n'est pas dupliqué),
+tenues à jour par des triggers : les écritures en masse (bulk_create, update(), suppressions en cascade)
+sont indexées comme les autres. Les résultats sont triés par pertinence (bm25).
+Sur une autre base, la recherche retombe sur `icontains`.
+"""
+import re
+
+from django.db import connection, connections
+from django.db.models import Q
+
+# Table indexée -> (table FTS5, colonnes indexées)
+SEARCH_INDEXES = {
+    'projects_issue': ('projects_issue_fts', ('title', 'description')),
+    'projects_comment': ('projects_comment_fts', ('description',)),
+}
+
+
+def trigger_sql(table):
+    """
+    Triggers d'insertion, de suppression et de modification du texte.
+    Les mises à jour des autres colonnes (compteurs, statut...) ne touchent pas l'index.
+    """
+    fts_table, columns = SEARCH_INDEXES[table]
+    names = ', '.join(columns)
+    new = ', '.join(f'new.{column}' for column in columns)
+    old = ', '.join(f'old.{column}' for column in columns)
+    insert = f'INSERT INTO {fts_table}(rowid, {names}) VALUES (new.id, {new});'
+    delete = f"INSERT INTO {fts_table}({fts_table}, rowid, {names}) VALUES ('delete', old.id, {old});"
+    return [
+        f'CREATE TRIGGER IF NOT EXISTS {fts_table}_ai AFTER INSERT ON {table} BEGIN {insert} END',
+        f'CREATE TRIGGER IF NOT EXISTS {fts_table}_ad AFTER DELETE ON {table} BEGIN {delete} END',
+        f'CREATE TRIGGER IF NOT EXISTS {fts_table}_au AFTER UPDATE OF {names} ON {table} BEGIN {delete} {insert} END',
+    ]
+
+
+def install_triggers(using=None, **kwargs):
+    """
+    Recrée les triggers manquants (signal post_migrate).
+
+    SQLite supprime les triggers d'une table quand une migration la reconstruit (ajout d'une colonne
+    NOT NULL, par exemple) ; les lignes copiées gardent leur identifiant, l'index reste donc valide.
+    """
+    target = connections[using] if using else connection
+    if target.vendor != 'sqlite' or not is_installed(target):
+        return
+    with target.cursor() as cursor:
+        for table in SEARCH_INDEXES:
+            for statement in trigger_sql(table):
+                cursor.execute(statement)
+
+
+def is_installed(target=connection):
+    return set(fts_table for fts_table, _ in SEARCH_INDEXES.values()) <= set(target.introspection.table_names())
+
+
+def match_expression(text):
+    """
+    Transforme la saisie de l'utilisateur en requête FTS5 : chaque mot est cherché comme préfixe
+    ("bug" trouve "bugs"), tous les mots doivent être présents. La syntaxe FTS5 n'est pas exposée.
+    """
+    return ' '.join(f'"{word}"*' for word in re.findall(r'\w+', text))
+
+
+def search(queryset, text):
+    """
+    Filtre la queryset (problèmes ou commentaires) sur `text` et la trie par pertinence.
+    """
+    words = match_expression(text)
+    if not words:
+        return queryset.none()
+
+    table = queryset.model._meta.db_table
+    fts_table, columns = SEARCH_INDEXES[table]
+    if connection.vendor != 'sqlite':
+        condition = Q()
+        for word in re.findall(r'\w+', text):
+            condition &= Q(*(Q(**{f'{column}__icontains': word}) for column in columns), _connector=Q.OR)
+        return queryset.filter(condition)
+
+    # Jointure sur l'index : bm25() n'est disponible que dans la requête MATCH elle-même
+    return queryset.extra(
+        tables=[fts_table],
+        where=[f'{fts_table}.rowid = {table}.id', f'{fts_table} MATCH %s'],
+        params=[words],
+        select={'search_rank': f'bm25({fts_table})'},
+        order_by=['search_rank', 'id'],
+    )
+
+
+def search_param(request):
+    """
+    Le texte de `?search=` d'une requête de lecture, ou None.
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return None
+    return request.query_params.get('search') or None
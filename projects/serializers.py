@@ -1,6 +1,57 @@
 from rest_framework import serializers
+from rest_framework.reverse import reverse
 from django.contrib.auth import get_user_model
-from .models import Project, Contributor, Issue, Comment
+from .models import Project, Contributor, Issue, Comment, Activity
+
+
+def get_sparse_params(request):
+    """
+    Lit les paramètres `?fields=id,title` et `?expand=comments,author` d'une requête de lecture.
+    Renvoie (fields, expand) : `fields` vaut None si tous les champs sont demandés,
+    et les deux valent None si aucun des paramètres n'est présent (représentation complète).
+    """
+    if request is None or request.method not in ('GET', 'HEAD'):
+        return None, None
+    params = request.query_params
+    if 'fields' not in params and 'expand' not in params:
+        return None, None
+
+    def split(name):
+        return {value.strip() for value in params.get(name, '').split(',') if value.strip()}
+
+    return (split('fields') if 'fields' in params else None), split('expand')
+
+
+class SparseFieldsMixin:
+    """
+    Applique `?fields=` et `?expand=` au sérialiseur racine.
+
+    Les relations imbriquées listées dans `expandable_fields` ne sont développées que si elles
+    sont demandées dans `?expand=` ; sinon elles sont remplacées par leur identifiant
+    (si la fabrique associée n'est pas None) ou retirées.
+
+    `field_columns` associe un champ calculé aux champs du modèle qu'il lit : ils sont chargés
+    avec lui quand `?fields=` restreint les colonnes (voir `load_relations` dans views.py).
+    """
+
+    expandable_fields = {}
+    field_columns = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields, expand = get_sparse_params(self.context.get('request'))
+        if expand is None:
+            return
+
+        for name in list(self.fields):
+            if fields is not None and name not in fields | expand:
+                self.fields.pop(name)
+            elif name in self.expandable_fields and name not in expand:
+                collapsed = self.expandable_fields[name]
+                if collapsed is None:
+                    self.fields.pop(name)
+                else:
+                    self.fields[name] = collapsed()
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -24,7 +75,7 @@ class ContributorSerializer(serializers.ModelSerializer):
         fields = ['id', 'user', 'project']  
    
    
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Ce sérialiseur est utilisé pour convertir les objets Comment en format JSON.
     """
@@ -34,27 +85,111 @@ class CommentSerializer(serializers.ModelSerializer):
     # Utilise un champ lié à la clé primaire pour le champ 'issue'.
     issue = serializers.PrimaryKeyRelatedField(read_only=True)
 
+    expandable_fields = {'author': lambda: serializers.PrimaryKeyRelatedField(read_only=True)}
+
     class Meta:
         model = Comment
         fields = ['id', 'description', 'author', 'issue', 'created_time']     
         
-class IssueSerializer(serializers.ModelSerializer):
+class IssueSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Ce sérialiseur est utilisé pour convertir les objets Issue en format JSON.
     """
     
     author = UserSerializer(read_only=True)
-    comments = CommentSerializer(many=True, read_only=True)
+
+    # Aperçu des derniers commentaires seulement : la liste complète est paginée sur `comments_url`.
+    comments = serializers.SerializerMethodField()
+    comments_url = serializers.SerializerMethodField()
     
     # Utilise un champ lié à la clé primaire pour le champ 'project'.
     project = serializers.PrimaryKeyRelatedField(read_only=True)
 
+    # Nombre de commentaires de l'aperçu
+    comment_preview_size = 3
+
+    expandable_fields = {
+        'author': lambda: serializers.PrimaryKeyRelatedField(read_only=True),
+        'comments': None,
+    }
+
+    # Le lien des commentaires lit le projet du problème
+    field_columns = {'comments_url': ['project']}
+
     class Meta:
         model = Issue
-        fields = ['id', 'title', 'description', 'priority', 'tag', 'status', 'project', 'author', 'created_time', 'comments']
+        fields = ['id', 'title', 'description', 'priority', 'tag', 'status', 'project', 'author', 'created_time', 'comment_count', 'comments', 'comments_url']
+        read_only_fields = ['comment_count']
+
+    def get_comments(self, obj):
+        """
+        Les derniers commentaires du problème, du plus récent au plus ancien.
+        Ils sont normalement préchargés pour toute la page (voir `latest_comments` dans views.py).
+        """
+        comments = getattr(obj, 'latest_comments', None)
+        if comments is None:
+            comments = obj.comments.select_related('author').order_by('-created_time', '-id')[:self.comment_preview_size]
+        return CommentSerializer(comments, many=True).data
+
+    def get_comments_url(self, obj):
+        return reverse('issue-comments-list', kwargs={'project_pk': obj.project_id, 'issue_pk': obj.pk},
+                       request=self.context.get('request'))
+
+
+class ChoiceListField(serializers.ListField):
+    """
+    Liste de choix lue dans les paramètres de requête : `?status=A_FAIRE,EN_COURS`
+    ou `?status=A_FAIRE&status=EN_COURS`.
+    """
+
+    def __init__(self, choices, **kwargs):
+        super().__init__(child=serializers.ChoiceField(choices=choices), allow_empty=False, **kwargs)
+
+    def to_internal_value(self, data):
+        if isinstance(data, str):
+            data = [data]
+        values = [value.strip() for item in data for value in str(item).split(',') if value.strip()]
+        return super().to_internal_value(values)
 
 
-class ProjectSerializer(serializers.ModelSerializer):
+class IssueFilterSerializer(serializers.Serializer):
+    """
+    Ce sérialiseur valide les filtres et le tri de la liste des problèmes d'un projet.
+    Les valeurs de statut, de priorité et d'étiquette sont celles des choix du modèle Issue.
+    """
+
+    # Tris autorisés ; la priorité et le statut sont triés dans l'ordre de leurs choix (FAIBLE < MOYEN < ELEVEE)
+    orderings = ['created_time', '-created_time', 'priority', '-priority', 'status', '-status']
+
+    status = ChoiceListField(Issue.STATUS_CHOICES, required=False)
+    priority = ChoiceListField(Issue.PRIORITY_CHOICES, required=False)
+    tag = ChoiceListField(Issue.TAG_CHOICES, required=False)
+    author = serializers.IntegerField(min_value=1, required=False)
+    created_after = serializers.DateTimeField(required=False)
+    ordering = serializers.ChoiceField(choices=orderings, required=False)
+
+
+class IssueBulkUpdateSerializer(serializers.Serializer):
+    """
+    Ce sérialiseur valide une modification en masse de problèmes : leurs identifiants,
+    et le statut, la priorité ou l'étiquette à leur appliquer.
+    """
+
+    # Nombre maximal de problèmes par modification en masse
+    max_issues = 1000
+
+    ids = serializers.ListField(child=serializers.IntegerField(), min_length=1, max_length=max_issues)
+    status = serializers.ChoiceField(choices=Issue.STATUS_CHOICES, required=False)
+    priority = serializers.ChoiceField(choices=Issue.PRIORITY_CHOICES, required=False)
+    tag = serializers.ChoiceField(choices=Issue.TAG_CHOICES, required=False)
+
+    def validate(self, data):
+        if not {'status', 'priority', 'tag'} & set(data):
+            raise serializers.ValidationError("Indiquez au moins un champ à modifier : status, priority ou tag.")
+        return data
+
+
+class ProjectSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Ce sérialiseur est utilisé pour convertir les objets Project en format JSON.
     """
@@ -65,7 +200,8 @@ class ProjectSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Project
-        fields = ['id', 'title', 'description', 'type', 'author', 'contributors']  
+        fields = ['id', 'title', 'description', 'type', 'author', 'contributors', 'issue_count', 'open_issue_count']
+        read_only_fields = ['issue_count', 'open_issue_count']
 
 
 class ProjectDetailSerializer(ProjectSerializer):
@@ -76,5 +212,19 @@ class ProjectDetailSerializer(ProjectSerializer):
     issues = IssueSerializer(many=True, read_only=True)
     comments = CommentSerializer(many=True, read_only=True)
 
+    expandable_fields = {'issues': None, 'comments': None}
+
     class Meta(ProjectSerializer.Meta):
-        fields = ProjectSerializer.Meta.fields + ['issues', 'comments']
\ No newline at end of file
+        fields = ProjectSerializer.Meta.fields + ['issues', 'comments']
+
+
+class ActivitySerializer(serializers.ModelSerializer):
+    """
+    Ce sérialiseur est utilisé pour convertir les évènements du fil d'activité en format JSON.
+    """
+
+    actor = UserSerializer(read_only=True)
+
+    class Meta:
+        model = Activity
+        fields = ['id', 'verb', 'project', 'actor', 'data', 'created_time']
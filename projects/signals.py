@@ -0,0 +1,180 @@
+from django.contrib.auth import get_user_model
+from django.db.models import Q
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from . import activity, counters, events, response_cache
+from .models import Project, Contributor, Issue, Comment, Tombstone
+from .membership import invalidate_membership
+from .sync import record_deletion
+
+
+def deleting(origin, model):
+    """
+    Vrai si la suppression en cours a été lancée sur un objet de `model` (instance ou queryset).
+    """
+    return getattr(origin, 'model', type(origin)) is model
+
+
+@receiver([post_save, post_delete], sender=Contributor)
+def contributor_changed(sender, instance, origin=None, **kwargs):
+    """
+    L'ajout ou le retrait d'un contributeur modifie l'appartenance de cet utilisateur,
+    et la version du projet.
+    """
+    invalidate_membership(instance.user_id)
+    response_cache.invalidate([('user', instance.user_id)])
+    if not isinstance(origin, Project):
+        counters.touch_project(instance.project_id)
+        response_cache.invalidate_project(instance.project_id)
+
+
+@receiver(post_save, sender=Contributor)
+def contributor_saved(sender, instance, created, **kwargs):
+    if created:
+        activity.contributors_added(instance.project_id, [instance.user_id])
+        events.publish_on_commit(events.contributor_event('added', instance.project_id, instance.user_id))
+
+
+def remembered(origin, name, compute):
+    """
+    La valeur `compute()` conservée sur `origin` (instance ou queryset), commune à tous les signaux
+    de la suppression : elle n'est lue qu'une fois, quel que soit le nombre de lignes supprimées.
+    """
+    if not hasattr(origin, name):
+        setattr(origin, name, compute())
+    return getattr(origin, name)
+
+
+def deleted_user_ids(origin):
+    """
+    Les identifiants des utilisateurs en cours de suppression (`origin` : instance ou queryset).
+    """
+    if isinstance(origin, get_user_model()):
+        return {origin.pk}
+    return remembered(origin, '_deleted_user_ids', lambda: set(origin.values_list('pk', flat=True)))
+
+
+def deleted_project_ids(origin):
+    """
+    Les projets supprimés avec leur auteur, pendant une suppression d'utilisateurs.
+    """
+    return remembered(origin, '_deleted_project_ids', lambda: set(
+        Project.objects.filter(author_id__in=deleted_user_ids(origin)).values_list('pk', flat=True)))
+
+
+def deleted_issue_ids(origin):
+    """
+    Les problèmes supprimés pendant une suppression d'utilisateurs : ceux de leurs projets et ceux qu'ils ont écrits.
+    """
+    return remembered(origin, '_deleted_issue_ids', lambda: set(Issue.objects.filter(
+        Q(project_id__in=deleted_project_ids(origin)) | Q(author_id__in=deleted_user_ids(origin))
+    ).values_list('pk', flat=True)))
+
+
+def issue_deleted_with(origin, issue_id):
+    """
+    Vrai si le problème est supprimé avec son auteur ou celui de son projet, par la même opération que la ligne en cours.
+    """
+    return deleting(origin, get_user_model()) and issue_id in deleted_issue_ids(origin)
+
+
+def project_deleted_with(origin, project_id):
+    """
+    Vrai si le projet est supprimé par la même opération que la ligne en cours (directement ou avec son auteur).
+    """
+    return deleting(origin, Project) or (
+        deleting(origin, get_user_model()) and project_id in deleted_project_ids(origin))
+
+
+@receiver(post_delete, sender=Contributor)
+def contributor_deleted(sender, instance, origin=None, **kwargs):
+    # Le projet disparaît de la liste de l'ancien contributeur, sauf si c'est l'utilisateur qui est supprimé
+    user_deleted = deleting(origin, get_user_model())
+    if user_deleted and instance.user_id in deleted_user_ids(origin):
+        return
+    record_deletion(Tombstone.PROJECT, instance.project_id, instance.user_id)
+    # Rien à annoncer si le projet est en cours de suppression, seul ou avec son auteur
+    if not user_deleted and not deleting(origin, Project):
+        activity.contributors_removed(instance.project_id, [instance.user_id])
+        events.publish_on_commit(events.contributor_event('removed', instance.project_id, instance.user_id))
+
+
+@receiver([post_save, post_delete], sender=Project)
+def project_changed(sender, instance, **kwargs):
+    """
+    La création ou la suppression d'un projet modifie l'appartenance de son auteur.
+    """
+    invalidate_membership(instance.author_id)
+    response_cache.invalidate([('user', instance.author_id), ('project', instance.pk)])
+
+
+@receiver(post_delete, sender=Project)
+def project_deleted(sender, instance, **kwargs):
+    # Les contributeurs reçoivent leur trace avec la suppression de leur contribution
+    record_deletion(Tombstone.PROJECT, instance.pk, instance.author_id)
+    events.publish_on_commit(events.project_event('deleted', instance))
+
+
+@receiver(post_save, sender=Project)
+def project_saved(sender, instance, created, **kwargs):
+    if created:
+        # L'auteur reçoit les évènements de son nouveau projet
+        events.publish_on_commit(events.project_event('created', instance))
+    else:
+        counters.touch_project(instance.pk)
+        response_cache.invalidate_project(instance.pk)
+
+
+@receiver(post_save, sender=Issue)
+def issue_saved(sender, instance, created, **kwargs):
+    """
+    Maintient les compteurs et la version du projet à la création et à la modification d'un problème.
+    """
+    old_status = getattr(instance, '_loaded_status', None)
+    if created:
+        counters.issue_created(instance)
+        activity.issues_created(instance.project_id, [instance])
+    else:
+        counters.issue_updated(instance, old_status)
+        if old_status is not None and old_status != instance.status:
+            # Seul l'auteur d'un problème peut le modifier
+            activity.issue_status_changed(instance, old_status, instance.author_id)
+    instance._loaded_status = instance.status
+    events.publish_on_commit(events.issue_event('created' if created else 'updated', instance))
+
+    # La liste des projets n'affiche que les compteurs de problèmes
+    response_cache.invalidate_project(instance.project_id, member_lists=created or old_status != instance.status)
+
+
+@receiver(post_delete, sender=Issue)
+def issue_deleted(sender, instance, origin=None, **kwargs):
+    # Inutile de mettre à jour un projet en cours de suppression ; la trace du projet suffit aux clients synchronisés
+    if not project_deleted_with(origin, instance.project_id):
+        counters.issue_deleted(instance)
+        response_cache.invalidate_project(instance.project_id)
+        record_deletion(Tombstone.ISSUE, instance.pk, instance.project_id)
+        events.publish_on_commit(events.issue_event('deleted', instance))
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, **kwargs):
+    if created:
+        counters.comment_created(instance)
+        activity.comment_created(instance, instance.issue.project_id)
+    else:
+        counters.touch_issue_project(instance.issue_id)
+    response_cache.invalidate_issue_project(instance.issue_id)
+    events.publish_on_commit(events.comment_event('created' if created else 'updated', instance,
+                                                  instance.issue.project_id))
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, origin=None, **kwargs):
+    # Inutile de mettre à jour un problème en cours de suppression (directement, avec son projet ou avec
+    # son auteur ou celui du projet) ; la trace du projet ou du problème suffit aux clients synchronisés
+    if not deleting(origin, Project) and not deleting(origin, Issue) and not issue_deleted_with(origin, instance.issue_id):
+        counters.comment_deleted(instance)
+        response_cache.invalidate_issue_project(instance.issue_id)
+        record_deletion(Tombstone.COMMENT, instance.pk, instance.issue_id)
+        events.publish_on_commit(events.comment_event('deleted', instance, instance.issue.project_id))
@@ -0,0 +1,180 @@
+"""
+Flux Server-Sent Events des évènements de projets, servi sous ASGI (config/asgi.py) à l'adresse `SSE_PATH`.
+
+    GET /events/                 tous les projets visibles par l'utilisateur
+    GET /events/?project=<id>    un seul projet
+
+Le flux reçoit les évènements de `projects.events` (problèmes et commentaires créés, modifiés ou supprimés,
+contributeurs ajoutés ou retirés, projets créés ou supprimés) :
+
+    id: 42
+    event: issue.updated
+    data: {"type": "issue.updated", "project": 3, "issue": 17, "data": {...}, "id": 42}
+
+et un commentaire toutes les `SSE_KEEPALIVE` secondes pour garder la connexion ouverte. Un abonné trop lent
+reçoit `event: resync` et le flux est fermé. Les évènements ne sont pas conservés : après une reconnexion
+ou un `resync`, le client rattrape ce qu'il a manqué avec la synchronisation incrémentale (`?since=`).
+
+Le flux est une application ASGI devant celle de Django : un abonné inactif n'occupe ni thread ni connexion
+à la base, seulement une coroutine en attente. Django 4.2 ne détecte pas la déconnexion d'un client pendant
+une `StreamingHttpResponse` ; ici, `http.disconnect` termine le flux et l'abonnement.
+"""
+import asyncio
+import io
+import json
+import weakref
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import close_old_connections
+from rest_framework import exceptions
+
+from authentication.authentication import CachedJWTAuthentication
+
+from .events import get_bus
+from .membership import load_membership
+
+SSE_PATH = '/events/'
+
+# Délai de reconnexion conseillé au client (ms)
+RETRY_MS = 5000
+
+
+class EventStreamApplication:
+    """
+    Sert `SSE_PATH` et transmet toutes les autres requêtes à l'application ASGI de Django.
+    """
+
+    def __init__(self, application):
+        self.application = application
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http' and scope['path'] == SSE_PATH:
+            await event_stream(scope, receive, send)
+        else:
+            await self.application(scope, receive, send)
+
+
+def load_projects(user, project_filter):
+    """
+    Les projets visibles du flux, ou None si le projet demandé n'est pas visible.
+    Comme le gestionnaire de Django, rend la connexion à la base à la fin.
+    """
+    try:
+        visible = load_membership(user).visible
+    finally:
+        close_old_connections()
+    if project_filter is None:
+        return visible
+    return {project_filter} if project_filter in visible else None
+
+
+async def respond(send, status, detail, headers=()):
+    """
+    Réponse JSON d'erreur, avec le même corps que le gestionnaire d'exceptions de DRF.
+    """
+    await send({'type': 'http.response.start', 'status': status,
+                'headers': [(b'content-type', b'application/json'), *headers]})
+    await send({'type': 'http.response.body', 'body': json.dumps({'detail': str(detail)}).encode()})
+
+
+def frame(event, data):
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {data}\n\n".encode()
+
+
+async def wait_disconnect(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+# Tâche de signes de vie de chaque boucle d'évènements
+keepalive_tasks = weakref.WeakKeyDictionary()
+
+
+async def send_keepalives(bus, loop):
+    """
+    Toutes les `SSE_KEEPALIVE` secondes, un signe de vie pour les flux inactifs de la boucle ;
+    s'arrête quand la boucle n'a plus de flux.
+    """
+    while True:
+        await asyncio.sleep(getattr(settings, 'SSE_KEEPALIVE', 15))
+        if not bus.keepalive(loop):
+            return
+
+
+def start_keepalives(bus):
+    loop = asyncio.get_running_loop()
+    task = keepalive_tasks.get(loop)
+    if task is None or task.done():
+        keepalive_tasks[loop] = loop.create_task(send_keepalives(bus, loop))
+
+
+async def write_events(subscription, send):
+    """
+    Envoie les évènements de l'abonnement jusqu'à un débordement.
+    """
+    while True:
+        delivery = await subscription.get()
+        if subscription.overflowed:
+            await send({'type': 'http.response.body', 'body': b'event: resync\ndata: {}\n\n'})
+            return
+        body = frame(*delivery) if delivery is not None else b': keepalive\n\n'
+        await send({'type': 'http.response.body', 'body': body, 'more_body': True})
+
+
+async def subscribe(scope):
+    """
+    Authentifie la requête et abonne l'utilisateur aux projets du flux ; lève une `APIException` sinon.
+    Seul l'abonnement reste en mémoire pendant le flux (pas la requête ni l'utilisateur).
+    """
+    if scope['method'] != 'GET':
+        raise exceptions.MethodNotAllowed(scope['method'])
+    request = ASGIRequest(scope, io.BytesIO())
+    result = await CachedJWTAuthentication().aauthenticate(request)
+    if result is None:
+        raise exceptions.NotAuthenticated()
+    user = result[0]
+
+    try:
+        project_filter = int(request.GET['project']) if 'project' in request.GET else None
+    except ValueError:
+        raise exceptions.NotFound()
+    project_ids = await sync_to_async(load_projects)(user, project_filter)
+    if project_ids is None:
+        raise exceptions.NotFound()
+    return get_bus().subscribe(user.pk, project_ids, project_filter=project_filter)
+
+
+async def event_stream(scope, receive, send):
+    try:
+        subscription = await subscribe(scope)
+    except exceptions.APIException as exc:
+        headers = []
+        if isinstance(exc, exceptions.MethodNotAllowed):
+            headers.append((b'allow', b'GET'))
+        elif isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+            headers.append((b'www-authenticate', b'Bearer realm="api"'))
+        await respond(send, exc.status_code, exc.detail, headers)
+        return
+
+    # Abonné avant l'envoi des en-têtes : aucun évènement validé après la réponse n'est manqué
+    start_keepalives(subscription.bus)
+    tasks = []
+    try:
+        await send({'type': 'http.response.start', 'status': 200, 'headers': [
+            (b'content-type', b'text/event-stream'),
+            (b'cache-control', b'no-cache'),
+            # Pas de mise en tampon par un proxy nginx
+            (b'x-accel-buffering', b'no'),
+        ]})
+        await send({'type': 'http.response.body', 'body': f'retry: {RETRY_MS}\n\n'.encode(), 'more_body': True})
+        writer = asyncio.ensure_future(write_events(subscription, send))
+        tasks = [writer, asyncio.ensure_future(wait_disconnect(receive))]
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        if writer in done:
+            writer.result()
+    finally:
+        for task in tasks:
+            task.cancel()
+        subscription.bus.unsubscribe(subscription)
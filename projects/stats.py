@@ -0,0 +1,157 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Count
+
+from .models import Issue, Comment
+
+# Tranches de la distribution du nombre de commentaires par problème : (libellé, minimum, maximum inclus)
+COMMENT_BUCKETS = [('0', 0, 0), ('1-2', 1, 2), ('3-5', 3, 5), ('6-10', 6, 10), ('11+', 11, None)]
+
+# Nombre de contributeurs les plus actifs renvoyés
+TOP_CONTRIBUTORS = 10
+
+
+# Durée maximale d'un calcul en cours : au-delà, un calcul interrompu n'empêche plus les suivants
+STATS_LOCK_TIMEOUT = 60
+
+# Attente maximale (en secondes) du calcul d'une autre requête, et intervalle entre deux lectures du cache
+STATS_LOCK_WAIT = 5
+STATS_LOCK_POLL = 0.05
+
+
+def stats_cache_key(project_id, version):
+    return f'projects:stats:{project_id}:{version}'
+
+
+def stats_latest_key(project_id):
+    return f'projects:stats:latest:{project_id}'
+
+
+def stats_lock_key(project_id):
+    return f'projects:stats:lock:{project_id}'
+
+
+def comment_bucket(comment_count):
+    """
+    Numéro de la tranche d'un nombre de commentaires.
+    """
+    for index, (_, low, high) in enumerate(COMMENT_BUCKETS):
+        if comment_count >= low and (high is None or comment_count <= high):
+            return index
+
+
+def top_authors(queryset):
+    """
+    Les auteurs les plus actifs de la queryset (problèmes ou commentaires) : [(identifiant, nombre)].
+    Le regroupement se fait sur l'identifiant seul, sans jointure sur les utilisateurs.
+    """
+    rows = queryset.values('author_id').annotate(count=Count('id')).order_by('-count', 'author_id')
+    return [(row['author_id'], row['count']) for row in rows[:TOP_CONTRIBUTORS]]
+
+
+def issue_groups(project):
+    """
+    Nombre de problèmes du projet par statut, priorité, étiquette et nombre de commentaires.
+    """
+    return (
+        Issue.objects.filter(project=project)
+        .values('status', 'priority', 'tag', 'comment_count')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+
+
+def compute_stats(project):
+    """
+    Statistiques d'un projet en trois requêtes GROUP BY (plus la lecture des noms des auteurs retenus) :
+      - les problèmes groupés par statut, priorité, étiquette et nombre de commentaires
+        (un seul parcours de l'index couvrant `issue_project_status_idx`, les répartitions sont additionnées ensuite) ;
+      - les auteurs de problèmes les plus actifs ;
+      - les auteurs de commentaires les plus actifs.
+    """
+    by_status = {value: 0 for value, _ in Issue.STATUS_CHOICES}
+    by_priority = {value: 0 for value, _ in Issue.PRIORITY_CHOICES}
+    by_tag = {value: 0 for value, _ in Issue.TAG_CHOICES}
+    by_comments = [0] * len(COMMENT_BUCKETS)
+
+    total = 0
+    for group in issue_groups(project):
+        count = group['count']
+        total += count
+        by_status[group['status']] += count
+        by_priority[group['priority']] += count
+        by_tag[group['tag']] += count
+        by_comments[comment_bucket(group['comment_count'])] += count
+
+    issue_authors = top_authors(Issue.objects.filter(project=project))
+    comment_authors = top_authors(Comment.objects.filter(issue__project=project))
+    # Les noms ne sont lus que pour les auteurs retenus, en une seule requête
+    author_ids = {author_id for author_id, _ in issue_authors + comment_authors}
+    usernames = dict(get_user_model().objects.filter(pk__in=author_ids).values_list('pk', 'username'))
+
+    def contributors(rows):
+        return [{'id': author_id, 'username': usernames.get(author_id), 'count': count} for author_id, count in rows]
+
+    return {
+        'issue_count': total,
+        'issues_by_status': by_status,
+        'issues_by_priority': by_priority,
+        'issues_by_tag': by_tag,
+        'comments_per_issue': {label: count for (label, _, _), count in zip(COMMENT_BUCKETS, by_comments)},
+        'top_issue_authors': contributors(issue_authors),
+        'top_comment_authors': contributors(comment_authors),
+    }
+
+
+def cached_entry(project):
+    """
+    L'entrée en cache qui peut être servie pour la version courante du projet, ou None.
+
+    Avec `PROJECT_STATS_TTL` > 0, le dernier calcul est aussi servi pendant ce nombre de secondes,
+    même si le projet a été modifié depuis.
+    """
+    entry = cache.get(stats_cache_key(project.pk, project.version))
+    ttl = getattr(settings, 'PROJECT_STATS_TTL', 0)
+    if entry is None and ttl > 0:
+        latest = cache.get(stats_latest_key(project.pk))
+        if latest is not None and time.time() - latest['computed'] < ttl:
+            entry = latest
+    return entry
+
+
+def get_stats(project):
+    """
+    Renvoie `(version, statistiques)` du projet, `version` étant celle pour laquelle elles ont été calculées.
+
+    Les statistiques sont mises en cache pour chaque version du projet : toute écriture change la clé
+    (voir `Project.version`), sauf pendant `PROJECT_STATS_TTL` secondes si ce délai est activé.
+    Une seule requête calcule à la fois ; les autres attendent son résultat (au plus `STATS_LOCK_WAIT` secondes).
+    """
+    entry = cached_entry(project)
+    if entry is not None:
+        return entry['version'], entry['stats']
+
+    lock = stats_lock_key(project.pk)
+    deadline = time.monotonic() + STATS_LOCK_WAIT
+    while not (locked := cache.add(lock, True, STATS_LOCK_TIMEOUT)):
+        time.sleep(STATS_LOCK_POLL)
+        entry = cached_entry(project)
+        if entry is not None:
+            return entry['version'], entry['stats']
+        if time.monotonic() >= deadline:
+            # Le calcul en cours est trop long (ou interrompu) : la requête calcule elle-même
+            break
+
+    try:
+        entry = {'version': project.version, 'computed': time.time(), 'stats': compute_stats(project)}
+        timeout = getattr(settings, 'PROJECT_STATS_CACHE_TIMEOUT', 300)
+        cache.set(stats_cache_key(project.pk, project.version), entry, timeout)
+        if getattr(settings, 'PROJECT_STATS_TTL', 0) > 0:
+            cache.set(stats_latest_key(project.pk), entry, timeout)
+    finally:
+        if locked:
+            cache.delete(lock)
+    return entry['version'], entry['stats']
@@ -0,0 +1,186 @@
+"""
+Synchronisation incrémentale des listes (`?since=<curseur>`) pour les clients hors ligne.
+
+Au lieu de la liste complète, la réponse contient les objets créés ou modifiés depuis le curseur
+(`updated_time`), les identifiants des objets supprimés ou devenus invisibles depuis (`Tombstone`),
+et le curseur de la synchronisation suivante : une synchronisation coûte O(modifications).
+`?since=` vide renvoie tout, avec un premier curseur.
+
+Les objets modifiés sont paginés par clé (`updated_time`, `id`) : `?limit=` objets par page, et
+un lien `next` tant qu'il en reste. Les suppressions et le curseur suivant ne sont renvoyés
+qu'avec la dernière page.
+"""
+import base64
+import binascii
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from .membership import get_membership
+from .models import Tombstone
+
+SYNC_PARAM = 'since'
+PAGE_PARAM = 'page'
+LIMIT_PARAM = 'limit'
+
+
+def encode_cursor(moment):
+    return base64.urlsafe_b64encode(moment.isoformat().encode()).decode()
+
+
+def decode_cursor(cursor):
+    """
+    Renvoie la date du curseur, ou None pour une première synchronisation (curseur vide).
+    """
+    if not cursor:
+        return None
+    try:
+        moment = parse_datetime(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except (binascii.Error, UnicodeError, ValueError):
+        moment = None
+    if moment is None or timezone.is_naive(moment):
+        raise ValidationError({SYNC_PARAM: ['Curseur de synchronisation invalide.']})
+    return moment
+
+
+def next_cursor():
+    """
+    Le curseur de la synchronisation suivante : l'heure de la requête moins `SYNC_CURSOR_MARGIN` secondes.
+    Une écriture datée avant la lecture mais validée après (transaction en cours) est ainsi renvoyée
+    à la synchronisation suivante ; les objets modifiés dans la marge peuvent être reçus deux fois.
+    """
+    return encode_cursor(timezone.now() - timedelta(seconds=getattr(settings, 'SYNC_CURSOR_MARGIN', 5)))
+
+
+def encode_page(cursor, last):
+    """
+    Le jeton de la page suivante : le curseur calculé à la première page, et la clé du dernier objet renvoyé.
+    """
+    token = {'cursor': cursor, 'after': [last.updated_time.isoformat(), last.pk]}
+    return base64.urlsafe_b64encode(json.dumps(token).encode()).decode()
+
+
+def decode_page(token):
+    """
+    Renvoie `(curseur, (updated_time, id))` du jeton de page.
+    """
+    try:
+        data = json.loads(base64.urlsafe_b64decode(token.encode()))
+        cursor, (moment, pk) = data['cursor'], data['after']
+        decode_cursor(cursor)
+        moment = parse_datetime(moment)
+    except (binascii.Error, UnicodeError, ValueError, TypeError, KeyError, ValidationError):
+        moment = None
+    if moment is None or timezone.is_naive(moment) or not isinstance(pk, int):
+        raise ValidationError({PAGE_PARAM: ['Page de synchronisation invalide.']})
+    return cursor, (moment, pk)
+
+
+def page_size(request):
+    """
+    `?limit=`, borné à `SYNC_MAX_PAGE_SIZE` ; `SYNC_PAGE_SIZE` par défaut.
+    """
+    default = getattr(settings, 'SYNC_PAGE_SIZE', 500)
+    try:
+        limit = int(request.query_params.get(LIMIT_PARAM, default))
+    except ValueError:
+        limit = default
+    return max(1, min(limit, getattr(settings, 'SYNC_MAX_PAGE_SIZE', 1000)))
+
+
+def record_deletion(model, object_id, scope_id):
+    Tombstone.objects.create(model=model, object_id=object_id, scope_id=scope_id)
+
+
+def record_deletions(model, object_id, scope_ids):
+    """
+    Les traces d'une suppression pour plusieurs listes (`scope_ids`), en une insertion.
+    """
+    Tombstone.objects.bulk_create([Tombstone(model=model, object_id=object_id, scope_id=scope_id) for scope_id in scope_ids])
+
+
+class DeltaSyncMixin:
+    """
+    Ajoute `?since=<curseur>` à l'action `list` : renvoie
+    `{'changed': [...], 'deleted': [identifiants], 'cursor': '...', 'next': url}` au lieu de la page habituelle.
+    Tant que `next` n'est pas nul, `deleted` est vide et `cursor` nul : le client suit `next` jusqu'à la dernière page.
+    Les filtres de la liste (`?search=`, `?status=`...) et `?fields=` s'appliquent aux objets modifiés.
+    """
+
+    # Obligatoire : le type des traces de la liste (Tombstone.PROJECT, ISSUE ou COMMENT)
+    tombstone_model = None
+    # L'argument d'URL qui identifie la portée des traces, None pour l'utilisateur de la requête
+    tombstone_scope = None
+
+    @classmethod
+    def as_view(cls, *args, **kwargs):
+        if cls.tombstone_model is None:
+            raise ImproperlyConfigured(f'{cls.__name__} doit définir tombstone_model.')
+        return super().as_view(*args, **kwargs)
+
+    def get_tombstones(self):
+        """
+        Les traces de suppression de la liste, ou une queryset vide si l'utilisateur ne la voit pas.
+        """
+        if not self.can_see_tombstones():
+            return Tombstone.objects.none()
+        scope_id = self.request.user.id if self.tombstone_scope is None else int(self.kwargs[self.tombstone_scope])
+        return Tombstone.objects.filter(model=self.tombstone_model, scope_id=scope_id)
+
+    def can_see_tombstones(self):
+        """
+        Les listes d'un projet (`project_pk`) ne sont visibles que de ses membres.
+        """
+        project_pk = self.kwargs.get('project_pk')
+        return project_pk is None or get_membership(self.request).can_see(int(project_pk))
+
+    def list(self, request, *args, **kwargs):
+        if SYNC_PARAM not in request.query_params:
+            return super().list(request, *args, **kwargs)
+        return self.delta(request)
+
+    def delta(self, request):
+        since = decode_cursor(request.query_params[SYNC_PARAM])
+        token = request.query_params.get(PAGE_PARAM)
+        if token:
+            cursor, (after_time, after_id) = decode_page(token)
+        else:
+            cursor = next_cursor()
+        queryset = self.filter_queryset(self.get_queryset())
+        if since is not None:
+            queryset = queryset.filter(updated_time__gte=since)
+
+        page = queryset
+        if token:
+            page = page.filter(Q(updated_time__gt=after_time) | Q(updated_time=after_time, id__gt=after_id))
+        limit = page_size(request)
+        changed = list(page.order_by('updated_time', 'id')[:limit + 1])
+        if len(changed) > limit:
+            changed = changed[:limit]
+            return Response({
+                'changed': self.get_serializer(changed, many=True).data,
+                'deleted': [],
+                'cursor': None,
+                'next': replace_query_param(request.build_absolute_uri(), PAGE_PARAM, encode_page(cursor, changed[-1])),
+            })
+
+        deleted = []
+        if since is not None:
+            tombstone_ids = set(self.get_tombstones().filter(deleted_time__gte=since).values_list('object_id', flat=True))
+            # Un projet retiré puis rendu à l'utilisateur dans l'intervalle est modifié, pas supprimé
+            present = set(queryset.filter(pk__in=tombstone_ids).values_list('pk', flat=True)) if tombstone_ids else set()
+            deleted = sorted(tombstone_ids - present)
+        return Response({
+            'changed': self.get_serializer(changed, many=True).data,
+            'deleted': deleted,
+            'cursor': cursor,
+            'next': None,
+        })
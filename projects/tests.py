@@ -1,3 +1,1457 @@
-from django.test import TestCase
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import tempfile
+import time
+from io import StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.db import connection, connections
+from django.test import AsyncClient, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import viewsets
+from rest_framework.response import Response
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from config.sqlite.base import DatabaseWrapper
+
+from .async_views import AsyncReadView, user_queryset
+from .management.commands import bench_api
+from .models import Project, Contributor, Issue, Comment, Activity, FeedEntry, Tombstone
+from .events import Bus, LocalBackend, UnixSocketBackend, contributor_event, get_bus
+from .response_cache import ResponseCacheMixin
+from .replicas import ReplicaRouter, check_shared_cache
+from .search import install_triggers
+from .sync import DeltaSyncMixin
+from .serializers import UserSerializer
+from .sse import SSE_PATH, EventStreamApplication
+from .stats import stats_cache_key, stats_lock_key
+
+User = get_user_model()
+
+
+class QueryCountTests(TestCase):
+    """
+    Vérifie que les listes et les détails exécutent un nombre de requêtes
+    indépendant du nombre de lignes.
+    """
+
+    SIZES = [10, 1000, 100000]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.contributor = User.objects.create(username='contributor')
+        cls.datasets = {size: cls.seed(size) for size in cls.SIZES}
+
+    @classmethod
+    def seed(cls, size):
+        """
+        Crée un auteur et son projet avec `size` problèmes et un commentaire par problème
+        (au plus 1 000 commentaires).
+        """
+        author = User.objects.create(username=f'author{size}')
+        project = Project.objects.create(author=author, title='P', description='D', type='WEB')
+        Contributor.objects.create(user=cls.contributor, project=project)
+        Issue.objects.bulk_create(
+            [Issue(title=f'I{i}', description='D', priority='FAIBLE', tag='BUG', status='A_FAIRE',
+                   project=project, author=author) for i in range(size)]
+        )
+        issues = Issue.objects.filter(project=project).order_by('id')[:1000]
+        Comment.objects.bulk_create(
+            [Comment(description='C', author=cls.contributor, issue=issue) for issue in issues]
+        )
+        return author, project, issues[0]
+
+    def count_queries(self, user, url):
+        client = APIClient()
+        client.force_authenticate(user)
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context)
+
+    def assert_constant_queries(self, url_for, sizes=SIZES):
+        counts = []
+        for size in sizes:
+            author, project, issue = self.datasets[size]
+            counts.append(self.count_queries(author, url_for(project, issue)))
+        self.assertEqual(len(set(counts)), 1, counts)
+
+    def test_project_list(self):
+        self.assert_constant_queries(lambda project, issue: '/projects/')
+
+    def test_project_detail(self):
+        # Le détail sérialise tous les problèmes du projet : on se limite aux petites tailles.
+        self.assert_constant_queries(lambda project, issue: f'/projects/{project.pk}/', [10, 1000])
+
+    def test_issue_list(self):
+        self.assert_constant_queries(lambda project, issue: f'/projects/{project.pk}/issues/')
+
+    def test_comment_list(self):
+        self.assert_constant_queries(lambda project, issue: f'/projects/{project.pk}/issues/{issue.pk}/comments/')
+
+
+class KeysetPaginationTests(TestCase):
+    """
+    Vérifie le mode de pagination par curseur des problèmes.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='author')
+        cls.project = Project.objects.create(author=cls.author, title='P', description='D', type='WEB')
+        Issue.objects.bulk_create(
+            [Issue(title=f'I{i}', description='D', priority='FAIBLE', tag='BUG', status='A_FAIRE',
+                   project=cls.project, author=cls.author) for i in range(25)]
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def test_cursor_mode_walks_every_issue_without_count(self):
+        url = f'/projects/{self.project.pk}/issues/?pagination=cursor&limit=10'
+        seen = []
+        while url:
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(url)
+            self.assertFalse(any('COUNT(' in query['sql'] for query in context.captured_queries))
+            self.assertNotIn('count', response.data)
+            seen += [issue['id'] for issue in response.data['results']]
+            url = response.data['next']
+        self.assertEqual(seen, sorted(Issue.objects.values_list('id', flat=True)))
+
+    def test_cursor_mode_rejects_other_orderings(self):
+        url = f'/projects/{self.project.pk}/issues/'
+        for params in ({'ordering': '-priority'}, {'search': 'I1'}, {'cursor': '', 'ordering': 'status'}):
+            response = self.client.get(url, {'pagination': 'cursor', **params})
+            self.assertEqual(response.status_code, 400)
+            self.assertIn(next(param for param in params if param != 'cursor'), response.data)
+
+    def test_cursor_mode_uses_project_index(self):
+        queryset = Issue.objects.filter(project=self.project).order_by('created_time', 'id')
+        self.assertIn('issue_project_created_id_idx', queryset.explain())
+
+    def test_limit_offset_mode_is_default(self):
+        response = self.client.get(f'/projects/{self.project.pk}/issues/?limit=10&offset=20')
+        self.assertEqual(response.data['count'], 25)
+        self.assertEqual(len(response.data['results']), 5)
+
+
+class MembershipTests(TestCase):
+    """
+    Vérifie la résolution de l'appartenance aux projets utilisée par les permissions.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='author')
+        cls.contributor = User.objects.create(username='contributor')
+        cls.outsider = User.objects.create(username='outsider')
+        cls.project = Project.objects.create(author=cls.author, title='P', description='D', type='WEB')
+        Contributor.objects.create(user=cls.contributor, project=cls.project)
+
+    def post_issue(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.post(
+            f'/projects/{self.project.pk}/issues/',
+            {'title': 'I', 'description': 'D', 'priority': 'FAIBLE', 'tag': 'BUG', 'status': 'A_FAIRE'},
+        )
+
+    def test_create_issue_loads_project_once(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.post_issue(self.contributor)
+        self.assertEqual(response.status_code, 201)
+        project_loads = [q for q in context.captured_queries if '"projects_project"."title"' in q['sql']]
+        self.assertEqual(len(project_loads), 1)
+
+    def test_outsider_cannot_create_issue(self):
+        self.assertEqual(self.post_issue(self.outsider).status_code, 403)
+
+    @override_settings(MEMBERSHIP_CACHE_TIMEOUT=60)
+    def test_cached_membership_is_invalidated_on_contributor_delete(self):
+        self.assertEqual(self.post_issue(self.contributor).status_code, 201)
+        Contributor.objects.filter(user=self.contributor).delete()
+        self.assertEqual(self.post_issue(self.contributor).status_code, 403)
+
+
+class ContributorTests(TestCase):
+    """
+    Vérifie l'unicité des contributeurs et le périmètre des routes imbriquées.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='author')
+        cls.user = User.objects.create(username='user')
+        cls.project = Project.objects.create(author=cls.author, title='P', description='D', type='WEB')
+        cls.other_project = Project.objects.create(author=cls.author, title='Q', description='D', type='WEB')
+        Issue.objects.create(title='I', description='D', priority='FAIBLE', tag='BUG', status='A_FAIRE',
+                             project=cls.other_project, author=cls.author)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def test_duplicate_contributor_is_rejected(self):
+        url = f'/projects/{self.project.pk}/users/'
+        self.assertEqual(self.client.post(url, {'contributor_id': self.user.pk}).status_code, 201)
+        self.assertEqual(self.client.post(url, {'contributor_id': self.user.pk}).status_code, 400)
+        self.assertEqual(Contributor.objects.filter(user=self.user, project=self.project).count(), 1)
+
+    def test_bulk_add_contributors(self):
+        others = User.objects.bulk_create([User(username=f'u{i}') for i in range(5)])
+        Contributor.objects.create(user=self.user, project=self.project)
+        ids = [other.pk for other in others] + [self.user.pk, 999999]
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(f'/projects/{self.project.pk}/users/', {'contributor_ids': ids}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        results = {result['contributor_id']: result['result'] for result in response.data['results']}
+        self.assertEqual(results[self.user.pk], 'already_contributor')
+        self.assertEqual(results[999999], 'not_found')
+        self.assertEqual(list(results.values()).count('added'), 5)
+        self.assertEqual(self.project.project_contributors.count(), 6)
+        # projet, validation des utilisateurs, insertion en masse, évènements du fil d'activité
+        self.assertEqual(len([q for q in context.captured_queries if q['sql'].startswith(('SELECT', 'INSERT'))]), 4)
+
+    def test_bulk_remove_contributors(self):
+        Contributor.objects.create(user=self.user, project=self.project)
+        response = self.client.delete(f'/projects/{self.project.pk}/users/',
+                                      {'contributor_ids': [self.user.pk, self.author.pk]}, format='json')
+        self.assertEqual(response.data['results'], [
+            {'contributor_id': self.user.pk, 'result': 'removed'},
+            {'contributor_id': self.author.pk, 'result': 'not_contributor'},
+        ])
+        self.assertFalse(self.project.project_contributors.exists())
+        self.assertTrue(Tombstone.objects.filter(model=Tombstone.PROJECT, object_id=self.project.pk,
+                                                 scope_id=self.user.pk).exists())
+
+    def test_bulk_remove_contributors_query_count_is_constant(self):
+        def remove(count):
+            users = User.objects.bulk_create([User(username=f'r{count}-{i}') for i in range(count)])
+            Contributor.objects.bulk_create([Contributor(user=user, project=self.project) for user in users])
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.delete(f'/projects/{self.project.pk}/users/',
+                                              {'contributor_ids': [user.pk for user in users]}, format='json')
+            self.assertEqual([result['result'] for result in response.data['results']], ['removed'] * count)
+            return len(context.captured_queries)
+
+        self.assertEqual(remove(50), remove(1))
+        self.assertEqual(Tombstone.objects.filter(model=Tombstone.PROJECT, object_id=self.project.pk).count(), 51)
+
+    def test_bulk_contributors_requires_a_list(self):
+        response = self.client.post(f'/projects/{self.project.pk}/users/', {'contributor_ids': 'x'}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_issue_list_is_scoped_to_project(self):
+        response = self.client.get(f'/projects/{self.project.pk}/issues/')
+        self.assertEqual(response.data['count'], 0)
+
+    def test_author_also_contributor_sees_no_duplicates(self):
+        Contributor.objects.create(user=self.author, project=self.other_project)
+        self.assertEqual(self.client.get('/projects/').data['count'], 2)
+        self.assertEqual(self.client.get(f'/projects/{self.other_project.pk}/issues/').data['count'], 1)
+
+
+class CounterTests(TestCase):
+    """
+    Vérifie la maintenance des compteurs dénormalisés.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='author')
+        cls.project = Project.objects.create(author=cls.author, title='P', description='D', type='WEB')
+
+    def create_issue(self, status='A_FAIRE'):
+        return Issue.objects.create(title='I', description='D', priority='FAIBLE', tag='BUG', status=status,
+                                    project=self.project, author=self.author)
+
+    def assert_counters(self, issue_count, open_issue_count):
+        self.project.refresh_from_db()
+        self.assertEqual((self.project.issue_count, self.project.open_issue_count), (issue_count, open_issue_count))
+
+    def test_issue_create_status_change_and_delete(self):
+        issue = self.create_issue()
+        self.create_issue(status='TERMINE')
+        self.assert_counters(2, 1)
+
+        issue = Issue.objects.get(pk=issue.pk)
+        issue.status = 'TERMINE'
+        issue.save()
+        self.assert_counters(2, 0)
+
+        issue.delete()
+        self.assert_counters(1, 0)
+
+    def test_comment_count(self):
+        issue = self.create_issue()
+        comments = [Comment.objects.create(description='C', author=self.author, issue=issue) for _ in range(3)]
+        comments[0].delete()
+        issue.refresh_from_db()
+        self.assertEqual(issue.comment_count, 2)
+
+    def test_deleting_projects_in_bulk_skips_per_row_counters(self):
+        """
+        Les problèmes et commentaires supprimés avec une queryset de projets ne mettent pas à jour
+        les compteurs ligne par ligne : le nombre de requêtes ne dépend pas de leur nombre.
+        """
+        def delete_project(issues):
+            project = Project.objects.create(author=self.author, title='P', description='D', type='WEB')
+            for _ in range(issues):
+                issue = Issue.objects.create(title='I', description='D', priority='FAIBLE', tag='BUG',
+                                             status='A_FAIRE', project=project, author=self.author)
+                Comment.objects.create(description='C', author=self.author, issue=issue)
+            with CaptureQueriesContext(connection) as context:
+                Project.objects.filter(pk=project.pk).delete()
+            return len(context.captured_queries)
+
+        self.assertEqual(delete_project(10), delete_project(1))
+
+    def test_deleting_issues_in_bulk_skips_per_comment_counters(self):
+        """
+        Les commentaires supprimés avec une queryset de problèmes ne mettent pas à jour leur problème.
+        """
+        def delete_issues(comments):
+            issues = [self.create_issue() for _ in range(2)]
+            for issue in issues:
+                for _ in range(comments):
+                    Comment.objects.create(description='C', author=self.author, issue=issue)
+            with CaptureQueriesContext(connection) as context:
+                Issue.objects.filter(pk__in=[issue.pk for issue in issues]).delete()
+            return len(context.captured_queries)
+
+        self.assertEqual(delete_issues(10), delete_issues(1))
+        self.assertFalse(Tombstone.objects.filter(model=Tombstone.COMMENT).exists())
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.issue_count, Issue.objects.filter(project=self.project).count())
+
+    def test_deleting_users_skips_rows_of_their_projects(self):
+        """
+        Les problèmes et commentaires supprimés avec l'auteur de leur projet ne laissent ni trace ni compteur
+        à mettre à jour : le nombre de requêtes ne dépend pas de leur nombre. Ceux écrits par l'utilisateur
+        dans le projet d'un autre sont supprimés avec lui, sans mettre à jour leurs commentaires.
+        """
+        def delete_user(issues, bulk):
+            user = User.objects.create(username=f'user-{issues}-{bulk}')
+            project = Project.objects.create(author=user, title='P', description='D', type='WEB')
+            for _ in range(issues):
+                issue = Issue.objects.create(title='I', description='D', priority='FAIBLE', tag='BUG',
+                                             status='A_FAIRE', project=project, author=self.author)
+                Comment.objects.create(description='C', author=self.author, issue=issue)
+            # Un problème de l'utilisateur dans le projet d'un autre, commenté par d'autres
+            issue = Issue.objects.create(title='I', description='D', priority='FAIBLE', tag='BUG',
+                                         status='A_FAIRE', project=self.project, author=user)
+            for _ in range(issues):
+                Comment.objects.create(description='C', author=self.author, issue=issue)
+            with CaptureQueriesContext(connection) as context:
+                if bulk:
+                    User.objects.filter(pk=user.pk).delete()
+                else:
+                    user.delete()
+            return len(context.captured_queries)
+
+        for bulk in (False, True):
+            with self.subTest(bulk=bulk):
+                self.assertEqual(delete_user(10, bulk), delete_user(1, bulk))
+
+        self.assertFalse(Tombstone.objects.filter(model=Tombstone.COMMENT).exists())
+        # Seuls les problèmes du projet restant laissent une trace et mettent à jour ses compteurs
+        self.assertEqual(set(Tombstone.objects.filter(model=Tombstone.ISSUE).values_list('scope_id', flat=True)),
+                         {self.project.pk})
+        self.assert_counters(0, 0)
+
+    def test_repair_counters(self):
+        issue = self.create_issue()
+        Comment.objects.create(description='C', author=self.author, issue=issue)
+        Project.objects.update(issue_count=0, open_issue_count=0)
+        Issue.objects.update(comment_count=0)
+
+        call_command('repair_counters', stdout=StringIO())
+
+        self.assert_counters(1, 1)
+        issue.refresh_from_db()
+        self.assertEqual(issue.comment_count, 1)
+
+
+class SparseFieldsTests(TestCase):
+    """
+    Vérifie les paramètres `?fields=` et `?expand=`.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='author')
+        cls.project = Project.objects.create(author=cls.author, title='P', description='D', type='WEB')
+        cls.issue = Issue.objects.create(title='I', description='D', priority='FAIBLE', tag='BUG', status='A_FAIRE',
+                                         project=cls.project, author=cls.author)
+        Comment.objects.create(description='C', author=cls.author, issue=cls.issue)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def get_issues(self, query):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(f'/projects/{self.project.pk}/issues/{query}')
+        return response.data['results'][0], [q['sql'] for q in context.captured_queries]
+
+    def test_full_representation_by_default(self):
+        issue, _ = self.get_issues('')
+        self.assertEqual(issue['author'], {'id': self.author.pk, 'username': 'author'})
+        self.assertEqual(len(issue['comments']), 1)
+
+    def test_fields_select_columns_and_skip_relations(self):
+        issue, queries = self.get_issues('?fields=id,title,status,author')
+        self.assertEqual(issue, {'id': self.issue.pk, 'title': 'I', 'status': 'A_FAIRE', 'author': self.author.pk})
+        self.assertFalse(any('projects_comment' in sql for sql in queries))
+        self.assertFalse(any('"projects_issue"."description"' in sql for sql in queries))
+
+    def test_computed_fields_load_their_columns(self):
+        """
+        `comments_url` lit le projet du problème : la colonne est chargée avec la page,
+        le nombre de requêtes ne dépend pas du nombre de problèmes.
+        """
+        def count_queries(limit):
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(f'/projects/{self.project.pk}/issues/?fields=id,comments_url&limit={limit}')
+            self.assertEqual(len(response.data['results']), limit)
+            return len(context.captured_queries)
+
+        for _ in range(9):
+            Issue.objects.create(title='I', description='D', priority='FAIBLE', tag='BUG', status='A_FAIRE',
+                                 project=self.project, author=self.author)
+        self.assertEqual(count_queries(10), count_queries(2))
+
+        issue, _ = self.get_issues('?fields=id,comments_url')
+        self.assertEqual(set(issue), {'id', 'comments_url'})
+        self.assertTrue(issue['comments_url'].endswith(f'/projects/{self.project.pk}/issues/{issue["id"]}/comments/'))
+
+    def test_expand(self):
+        issue, _ = self.get_issues('?fields=id&expand=comments,author')
+        self.assertEqual(set(issue), {'id', 'comments', 'author'})
+        self.assertEqual(issue['comments'][0]['author']['username'], 'author')
+
+
+class CommentPreviewTests(TestCase):
+    """
+    Vérifie l'aperçu borné des commentaires d'un problème.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='author')
+        cls.project = Project.objects.create(author=cls.author, title='P', description='D', type='WEB')
+        for _ in range(2):
+            issue = Issue.objects.create(title='I', description='D', priority='FAIBLE', tag='BUG', status='A_FAIRE',
+                                         project=cls.project, author=cls.author)
+            for i in range(10):
+                Comment.objects.create(description=f'C{i}', author=cls.author, issue=issue)
+
+    def test_issue_carries_latest_comments_count_and_link(self):
+        client = APIClient()
+        client.force_authenticate(self.author)
+        response = client.get(f'/projects/{self.project.pk}/issues/')
+
+        for issue in response.data['results']:
+            self.assertEqual([comment['description'] for comment in issue['comments']], ['C9', 'C8', 'C7'])
+            self.assertEqual(issue['comment_count'], 10)
+            self.assertTrue(issue['comments_url'].endswith(f'/projects/{self.project.pk}/issues/{issue["id"]}/comments/'))
+
+
+class ExportTests(TestCase):
+    """
+    Vérifie l'export NDJSON d'un projet.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='author')
+        cls.outsider = User.objects.create(username='outsider')
+        cls.project = Project.objects.create(author=cls.author, title='P', description='D', type='WEB')
+        issue = Issue.objects.create(title='I', description='D', priority='FAIBLE', tag='BUG', status='A_FAIRE',
+                                     project=cls.project, author=cls.author)
+        Comment.objects.create(description='C', author=cls.author, issue=issue)
+
+    def export(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.get(f'/projects/{self.project.pk}/export/')
+
+    def test_export_streams_one_json_object_per_line(self):
+        response = self.export(self.author)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        lines = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([line['kind'] for line in lines], ['project', 'issue', 'comment'])
+
+    def test_export_requires_visibility(self):
+        self.assertEqual(self.export(self.outsider).status_code, 404)
+
+    async def test_export_streams_asynchronously_under_asgi(self):
+        """
+        Sous ASGI, le flux est un itérateur asynchrone : Django l'envoie paquet par paquet sans le lire en entier.
+        """
+        response = await AsyncClient().get(f'/projects/{self.project.pk}/export/',
+                                           headers={'Authorization': f'Bearer {AccessToken.for_user(self.author)}'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_async)
+        content = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual([json.loads(line)['kind'] for line in content.decode().splitlines()],
+                         ['project', 'issue', 'comment'])
+
+
+class BulkIssueTests(TestCase):
+    """
+    Vérifie la création et la modification en masse de problèmes.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='author')
+        cls.other = User.objects.create(username='other')
+        cls.project = Project.objects.create(author=cls.author, title='P', description='D', type='WEB')
+        Contributor.objects.create(user=cls.other, project=cls.project)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+        self.url = f'/projects/{self.project.pk}/issues/'
+
+    def issue_data(self, i):
+        return {'title': f'I{i}', 'description': 'D', 'priority': 'FAIBLE', 'tag': 'BUG', 'status': 'A_FAIRE'}
+
+    def test_bulk_create(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(self.url, [self.issue_data(i) for i in range(300)], format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data), 300)
+        self.assertTrue(all(issue['id'] for issue in response.data))
+        # projet, appartenance, 2 paquets d'insertion, compteurs, évènements du fil d'activité (+ SAVEPOINT)
+        self.assertLess(len(context), 11)
+        self.project.refresh_from_db()
+        self.assertEqual((self.project.issue_count, self.project.open_issue_count), (300, 300))
+
+    def test_bulk_create_validates_every_item(self):
+        response = self.client.post(self.url, [self.issue_data(0), {'title': 'x'}], format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Issue.objects.exists())
+
+    def test_bulk_update(self):
+        self.client.post(self.url, [self.issue_data(i) for i in range(3)], format='json')
+        foreign = Issue.objects.create(project=self.project, author=self.other, **self.issue_data(9))
+        ids = list(Issue.objects.filter(author=self.author).values_list('id', flat=True))
+
+        response = self.client.patch(f'{self.url}bulk/', {'ids': ids + [foreign.pk, 999999], 'status': 'TERMINE'},
+                                     format='json')
+
+        self.assertEqual([result['result'] for result in response.data['results']],
+                         ['updated'] * 3 + ['forbidden', 'not_found'])
+        self.assertEqual(Issue.objects.filter(status='TERMINE').count(), 3)
+        self.project.refresh_from_db()
+        self.assertEqual((self.project.issue_count, self.project.open_issue_count), (4, 1))
+
+    def test_bulk_update_requires_membership(self):
+        outsider = User.objects.create(username='outsider')
+        self.client.force_authenticate(outsider)
+        response = self.client.patch(f'{self.url}bulk/', {'ids': [1], 'status': 'TERMINE'}, format='json')
+        self.assertEqual(response.status_code, 403)
+
+
+class ConditionalGetTests(TestCase):
+    """
+    Vérifie les ETags calculés à partir des versions des projets.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='author')
+        cls.project = Project.objects.create(author=cls.author, title='P', description='D', type='WEB')
+        cls.issue = Issue.objects.create(title='I', description='D', priority='FAIBLE', tag='BUG', status='A_FAIRE',
+                                         project=cls.project, author=cls.author)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def assert_not_modified_after_one_query(self, url):
+        etag = self.client.get(url)['ETag']
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(len(context), 1)
+        return etag
+
+    def test_not_modified(self):
+        for url in ['/projects/', f'/projects/{self.project.pk}/', f'/projects/{self.project.pk}/issues/']:
+            self.assert_not_modified_after_one_query(url)
+
+    def test_writes_change_the_etag(self):
+        url = f'/projects/{self.project.pk}/issues/'
+        writes = [
+            lambda: Comment.objects.create(description='C', author=self.author, issue=self.issue),
+            lambda: Issue.objects.filter(pk=self.issue.pk).first().save(),
+            lambda: Contributor.objects.create(user=User.objects.create(username='u'), project=self.project),
+            lambda: self.client.patch(f'{url}bulk/', {'ids': [self.issue.pk], 'priority': 'ELEVEE'}, format='json'),
+        ]
+        for write in writes:
+            etag = self.client.get(url)['ETag']
+            write()
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+@override_settings(RESPONSE_CACHE_TIMEOUT=60)
+class ResponseCacheTests(TestCase):
+    """
+    Vérifie le cache des listes et son invalidation par les écritures.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='author')
+        cls.project = Project.objects.create(author=cls.author, title='P', description='D', type='WEB')
+        cls.issue = Issue.objects.create(title='I', description='D', priority='FAIBLE', tag='BUG', status='A_FAIRE',
+                                         project=cls.project, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def assert_cached(self, url):
+        first = self.client.get(url).json()
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.json(), first)
+        # Seuls restent le contrôle des permissions et l'ETag : aucune ligne n'est relue
+        self.assertFalse([query for query in context if any(column in query['sql'] for column in (
+            '"projects_issue"."title"', '"projects_project"."title"', '"authentication_user"."username"'))])
+        return first
+
+    def test_hit(self):
+        for url in ['/projects/', f'/projects/{self.project.pk}/issues/', f'/projects/{self.project.pk}/user_list/']:
+            self.assert_cached(url)
+
+    def test_writes_invalidate(self):
+        url = f'/projects/{self.project.pk}/issues/'
+        writes = [
+            lambda: Comment.objects.create(description='C', author=self.author, issue=self.issue),
+            lambda: Issue(pk=self.issue.pk, **{**Issue.objects.filter(pk=self.issue.pk).values(
+                'project_id', 'author_id', 'description', 'priority', 'tag', 'status', 'created_time').get(),
+                'title': 'T'}).save(),
+            lambda: self.client.patch(f'{url}bulk/', {'ids': [self.issue.pk], 'status': 'EN_COURS'}, format='json'),
+        ]
+        for write in writes:
+            before = self.assert_cached(url)
+            write()
+            self.assertNotEqual(self.client.get(url).json(), before)
+
+        # La liste des projets suit les compteurs
+        before = self.assert_cached('/projects/')
+        self.client.post(url, [{'title': 'J', 'description': 'D', 'priority': 'FAIBLE', 'tag': 'BUG',
+                                'status': 'A_FAIRE'}], format='json')
+        self.assertNotEqual(self.client.get('/projects/').json(), before)
+
+    def test_new_contributor_sees_the_project(self):
+        user = User.objects.create(username='u')
+        client = APIClient()
+        client.force_authenticate(user)
+        self.assertEqual(client.get('/projects/').json()['count'], 0)
+        self.client.post(f'/projects/{self.project.pk}/users/', {'contributor_id': user.pk}, format='json')
+        self.assertEqual(client.get('/projects/').json()['count'], 1)
+
+    def test_file_based_cache(self):
+        with tempfile.TemporaryDirectory() as location:
+            backend = {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location}
+            with override_settings(CACHES={'default': backend, 'responses': backend}, RESPONSE_CACHE_ALIAS='responses'):
+                before = self.assert_cached(f'/projects/{self.project.pk}/issues/')
+                Comment.objects.create(description='C', author=self.author, issue=self.issue)
+                self.assertNotEqual(self.client.get(f'/projects/{self.project.pk}/issues/').json(), before)
+
+    def test_stats(self):
+        self.assert_cached('/projects/')
+        admin = User.objects.create(username='admin', is_staff=True)
+        self.client.force_authenticate(admin)
+        self.assertEqual(self.client.get('/cache/stats/').json()['routes']['projects'], {'hits': 1, 'misses': 1})
+
+    def test_cache_scopes_are_required(self):
+        class UnscopedViewSet(ResponseCacheMixin, viewsets.ViewSet):
+            def list(self, request):
+                return self.cached(lambda request: Response([]), request)
+
+        with self.assertRaises(ImproperlyConfigured):
+            UnscopedViewSet.as_view({'get': 'list'})
+
+
+class AsyncReadTests(TestCase):
+    """
+    Vérifie que les routes asynchrones renvoient la même chose que les routes synchrones.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='author')
+        cls.outsider = User.objects.create(username='outsider')
+        cls.project = Project.objects.create(author=cls.author, title='P', description='D', type='WEB')
+        Contributor.objects.create(user=cls.outsider, project=Project.objects.create(
+            author=cls.outsider, title='Q', description='D', type='WEB'))
+        for i in range(3):
+            issue = Issue.objects.create(title=f'I{i}', description='D', priority='FAIBLE', tag='BUG', status='A_FAIRE',
+                                         project=cls.project, author=cls.author)
+            Comment.objects.create(description='C', author=cls.author, issue=issue)
+        cls.issue = issue
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.author)}')
+
+    def test_same_responses(self):
+        for route in ['projects/', f'projects/{self.project.pk}/', f'projects/{self.project.pk}/issues/?limit=2',
+                      f'projects/{self.project.pk}/issues/{self.issue.pk}/comments/', 'users/',
+                      f'projects/{self.project.pk}/issues/?fields=id,title&expand=author']:
+            expected = self.client.get(f'/{route}')
+            response = self.client.get(f'/async/{route}')
+            self.assertEqual(response.status_code, 200, route)
+            if 'next' in expected.data:
+                expected.data['next'] = expected.data['next'] and expected.data['next'].replace('/projects/', '/async/projects/')
+            self.assertEqual(response.json(), json.loads(json.dumps(expected.data)), route)
+
+    def test_visibility_and_authentication(self):
+        other = Project.objects.get(title='Q')
+        self.assertEqual(self.client.get(f'/async/projects/{other.pk}/').status_code, 404)
+        self.assertEqual(self.client.get(f'/async/projects/{other.pk}/issues/').json()['count'], 0)
+        self.assertEqual(APIClient().get('/async/projects/').status_code, 401)
+
+    def test_queryset_function_and_serializer_are_required(self):
+        with self.assertRaises(ImproperlyConfigured):
+            AsyncReadView.as_view()
+        with self.assertRaises(ImproperlyConfigured):
+            AsyncReadView.as_view(queryset_function=user_queryset)
+        AsyncReadView.as_view(queryset_function=user_queryset, serializer_class=UserSerializer)
+
+
+class SearchTests(TestCase):
+    """
+    Vérifie la recherche plein texte sur les problèmes et les commentaires.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='author')
+        cls.project = Project.objects.create(author=cls.author, title='P', description='D', type='WEB')
+        other = Project.objects.create(author=User.objects.create(username='other'), title='Q', description='D', type='WEB')
+
+        def issue(project, title, description):
+            return Issue.objects.create(title=title, description=description, priority='FAIBLE', tag='BUG',
+                                        status='A_FAIRE', project=project, author=project.author)
+
+        cls.crash = issue(cls.project, 'Plantage au démarrage', 'Le serveur plante')
+        cls.login = issue(cls.project, 'Connexion lente', 'La page de connexion plante parfois')
+        issue(other, 'Plantage', 'Invisible')
+        Comment.objects.bulk_create([
+            Comment(description='Reproduit sur la préproduction', author=cls.author, issue=cls.crash),
+            Comment(description='Rien à signaler', author=cls.author, issue=cls.crash),
+        ])
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def search(self, text, route='issues/'):
+        response = self.client.get(f'/projects/{self.project.pk}/{route}', {'search': text})
+        return [result['id'] for result in response.data['results']]
+
+    def test_ranked_prefix_and_accent_insensitive(self):
+        # Le titre et la description du premier contiennent le mot : il est classé avant
+        self.assertEqual(self.search('plant'), [self.crash.pk, self.login.pk])
+        self.assertEqual(self.search('demarrage'), [self.crash.pk])
+        self.assertEqual(self.search('connexion lente'), [self.login.pk])
+        self.assertEqual(self.search('"*'), [])
+
+    def test_index_follows_writes(self):
+        Issue.objects.filter(pk=self.login.pk).update(title='Authentification lente')
+        self.assertEqual(self.search('authentification'), [self.login.pk])
+        self.crash.delete()
+        self.assertEqual(self.search('plante'), [self.login.pk])
+
+    def test_triggers_reinstalled_after_migrate(self):
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TRIGGER projects_issue_fts_ai')
+        install_triggers()
+        issue = Issue.objects.create(title='Nouveau', description='D', priority='FAIBLE', tag='BUG', status='A_FAIRE',
+                                     project=self.project, author=self.author)
+        self.assertEqual(self.search('nouveau'), [issue.pk])
+
+    def test_comments(self):
+        route = f'issues/{self.crash.pk}/comments/'
+        self.assertEqual(len(self.search('preproduction', route)), 1)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.author)}')
+        response = client.get(f'/async/projects/{self.project.pk}/{route}', {'search': 'signaler'})
+        self.assertEqual(response.json()['count'], 1)
+
+
+class IssueFilterTests(TestCase):
+    """
+    Vérifie les filtres et les tris de la liste des problèmes.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='author')
+        cls.other = User.objects.create(username='other')
+        cls.project = Project.objects.create(author=cls.author, title='P', description='D', type='WEB')
+        Contributor.objects.create(user=cls.other, project=cls.project)
+        cls.issues = {}
+        for name, priority, tag, status, author in [
+            ('high-bug', 'ELEVEE', 'BUG', 'A_FAIRE', cls.author),
+            ('low-bug', 'FAIBLE', 'BUG', 'EN_COURS', cls.other),
+            ('high-task-done', 'ELEVEE', 'TACHE', 'TERMINE', cls.author),
+            ('medium-feature', 'MOYEN', 'AMELIORATION', 'A_FAIRE', cls.other),
+        ]:
+            cls.issues[name] = Issue.objects.create(title=name, description='D', priority=priority, tag=tag,
+                                                    status=status, project=cls.project, author=author)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def titles(self, **params):
+        response = self.client.get(f'/projects/{self.project.pk}/issues/', params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return [issue['title'] for issue in response.data['results']]
+
+    def test_filters(self):
+        self.assertEqual(self.titles(status='A_FAIRE,EN_COURS', priority='ELEVEE', tag='BUG'), ['high-bug'])
+        self.assertEqual(sorted(self.titles(author=self.other.pk)), ['low-bug', 'medium-feature'])
+        self.assertEqual(self.titles(created_after='2999-01-01T00:00:00Z'), [])
+
+    def test_ordering(self):
+        self.assertEqual(self.titles(ordering='-priority')[-1], 'low-bug')
+        self.assertEqual(self.titles(ordering='status'), ['high-bug', 'medium-feature', 'low-bug', 'high-task-done'])
+        self.assertEqual(self.titles(ordering='-created_time')[0], 'medium-feature')
+
+    def test_invalid_values(self):
+        url = f'/projects/{self.project.pk}/issues/'
+        for params in [{'status': 'OUVERT'}, {'priority': 'ELEVEE,URGENT'}, {'ordering': 'title'},
+                       {'author': 'x'}, {'created_after': 'hier'}]:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertIn(next(iter(params)), response.data)
+
+
+class ProjectStatsTests(TestCase):
+    """
+    Vérifie les statistiques d'un projet et leur mise en cache.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='author')
+        cls.other = User.objects.create(username='other')
+        cls.outsider = User.objects.create(username='outsider')
+        cls.project = Project.objects.create(author=cls.author, title='P', description='D', type='WEB')
+        Contributor.objects.create(user=cls.other, project=cls.project)
+        bug = Issue.objects.create(title='bug', description='D', priority='ELEVEE', tag='BUG', status='A_FAIRE',
+                                   project=cls.project, author=cls.author)
+        Issue.objects.create(title='task', description='D', priority='FAIBLE', tag='TACHE', status='TERMINE',
+                             project=cls.project, author=cls.other)
+        for author in [cls.other, cls.other, cls.author]:
+            Comment.objects.create(description='C', author=author, issue=bug)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+        self.url = f'/projects/{self.project.pk}/stats/'
+
+    def test_stats(self):
+        with self.assertNumQueries(5):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        data = response.data
+        self.assertEqual(data['issue_count'], 2)
+        self.assertEqual(data['issues_by_status'], {'A_FAIRE': 1, 'EN_COURS': 0, 'TERMINE': 1})
+        self.assertEqual(data['issues_by_tag']['BUG'], 1)
+        self.assertEqual(data['comments_per_issue'], {'0': 1, '1-2': 0, '3-5': 1, '6-10': 0, '11+': 0})
+        self.assertEqual(data['top_comment_authors'][0], {'id': self.other.pk, 'username': 'other', 'count': 2})
+        self.assertEqual(len(data['top_issue_authors']), 2)
+
+    def create_issue(self):
+        Issue.objects.create(title='new', description='D', priority='MOYEN', tag='BUG', status='EN_COURS',
+                             project=self.project, author=self.author)
+
+    def in_progress(self):
+        return self.client.get(self.url).data['issues_by_status']['EN_COURS']
+
+    def test_cached_per_version(self):
+        etag = self.client.get(self.url)['ETag']
+        # Servies depuis le cache : seul le projet est relu
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # Une écriture change la version du projet : les statistiques sont recalculées
+        self.create_issue()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        self.assertEqual(self.in_progress(), 1)
+
+    @override_settings(PROJECT_STATS_TTL=30)
+    def test_cached_for_ttl(self):
+        etag = self.client.get(self.url)['ETag']
+        # Avec un délai, une écriture ne provoque pas de recalcul avant PROJECT_STATS_TTL secondes ;
+        # l'ETag suit les données servies
+        self.create_issue()
+        self.assertEqual(self.in_progress(), 0)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        with override_settings(PROJECT_STATS_TTL=0):
+            self.assertEqual(self.in_progress(), 1)
+
+    def test_waits_for_running_computation(self):
+        """
+        Y compris au premier calcul, une seule requête calcule : les autres attendent son résultat.
+        """
+        version = Project.objects.get(pk=self.project.pk).version
+        entry = {'version': version, 'computed': time.time(), 'stats': {'issue_count': 42}}
+        cache.add(stats_lock_key(self.project.pk), True)
+
+        # L'autre requête termine son calcul pendant l'attente
+        def finish_computation(seconds):
+            cache.set(stats_cache_key(self.project.pk, version), entry)
+
+        with mock.patch('projects.stats.time.sleep', side_effect=finish_computation), self.assertNumQueries(1):
+            self.assertEqual(self.client.get(self.url).data, {'issue_count': 42})
+
+    def test_computes_when_running_computation_is_too_long(self):
+        cache.add(stats_lock_key(self.project.pk), True)
+        with mock.patch('projects.stats.STATS_LOCK_WAIT', 0):
+            self.assertEqual(self.client.get(self.url).data['issue_count'], 2)
+        # Le verrou de l'autre requête n'est pas levé
+        self.assertFalse(cache.add(stats_lock_key(self.project.pk), True))
+
+    def test_not_visible(self):
+        self.client.force_authenticate(self.outsider)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+
+class ActivityFeedTests(TestCase):
+    """
+    Vérifie le fil d'activité, en diffusion à l'écriture et à la lecture.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='author')
+        cls.member = User.objects.create(username='member')
+        cls.outsider = User.objects.create(username='outsider')
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def build_project(self):
+        project = Project.objects.create(author=self.author, title='P', description='D', type='WEB')
+        Contributor.objects.create(user=self.member, project=project)
+        issue = Issue.objects.create(title='bug', description='D', priority='ELEVEE', tag='BUG', status='A_FAIRE',
+                                     project=project, author=self.author)
+        issue.status = 'EN_COURS'
+        issue.save()
+        Comment.objects.create(description='Vu', author=self.member, issue=issue)
+        return project
+
+    def feed(self, user, **params):
+        self.client.force_authenticate(user)
+        response = self.client.get('/feed/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def verbs(self, user):
+        return [item['verb'] for item in self.feed(user)['results']]
+
+    def test_same_feed_in_both_modes(self):
+        expected = [Activity.COMMENT_CREATED, Activity.ISSUE_STATUS_CHANGED, Activity.ISSUE_CREATED,
+                    Activity.CONTRIBUTOR_ADDED]
+        for mode in ['write', 'read']:
+            with self.subTest(mode=mode), override_settings(ACTIVITY_FEED_FANOUT=mode):
+                Project.objects.all().delete()
+                self.build_project()
+                self.assertEqual(self.verbs(self.member), expected)
+                self.assertEqual(self.verbs(self.author), expected)
+                self.assertEqual(self.verbs(self.outsider), [])
+        status = Activity.objects.filter(verb=Activity.ISSUE_STATUS_CHANGED).get()
+        self.assertEqual((status.data['old_status'], status.data['status']), ('A_FAIRE', 'EN_COURS'))
+
+    def test_fanout_on_write(self):
+        with override_settings(ACTIVITY_FEED_FANOUT='read'):
+            self.build_project()
+        self.assertFalse(FeedEntry.objects.exists())
+        with override_settings(ACTIVITY_FEED_FANOUT='write'):
+            self.build_project()
+        self.assertEqual(FeedEntry.objects.filter(user=self.member).count(), 4)
+
+    def test_cursor_pagination(self):
+        self.build_project()
+        page = self.feed(self.member, limit=3)
+        self.assertEqual(len(page['results']), 3)
+        self.assertIsNone(page['previous'])
+        response = self.client.get(page['next'])
+        self.assertEqual([item['verb'] for item in response.data['results']], [Activity.CONTRIBUTOR_ADDED])
+
+    @override_settings(ACTIVITY_FEED_FANOUT='write')
+    def test_removed_contributor(self):
+        project = self.build_project()
+        project.project_contributors.get(user=self.member).delete()
+        self.assertEqual(self.verbs(self.member), [])
+        self.assertEqual(self.verbs(self.author)[0], Activity.CONTRIBUTOR_REMOVED)
+
+    @override_settings(ACTIVITY_FEED_FANOUT='write')
+    def test_new_contributor_gets_recent_history(self):
+        project = self.build_project()
+        Contributor.objects.create(user=self.outsider, project=project)
+        self.assertEqual(len(self.verbs(self.outsider)), 5)
+
+    def test_bulk_status_change(self):
+        project = self.build_project()
+        issue = project.issues.get()
+        self.client.force_authenticate(self.author)
+        self.client.patch(f'/projects/{project.pk}/issues/bulk/', {'ids': [issue.pk], 'status': 'TERMINE'},
+                          format='json')
+        latest = self.feed(self.member)['results'][0]
+        self.assertEqual((latest['verb'], latest['data']['status']), (Activity.ISSUE_STATUS_CHANGED, 'TERMINE'))
+
+
+@override_settings(SYNC_CURSOR_MARGIN=0)
+class DeltaSyncTests(TestCase):
+    """
+    Vérifie la synchronisation incrémentale (`?since=`) des projets, problèmes et commentaires.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='author')
+        cls.member = User.objects.create(username='member')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+        self.project = Project.objects.create(author=self.author, title='P', description='D', type='WEB')
+        Contributor.objects.create(user=self.member, project=self.project)
+        self.issues = [self.create_issue(f'issue {i}') for i in range(3)]
+        self.issues_url = f'/projects/{self.project.pk}/issues/'
+
+    def create_issue(self, title):
+        return Issue.objects.create(title=title, description='D', priority='MOYEN', tag='BUG', status='A_FAIRE',
+                                    project=self.project, author=self.author)
+
+    def sync(self, url, cursor=''):
+        response = self.client.get(url, {'since': cursor})
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def test_issue_sync(self):
+        initial = self.sync(self.issues_url)
+        self.assertEqual(len(initial['changed']), 3)
+        self.assertEqual(initial['deleted'], [])
+
+        kept, changed, deleted = self.issues
+        deleted_id = deleted.pk
+        changed.title = 'changed'
+        changed.save()
+        deleted.delete()
+        created = self.create_issue('created')
+        delta = self.sync(self.issues_url, initial['cursor'])
+        self.assertEqual([issue['id'] for issue in delta['changed']], [changed.pk, created.pk])
+        self.assertEqual(delta['deleted'], [deleted_id])
+
+        self.assertEqual(self.sync(self.issues_url, delta['cursor'])['changed'], [])
+
+    def test_delta_is_paginated(self):
+        cursor = self.sync(self.issues_url)['cursor']
+        created = [self.create_issue(f'created {i}') for i in range(5)]
+        deleted_id = self.issues[0].pk
+        self.issues[0].delete()
+
+        response = self.client.get(self.issues_url, {'since': cursor, 'limit': 2})
+        pages = [response.data]
+        while pages[-1]['next']:
+            self.assertEqual((pages[-1]['deleted'], pages[-1]['cursor']), ([], None))
+            pages.append(self.client.get(pages[-1]['next']).data)
+        self.assertEqual([len(page['changed']) for page in pages], [2, 2, 1])
+        self.assertEqual([issue['id'] for page in pages for issue in page['changed']], [issue.pk for issue in created])
+        self.assertEqual(pages[-1]['deleted'], [deleted_id])
+        self.assertIsNotNone(pages[-1]['cursor'])
+
+        response = self.client.get(self.issues_url, {'since': cursor, 'page': 'pas-une-page'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('page', response.data)
+
+    def test_bulk_update_and_comments_touch_issues(self):
+        cursor = self.sync(self.issues_url)['cursor']
+        self.client.patch(f'{self.issues_url}bulk/', {'ids': [self.issues[0].pk], 'status': 'TERMINE'}, format='json')
+        Comment.objects.create(description='C', author=self.author, issue=self.issues[1])
+        changed = [issue['id'] for issue in self.sync(self.issues_url, cursor)['changed']]
+        self.assertEqual(changed, [self.issues[0].pk, self.issues[1].pk])
+
+    def test_comment_sync(self):
+        issue = self.issues[0]
+        url = f'{self.issues_url}{issue.pk}/comments/'
+        comments = [Comment.objects.create(description='C', author=self.author, issue=issue) for _ in range(2)]
+        cursor = self.sync(url)['cursor']
+        comment_id = comments[0].pk
+        comments[0].delete()
+        self.assertEqual(self.sync(url, cursor)['deleted'], [comment_id])
+
+        # Les commentaires supprimés avec leur problème ne laissent pas de trace : celle du problème suffit
+        issue_id = issue.pk
+        issue.delete()
+        self.assertEqual(Tombstone.objects.filter(model=Tombstone.COMMENT).count(), 1)
+        self.assertEqual(self.sync(self.issues_url, cursor)['deleted'], [issue_id])
+
+    def test_project_sync(self):
+        cursor = self.sync('/projects/')['cursor']
+        project_id = self.project.pk
+        self.project.project_contributors.get(user=self.member).delete()
+        self.client.force_authenticate(self.member)
+        delta = self.sync('/projects/', cursor)
+        self.assertEqual((delta['changed'], delta['deleted']), ([], [project_id]))
+
+        self.client.force_authenticate(self.author)
+        self.project.delete()
+        self.assertEqual(self.sync('/projects/', cursor)['deleted'], [project_id])
+        # Ni trace de problème ni de commentaire pour un projet supprimé
+        self.assertFalse(Tombstone.objects.exclude(model=Tombstone.PROJECT).exists())
+
+    def test_project_sync_when_author_is_deleted(self):
+        other = User.objects.create(username='other')
+        Contributor.objects.create(user=other, project=self.project)
+        self.client.force_authenticate(self.member)
+        cursor = self.sync('/projects/')['cursor']
+        project_id = self.project.pk
+
+        # Le projet part avec son auteur : ses contributeurs reçoivent la trace, pas l'utilisateur supprimé
+        User.objects.filter(pk__in=[self.author.pk, other.pk]).delete()
+        self.assertEqual(self.sync('/projects/', cursor)['deleted'], [project_id])
+        self.assertFalse(Tombstone.objects.filter(scope_id=other.pk).exists())
+
+    def test_tombstone_model_is_required(self):
+        class UntrackedViewSet(DeltaSyncMixin, viewsets.ReadOnlyModelViewSet):
+            queryset = Issue.objects.all()
+
+        with self.assertRaises(ImproperlyConfigured):
+            UntrackedViewSet.as_view({'get': 'list'})
+
+    def test_outsider_gets_no_tombstones(self):
+        cursor = self.sync(self.issues_url)['cursor']
+        self.issues[0].delete()
+        self.client.force_authenticate(User.objects.create(username='outsider'))
+        self.assertEqual(self.sync(self.issues_url, cursor)['deleted'], [])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.issues_url, {'since': 'pas-un-curseur'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('since', response.data)
+
+
+class EventStreamTests(TestCase):
+    """
+    Vérifie le bus d'évènements et le flux Server-Sent Events (`/events/`).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='author')
+        cls.outsider = User.objects.create(username='outsider')
+        cls.project = Project.objects.create(author=cls.author, title='P', description='D', type='WEB')
+        cls.other = Project.objects.create(author=cls.outsider, title='Q', description='D', type='WEB')
+
+    def create_issue(self, project):
+        # Les évènements sont publiés à la validation de la transaction
+        with self.captureOnCommitCallbacks(execute=True):
+            return Issue.objects.create(title='I', description='D', priority='MOYEN', tag='BUG', status='A_FAIRE',
+                                        project=project, author=project.author)
+
+    def add_contributor(self, user, project):
+        with self.captureOnCommitCallbacks(execute=True):
+            Contributor.objects.create(user=user, project=project)
+
+    async def received(self, subscription):
+        """
+        Les évènements remis à l'abonnement (les remises sont planifiées dans la boucle).
+        """
+        await asyncio.sleep(0)
+        events = []
+        while not subscription.queue.empty():
+            events.append(subscription.queue.get_nowait()[0])
+        return events
+
+    @skipUnless(hasattr(socket, 'AF_UNIX') and hasattr(os, 'fork'), 'Sockets Unix indisponibles')
+    async def test_unix_socket_backend_crosses_processes(self):
+        with tempfile.TemporaryDirectory() as directory:
+            bus = Bus(UnixSocketBackend(directory))
+            subscription = bus.subscribe(1, {10})
+            # L'évènement est publié par un autre processus, avec son propre bus
+            pid = os.fork()
+            if pid == 0:
+                code = 1
+                try:
+                    Bus(UnixSocketBackend(directory)).publish({'type': 'issue.created', 'project': 10, 'issue': 1})
+                    code = 0
+                finally:
+                    os._exit(code)
+            _, status = os.waitpid(pid, 0)
+            self.assertEqual(os.waitstatus_to_exitcode(status), 0)
+            event, _ = await asyncio.wait_for(subscription.get(), 5)
+            self.assertEqual((event['type'], event['issue']), ('issue.created', 1))
+
+            # La socket du processus terminé est supprimée au prochain envoi
+            bus.publish({'type': 'issue.created', 'project': 10, 'issue': 2})
+            self.assertEqual(os.listdir(directory), [f'{os.getpid()}.sock'])
+            event, _ = await asyncio.wait_for(subscription.get(), 5)
+            self.assertEqual(event['issue'], 2)
+
+    async def test_bus_routing_and_membership(self):
+        bus = Bus(LocalBackend())
+        first, second = bus.subscribe(1, {10}), bus.subscribe(2, {20})
+        bus.publish({'type': 'issue.created', 'project': 10, 'issue': 1})
+        self.assertEqual([event['issue'] for event in await self.received(first)], [1])
+        self.assertEqual(await self.received(second), [])
+
+        # Un contributeur ajouté reçoit les évènements du projet ; retiré, il n'en reçoit plus que l'annonce
+        bus.publish(contributor_event('added', 20, 1))
+        bus.publish({'type': 'issue.created', 'project': 20, 'issue': 2})
+        bus.publish(contributor_event('removed', 20, 1))
+        bus.publish({'type': 'issue.created', 'project': 20, 'issue': 3})
+        self.assertEqual([event['type'] for event in await self.received(first)],
+                         ['contributor.added', 'issue.created', 'contributor.removed'])
+        self.assertEqual(len(await self.received(second)), 4)
+
+        bus.unsubscribe(first)
+        bus.unsubscribe(second)
+        self.assertEqual(bus.subscriber_count(), 0)
+        self.assertEqual(dict(bus.by_project), {})
+
+    @override_settings(SSE_QUEUE_SIZE=2)
+    async def test_slow_subscriber_overflows(self):
+        bus = Bus(LocalBackend())
+        subscription = bus.subscribe(1, {10})
+        for issue_id in range(3):
+            bus.publish({'type': 'issue.created', 'project': 10, 'issue': issue_id})
+        await asyncio.sleep(0)
+        self.assertTrue(subscription.overflowed)
+        self.assertIsNone(await subscription.get())
+        self.assertEqual(bus.subscriber_count(), 0)
+
+    async def open_stream(self, user=None, query=''):
+        """
+        Ouvre le flux avec un client ASGI simulé ; renvoie (tâche, messages envoyés, déconnexion).
+        """
+        messages, disconnected = asyncio.Queue(), asyncio.Event()
+
+        async def receive():
+            await disconnected.wait()
+            return {'type': 'http.disconnect'}
+
+        headers = [(b'authorization', f'Bearer {AccessToken.for_user(user)}'.encode())] if user else []
+        scope = {'type': 'http', 'method': 'GET', 'path': SSE_PATH, 'query_string': query.encode(), 'headers': headers}
+        task = asyncio.ensure_future(EventStreamApplication(None)(scope, receive, messages.put))
+        return task, messages, disconnected
+
+    async def next_body(self, messages):
+        return (await asyncio.wait_for(messages.get(), 1))['body'].decode()
+
+    async def test_stream(self):
+        subscribers = get_bus().subscriber_count()
+        task, messages, disconnected = await self.open_stream(self.author)
+        start = await asyncio.wait_for(messages.get(), 1)
+        self.assertEqual(start['status'], 200)
+        self.assertIn((b'content-type', b'text/event-stream'), start['headers'])
+        self.assertTrue((await self.next_body(messages)).startswith('retry:'))
+
+        # L'évènement d'un projet invisible n'est pas transmis
+        await sync_to_async(self.create_issue)(self.other)
+        issue = await sync_to_async(self.create_issue)(self.project)
+        body = await self.next_body(messages)
+        self.assertIn('event: issue.created\n', body)
+        event = json.loads(body.split('data: ')[1])
+        self.assertEqual((event['project'], event['issue'], event['data']['title']), (self.project.pk, issue.pk, 'I'))
+
+        # Un projet rejoint pendant le flux
+        await sync_to_async(self.add_contributor)(self.author, self.other)
+        self.assertIn('event: contributor.added\n', await self.next_body(messages))
+        await sync_to_async(self.create_issue)(self.other)
+        self.assertIn(f'"project": {self.other.pk}', await self.next_body(messages))
+
+        disconnected.set()
+        await asyncio.wait_for(task, 1)
+        self.assertEqual(get_bus().subscriber_count(), subscribers)
+
+    @override_settings(SSE_KEEPALIVE=0.01)
+    async def test_keepalive_and_project_filter(self):
+        task, messages, disconnected = await self.open_stream(self.author, f'project={self.project.pk}')
+        await messages.get()
+        await self.next_body(messages)
+        self.assertEqual(await self.next_body(messages), ': keepalive\n\n')
+        disconnected.set()
+        await asyncio.wait_for(task, 1)
+
+    async def test_stream_errors(self):
+        for user, query, status in [(None, '', 401), (self.author, f'project={self.other.pk}', 404),
+                                    (self.author, 'project=x', 404)]:
+            task, messages, _ = await self.open_stream(user, query)
+            await asyncio.wait_for(task, 1)
+            self.assertEqual((await messages.get())['status'], status, query)
+
+
+class SQLiteProfileTests(TestCase):
+    """
+    Vérifie le profil de connexion SQLite de production (moteur config.sqlite).
+    """
+
+    def test_init_command_and_transaction_mode(self):
+        with tempfile.TemporaryDirectory() as directory:
+            wrapper = DatabaseWrapper({**connection.settings_dict, **settings.SQLITE_PROFILES['production'],
+                                       'NAME': os.path.join(directory, 'production.sqlite3')})
+            try:
+                with wrapper.cursor() as cursor:
+                    cursor.execute('PRAGMA journal_mode')
+                    self.assertEqual(cursor.fetchone()[0], 'wal')
+                    cursor.execute('PRAGMA busy_timeout')
+                    self.assertEqual(cursor.fetchone()[0], 5000)
+                    cursor.execute('PRAGMA synchronous')
+                    # NORMAL
+                    self.assertEqual(cursor.fetchone()[0], 1)
+                self.assertEqual(wrapper.transaction_mode, 'IMMEDIATE')
+            finally:
+                wrapper.close()
+
+    def test_invalid_transaction_mode(self):
+        wrapper = DatabaseWrapper({**connection.settings_dict, 'OPTIONS': {'transaction_mode': 'PARFOIS'}})
+        with self.assertRaises(ImproperlyConfigured):
+            wrapper.get_connection_params()
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRoutingTests(TestCase):
+    """
+    Vérifie l'aiguillage des lectures vers un réplica, avec un second fichier SQLite : une copie
+    du schéma de la base de test, sans ses données (un réplica très en retard).
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        # L'alias n'existe que pendant ces tests : il est déclaré ici plutôt qu'au lanceur de tests
+        cls.databases = {'default', 'replica'}
+        cls.replica_file = tempfile.NamedTemporaryFile(suffix='.sqlite3', delete=False)
+        cls.replica_file.close()
+        replica = sqlite3.connect(cls.replica_file.name)
+        connection.ensure_connection()
+        connection.connection.backup(replica)
+        replica.close()
+        connections.settings['replica'] = {**connection.settings_dict, 'NAME': cls.replica_file.name}
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections['replica'].close()
+        del connections['replica']
+        del connections.settings['replica']
+        os.remove(cls.replica_file.name)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='author')
+        cls.reader = User.objects.create(username='reader')
+        cls.project = Project.objects.create(author=cls.author, title='P', description='D', type='WEB')
+        Contributor.objects.create(user=cls.reader, project=cls.project)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def test_reads_use_replica_until_the_user_writes(self):
+        self.assertEqual(self.client.get('/projects/').data['count'], 0)
+        self.assertEqual(self.client.get('/users/').data['count'], 0)
+
+        # Les permissions sont décidées sur la base principale, les données lues sur le réplica
+        response = self.client.get(f'/projects/{self.project.pk}/issues/')
+        self.assertEqual((response.status_code, response.data['count']), (200, 0))
+
+        response = self.client.post('/projects/', {'title': 'Q', 'description': 'D', 'type': 'WEB',
+                                                'author': self.author.pk})
+        self.assertEqual(response.status_code, 201)
+        # L'auteur de l'écriture lit ensuite la base principale ; les autres utilisateurs, le réplica
+        self.assertEqual(self.client.get('/projects/').data['count'], 2)
+        self.client.force_authenticate(self.reader)
+        self.assertEqual(self.client.get('/projects/').data['count'], 0)
+
+    @override_settings(RESPONSE_CACHE_TIMEOUT=60)
+    def test_replica_responses_are_not_cached(self):
+        self.client.get('/projects/')
+        with override_settings(DATABASE_REPLICAS=[]):
+            self.assertEqual(self.client.get('/projects/').data['count'], 1)
+
+    def test_router(self):
+        router = ReplicaRouter()
+        # Hors requête, tout va à la base principale
+        self.assertIsNone(router.db_for_read(Project))
+        self.assertEqual(router.db_for_write(Project), 'default')
+        self.assertFalse(router.allow_migrate('replica', 'projects'))
+        self.assertIsNone(router.allow_migrate('default', 'projects'))
+
+    def test_replicas_require_a_shared_cache(self):
+        self.assertEqual([error.id for error in check_shared_cache(None)], ['projects.E001'])
+        shared = {'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': '/tmp'}}
+        with override_settings(CACHES=shared):
+            self.assertEqual(check_shared_cache(None), [])
+        with override_settings(DATABASE_REPLICAS=[]):
+            self.assertEqual(check_shared_cache(None), [])
+
+
+@override_settings(PASSWORD_HASHING_PROFILE='rapide')
+class SeedDataTests(TestCase):
+    """
+    Vérifie le jeu de données de seed_softdesk et la couverture des routes par bench_api.
+    """
+
+    def seed(self, **options):
+        call_command('seed_softdesk', users=20, projects=4, contributors=3, issues=10, comments=2, stdout=StringIO(),
+                     **options)
+        return Issue.objects.order_by('id').values_list('title', 'status', 'project__title')
+
+    def test_seed_softdesk(self):
+        issues = list(self.seed())
+        self.assertEqual(User.objects.filter(username__startswith='seed-').count(), 20)
+        self.assertEqual(Project.objects.count(), 4)
+        self.assertTrue(User.objects.get(username='seed-0').check_password('softdesk'))
+
+        # Problèmes et commentaires sont écrits par des membres du projet, et les compteurs sont à jour
+        for project in Project.objects.all():
+            members = {project.author_id, *project.project_contributors.values_list('user_id', flat=True)}
+            self.assertLessEqual(set(project.issues.values_list('author_id', flat=True)), members)
+            self.assertLessEqual(set(Comment.objects.filter(issue__project=project).values_list('author_id', flat=True)),
+                                 members)
+            self.assertEqual(project.issue_count, project.issues.count())
+        self.assertEqual(Activity.objects.count(),
+                         Issue.objects.count() + Comment.objects.count() + Contributor.objects.count())
+
+        with self.assertRaises(CommandError):
+            self.seed()
+        # Même graine, même jeu de données
+        self.assertEqual(list(self.seed(clear=True)), issues)
+        self.assertEqual(User.objects.count(), 20)
+
+    def test_bench_api_covers_every_route(self):
+        measured = {scenario.name for scenario in bench_api.scenarios(0, 'softdesk')}
+        self.assertEqual(bench_api.api_route_names() - measured, set())
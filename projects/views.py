@@ -4,19 +4,174 @@ from rest_framework import status, viewsets, generics, permissions
 from .models import Project, Contributor, Issue, Comment
 from .serializers import ProjectSerializer, IssueSerializer, CommentSerializer, UserSerializer
 from django.shortcuts import get_object_or_404
-from django.db.models import Q
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Exists, F, OuterRef, Prefetch, When, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
 from django.contrib.auth import get_user_model
 from rest_framework.permissions import IsAuthenticated
-from django.http import Http404
+from django.http import Http404, StreamingHttpResponse
 from django.core.exceptions import PermissionDenied
+from django.core.handlers.asgi import ASGIRequest
 from django.http import HttpResponseForbidden
 
-from .models import Project, Contributor, Issue, Comment
-from .serializers import ProjectSerializer, IssueSerializer, CommentSerializer, UserSerializer, ProjectDetailSerializer
+from .models import Project, Contributor, Issue, Comment, Tombstone
+from .serializers import ActivitySerializer, ProjectSerializer, IssueSerializer, CommentSerializer, UserSerializer, ProjectDetailSerializer, IssueBulkUpdateSerializer, IssueFilterSerializer, get_sparse_params
 from .permissions import IsAuthor, IsIssueAuthor, IsAuthorOrContributor, IsCommentAuthor, IsIssueAuthorOrContributor
+from . import activity, counters, events, response_cache
+from .conditional import ConditionalGetMixin, compute_etag, visible_project_version
+from .response_cache import ResponseCacheMixin
+from .export import aiter_lines, export_project_lines
+from .membership import delete_contributors, get_membership, invalidate_membership, visible_to
+from .pagination import FeedPagination, KeysetPagination, ProjectKeysetPagination
+from .replicas import ReplicaReadMixin
+from .search import search, search_param
+from .stats import get_stats
+from .sync import DeltaSyncMixin, record_deletions
+
+# Nombre maximal d'utilisateurs par ajout ou retrait en masse de contributeurs
+MAX_BULK_CONTRIBUTORS = 1000
+
+# Nombre maximal de problèmes par création en masse, et taille des paquets d'insertion
+MAX_BULK_ISSUES = 1000
+BULK_BATCH_SIZE = 250
+
+
+def load_relations(queryset, request, relations, serializer_class):
+    """
+    Applique `?fields=` et `?expand=` à la queryset : seules les colonnes demandées sont lues (only),
+    avec celles que lisent les champs calculés demandés (`field_columns` du sérialiseur),
+    et seules les relations utiles sont chargées.
+
+    `relations` associe un nom de champ du sérialiseur à la fonction qui charge la relation.
+    Sans paramètre, toutes les relations sont chargées (représentation complète).
+    """
+    fields, expand = get_sparse_params(request)
+    if expand is None:
+        selected = list(relations)
+    else:
+        if fields is not None:
+            concrete = {field.name for field in queryset.model._meta.concrete_fields}
+            requested = fields | expand
+            requested |= {column for name in requested for column in serializer_class.field_columns.get(name, ())}
+            queryset = queryset.only('pk', *(name for name in requested if name in concrete))
+        selected = [
+            name for name in relations
+            if (name in expand if name in serializer_class.expandable_fields else fields is None or name in fields)
+        ]
+
+    for name in selected:
+        queryset = relations[name](queryset)
+    return queryset
+
+
+def latest_comments():
+    """
+    Précharge les derniers commentaires (avec leur auteur) de tous les problèmes de la page,
+    en une seule requête : ROW_NUMBER() numérote les commentaires de chaque problème.
+    """
+    ranked = Comment.objects.select_related('author').annotate(
+        rank=Window(RowNumber(), partition_by=F('issue_id'), order_by=[F('created_time').desc(), F('id').desc()])
+    ).filter(rank__lte=IssueSerializer.comment_preview_size).order_by('-created_time', '-id')
+    return Prefetch('comments', queryset=ranked, to_attr='latest_comments')
+
+
+def issues_with_author_and_comments():
+    """
+    Précharge les problèmes avec leur auteur et leurs derniers commentaires, 
+    pour éviter une requête par problème lors de la sérialisation imbriquée.
+    """
+    return Prefetch('issues', queryset=Issue.objects.select_related('author').prefetch_related(latest_comments()))
+
+
+def project_queryset(request, detail=False):
+    """
+    Les projets visibles par l'utilisateur, avec les relations sérialisées (le détail inclut les problèmes).
+    """
+    # Sous-requête sur les contributeurs : pas de jointure, donc pas de doublons à éliminer.
+    queryset = Project.objects.filter(visible_to(request.user))
+
+    # Les relations sérialisées sont préchargées : le nombre de requêtes ne dépend pas du nombre de lignes.
+    relations = {'contributors': lambda queryset: queryset.prefetch_related('contributors')}
+    if detail:
+        relations['issues'] = lambda queryset: queryset.prefetch_related(issues_with_author_and_comments())
+    serializer_class = ProjectDetailSerializer if detail else ProjectSerializer
+    return load_relations(queryset, request, relations, serializer_class)
 
 
-class ProjectViewSet(viewsets.ModelViewSet):
+def choice_rank(field, choices):
+    """
+    Rang d'une valeur dans la liste des choix du champ, pour trier dans l'ordre métier.
+    """
+    return Case(*(When(**{field: value}, then=rank) for rank, (value, _) in enumerate(choices)))
+
+
+def filter_issues(queryset, request):
+    """
+    Applique `?status=`, `?priority=`, `?tag=`, `?author=`, `?created_after=` et `?ordering=`
+    (valeurs validées par IssueFilterSerializer, 400 sinon). Les filtres sont des conditions SQL
+    servies par les index composites de Issue, qui commencent tous par le projet.
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return queryset
+    serializer = IssueFilterSerializer(data=request.query_params)
+    serializer.is_valid(raise_exception=True)
+    params = serializer.validated_data
+
+    for name in ('status', 'priority', 'tag'):
+        if name in params:
+            queryset = queryset.filter(**{f'{name}__in': params[name]})
+    if 'author' in params:
+        queryset = queryset.filter(author_id=params['author'])
+    if 'created_after' in params:
+        queryset = queryset.filter(created_time__gt=params['created_after'])
+
+    ordering = params.get('ordering')
+    if ordering:
+        name = ordering.lstrip('-')
+        descending = ordering.startswith('-')
+        if name == 'created_time':
+            queryset = queryset.order_by(ordering, '-id' if descending else 'id')
+        else:
+            rank = choice_rank(name, getattr(Issue, f'{name.upper()}_CHOICES'))
+            queryset = queryset.order_by(rank.desc() if descending else rank.asc(), 'created_time', 'id')
+    return queryset
+
+
+def issue_queryset(request, project_pk):
+    """
+    Les problèmes du projet de l'URL, si l'utilisateur en est l'auteur ou un contributeur,
+    filtrés et triés par pertinence avec `?search=`, puis filtrés et triés avec `filter_issues`.
+    L'auteur est joint et les commentaires préchargés pour éviter une requête par problème.
+    """
+    queryset = Issue.objects.filter(visible_to(request.user, 'project'), project_id=project_pk)
+    text = search_param(request)
+    if text:
+        queryset = search(queryset, text)
+    queryset = filter_issues(queryset, request)
+    relations = {
+        'author': lambda queryset: queryset.select_related('author'),
+        'comments': lambda queryset: queryset.prefetch_related(latest_comments()),
+    }
+    return load_relations(queryset, request, relations, IssueSerializer)
+
+
+def comment_queryset(request, project_pk, issue_pk):
+    """
+    Les commentaires du problème de l'URL, si l'utilisateur est l'auteur ou un contributeur du projet,
+    filtrés et triés par pertinence avec `?search=`.
+    L'auteur est joint pour éviter une requête par commentaire.
+    """
+    queryset = Comment.objects.filter(visible_to(request.user, 'issue__project'), issue_id=issue_pk, issue__project_id=project_pk)
+    text = search_param(request)
+    if text:
+        queryset = search(queryset, text)
+    relations = {'author': lambda queryset: queryset.select_related('author')}
+    return load_relations(queryset, request, relations, CommentSerializer)
+
+
+class ProjectViewSet(ReplicaReadMixin, ConditionalGetMixin, ResponseCacheMixin, DeltaSyncMixin, viewsets.ModelViewSet):
     """
     Un ViewSet pour la vue de l'API des objets 'Project'.
     """
@@ -24,6 +179,11 @@ class ProjectViewSet(viewsets.ModelViewSet):
     queryset = Project.objects.all()
     serializer_class = ProjectSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = ProjectKeysetPagination
+    # La liste des projets d'un utilisateur est invalidée par les écritures sur chacun de ses projets
+    cache_scopes = [('user', None)]
+    # Les projets supprimés, ou dont l'utilisateur a été retiré
+    tombstone_model = Tombstone.PROJECT
 
 
     def get_queryset(self):
@@ -31,13 +191,24 @@ class ProjectViewSet(viewsets.ModelViewSet):
         Personnalise la queryset pour renvoyer seulement les projets où 
         l'utilisateur connecté est l'auteur ou un contributeur.
         """
-        user = self.request.user     
-        
-        # fonction distinct : éviter les doublons si un utilisateur est à la fois auteur et contributeur d'un projet.
-        return Project.objects.filter(Q(author=user) | Q(contributors=user)).distinct()
+        if self.action in ['export', 'stats', 'add_contributor', 'remove_contributor', 'remove_contributors']:
+            # Ces actions ne sérialisent pas le projet : inutile de précharger ses relations
+            return Project.objects.filter(visible_to(self.request.user))
+        return project_queryset(self.request, detail=self.action == 'retrieve')
 
 
 
+    def get_etag_versions(self):
+        """
+        La liste dépend des projets visibles et de leurs versions ; le détail, de la version du projet.
+        """
+        if self.action == 'list':
+            projects = Project.objects.filter(visible_to(self.request.user)).order_by('pk')
+            return list(projects.values_list('pk', 'version'))
+        if self.action == 'retrieve':
+            return visible_project_version(self.request.user, self.kwargs['pk'])
+        return None
+
     def perform_create(self, serializer):
         """
         On définit l'utilisateur connecté comme auteur lors de la création d'un projet.
@@ -60,12 +231,43 @@ class ProjectViewSet(viewsets.ModelViewSet):
         Surcharge de la méthode `get_permissions`
         pour assigner des permissions différentes selon l'action.
         """
-        if self.action in ['update', 'partial_update', 'destroy', 'add_contributor', 'remove_contributor']:
+        if self.action in ['update', 'partial_update', 'destroy', 'add_contributor', 'remove_contributor', 'remove_contributors']:
             self.permission_classes = [IsAuthor]
         return super(ProjectViewSet, self).get_permissions()
  
 
 
+    @action(detail=True, methods=['get'], url_path='export')
+    def export(self, request, pk=None):
+        """
+        Exporte le projet, ses problèmes et ses commentaires au format NDJSON (un objet JSON par ligne).
+        La réponse est envoyée au fil de la lecture : la mémoire utilisée ne dépend pas de la taille du projet.
+        """
+        project = self.get_object()
+        lines = export_project_lines(project)
+        if isinstance(request._request, ASGIRequest):
+            # Sous ASGI, le flux est lu par paquets depuis la boucle d'évènements (voir `aiter_lines`)
+            lines = aiter_lines(lines)
+        response = StreamingHttpResponse(lines, content_type='application/x-ndjson')
+        response['Content-Disposition'] = f'attachment; filename="project-{project.pk}.ndjson"'
+        return response
+
+
+    @action(detail=True, methods=['get'], url_path='stats')
+    def stats(self, request, pk=None):
+        """
+        Statistiques du projet : répartition des problèmes par statut, priorité et étiquette,
+        distribution du nombre de commentaires par problème et contributeurs les plus actifs.
+        Elles sont calculées par quelques requêtes GROUP BY et mises en cache (voir `get_stats`) ;
+        l'ETag suit la version pour laquelle les statistiques servies ont été calculées.
+        """
+        version, stats = get_stats(self.get_object())
+        etag = compute_etag(request, version)
+        response = get_conditional_response(request, etag=etag) or Response(stats)
+        response['ETag'] = etag
+        return response
+
+
     @action(detail=True, methods=['post'], url_path='users')
     def add_contributor(self, request, pk=None):
         """
@@ -75,25 +277,119 @@ class ProjectViewSet(viewsets.ModelViewSet):
         # Récupérer le projet actuel
         project = self.get_object()
 
+        # Liste d'utilisateurs : ajout en masse
+        if 'contributor_ids' in request.data:
+            return self.add_contributors(project, request)
+
         # Essaie de récupérer l'utilisateur avec l'ID contributor_id
         try:
             # Récupérer l'utilisateur qui doit être ajouté en tant que contributeur
             contributor_user = get_user_model().objects.get(id=request.data.get('contributor_id'))
 
-            # Vérifier si l'utilisateur est déjà contributeur du projet
-            if project.contributors.filter(id=contributor_user.id).exists():
-                # Si oui, renvoyer un message d'erreur
-                return Response({'message': 'Cet utilisateur est déjà un contributeur du projet.'}, status=status.HTTP_400_BAD_REQUEST)
+            # Créer un nouvel enregistrement dans la table des contributeurs.
+            # La contrainte d'unicité (user, project) refuse les doublons, même en cas de requêtes concurrentes.
+            with transaction.atomic():
+                Contributor.objects.create(user=contributor_user, project=project)
 
-            # Si non, créer un nouvel enregistrement dans la table des contributeurs
-            Contributor.objects.create(user=contributor_user, project=project)
-
-        
         except get_user_model().DoesNotExist:
             return Response({'message': "Le contributeur n'existe pas."}, status=status.HTTP_400_BAD_REQUEST)
 
+        except IntegrityError:
+            # L'utilisateur est déjà contributeur du projet
+            return Response({'message': 'Cet utilisateur est déjà un contributeur du projet.'}, status=status.HTTP_400_BAD_REQUEST)
+
         return Response({'message': 'Contributeur ajouté avec succès au projet.'}, status=status.HTTP_201_CREATED)
 
+
+    def get_contributor_ids(self, request):
+        """
+        Lit et valide la liste `contributor_ids` de la requête (identifiants uniques, dans l'ordre).
+        Renvoie None si la liste est invalide.
+        """
+        if hasattr(request.data, 'getlist'):
+            contributor_ids = request.data.getlist('contributor_ids')
+        else:
+            contributor_ids = request.data.get('contributor_ids')
+
+        if not isinstance(contributor_ids, list) or not 0 < len(contributor_ids) <= MAX_BULK_CONTRIBUTORS:
+            return None
+        try:
+            return list(dict.fromkeys(int(contributor_id) for contributor_id in contributor_ids))
+        except (TypeError, ValueError):
+            return None
+
+
+    def add_contributors(self, project, request):
+        """
+        Ajoute plusieurs contributeurs au projet : une requête pour valider les identifiants,
+        une insertion en masse, et un résultat par identifiant.
+        """
+        contributor_ids = self.get_contributor_ids(request)
+        if contributor_ids is None:
+            return Response({'message': f"contributor_ids doit être une liste de 1 à {MAX_BULK_CONTRIBUTORS} identifiants."}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Une seule requête : les utilisateurs existants et s'ils contribuent déjà au projet
+        users = get_user_model().objects.filter(id__in=contributor_ids).annotate(
+            is_contributor=Exists(Contributor.objects.filter(project=project, user=OuterRef('pk')))
+        ).values_list('id', 'is_contributor')
+        existing = dict(users)
+
+        new_ids = [user_id for user_id in contributor_ids if existing.get(user_id) is False]
+        # ignore_conflicts : la contrainte d'unicité écarte les ajouts concurrents
+        Contributor.objects.bulk_create(
+            [Contributor(user_id=user_id, project=project) for user_id in new_ids], ignore_conflicts=True
+        )
+        # bulk_create ne déclenche pas les signaux
+        invalidate_membership(*new_ids)
+        if new_ids:
+            activity.contributors_added(project.pk, new_ids)
+            events.publish_on_commit(*(events.contributor_event('added', project.pk, user_id) for user_id in new_ids))
+            counters.touch_project(project.pk)
+            response_cache.invalidate([('user', user_id) for user_id in new_ids])
+            response_cache.invalidate_project(project.pk)
+
+        results = []
+        for user_id in contributor_ids:
+            if user_id not in existing:
+                result = 'not_found'
+            elif existing[user_id]:
+                result = 'already_contributor'
+            else:
+                result = 'added'
+            results.append({'contributor_id': user_id, 'result': result})
+        return Response({'results': results}, status=status.HTTP_200_OK)
+
+
+    @add_contributor.mapping.delete
+    def remove_contributors(self, request, pk=None):
+        """
+        Retire plusieurs contributeurs du projet en une suppression, avec un résultat par identifiant.
+        """
+        project = self.get_object()
+
+        contributor_ids = self.get_contributor_ids(request)
+        if contributor_ids is None:
+            return Response({'message': f"contributor_ids doit être une liste de 1 à {MAX_BULK_CONTRIBUTORS} identifiants."}, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            removed = delete_contributors(project.pk, contributor_ids)
+            # La suppression ne déclenche pas les signaux : leurs effets sont appliqués une fois pour le lot
+            if removed:
+                counters.touch_project(project.pk)
+                record_deletions(Tombstone.PROJECT, project.pk, removed)
+                activity.contributors_removed(project.pk, list(removed))
+                events.publish_on_commit(*(events.contributor_event('removed', project.pk, user_id) for user_id in removed))
+        if removed:
+            invalidate_membership(*removed)
+            response_cache.invalidate([('user', user_id) for user_id in removed])
+            response_cache.invalidate_project(project.pk)
+
+        results = [
+            {'contributor_id': user_id, 'result': 'removed' if user_id in removed else 'not_contributor'}
+            for user_id in contributor_ids
+        ]
+        return Response({'results': results}, status=status.HTTP_200_OK)
+
     
     
     
@@ -118,7 +414,7 @@ class ProjectViewSet(viewsets.ModelViewSet):
 
  
 
-class IssueViewSet(viewsets.ModelViewSet):
+class IssueViewSet(ReplicaReadMixin, ConditionalGetMixin, ResponseCacheMixin, DeltaSyncMixin, viewsets.ModelViewSet):
     """
     Un ViewSet pour la vue de l'API des objets 'Issue'.
     """
@@ -126,6 +422,10 @@ class IssueViewSet(viewsets.ModelViewSet):
     # Récupérer tous les problèmes
     queryset = Issue.objects.all()
     serializer_class = IssueSerializer
+    pagination_class = KeysetPagination
+    cache_scopes = [('project', 'project_pk')]
+    tombstone_model = Tombstone.ISSUE
+    tombstone_scope = 'project_pk'
     
     # Les permissions sont définies par défaut comme IsAuthenticated
     permission_classes = [permissions.IsAuthenticated]
@@ -135,25 +435,122 @@ class IssueViewSet(viewsets.ModelViewSet):
         Cette méthode est surchargée pour personnaliser la queryset en fonction de l'utilisateur qui fait la requête.
         """
 
-        # Récupérer l'utilisateur actuellement connecté
-        user = self.request.user
-
-        # Renvoyer les problèmes où l'utilisateur est l'auteur ou contributeur
-        return Issue.objects.filter(Q(project__author=user) | Q(project__contributors=user))
+        return issue_queryset(self.request, self.kwargs['project_pk'])
 
     def perform_create(self, serializer):
         """
         Surchargée pour ajouter l'auteur et le projet lors de la création d'une issue.
         """
 
-        # Récupérer l'ID du projet
-        project_id = self.kwargs['project_pk']
+        # Enregistrer la nouvelle issue dans le projet de l'URL (déjà chargé par get_permissions)
+        serializer.save(author=self.request.user, project=self.get_project())
+
+    def get_etag_versions(self):
+        """
+        Les problèmes et leurs commentaires suivent la version de leur projet.
+        """
+        if self.action in ['list', 'retrieve']:
+            return visible_project_version(self.request.user, self.kwargs['project_pk'])
+        return None
+
+    def create(self, request, *args, **kwargs):
+        """
+        Crée un problème, ou plusieurs si le corps de la requête est une liste.
+        """
+        if isinstance(request.data, list):
+            return self.bulk_create(request)
+        return super().create(request, *args, **kwargs)
 
-        # Trouver le projet correspondant
-        project = get_object_or_404(Project, pk=project_id)
+    def bulk_create(self, request):
+        """
+        Valide une liste de problèmes puis les insère par paquets, avec une seule mise à jour des compteurs du projet.
+        """
+        if not 0 < len(request.data) <= MAX_BULK_ISSUES:
+            return Response({'message': f'La liste doit contenir de 1 à {MAX_BULK_ISSUES} problèmes.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+
+        project = self.get_project()
+        issues = [Issue(**data, project=project, author=request.user) for data in serializer.validated_data]
+        with transaction.atomic():
+            Issue.objects.bulk_create(issues, batch_size=BULK_BATCH_SIZE)
+            # bulk_create ne déclenche pas les signaux : les compteurs et le fil d'activité sont mis à jour ici
+            counters.touch_project(project.pk, len(issues), sum(issue.is_open for issue in issues))
+            activity.issues_created(project.pk, issues)
+            events.publish_on_commit(*(events.issue_event('created', issue) for issue in issues))
+        response_cache.invalidate_project(project.pk)
+
+        # Les nouveaux problèmes n'ont pas encore de commentaires
+        for issue in issues:
+            issue.latest_comments = []
+        return Response(self.get_serializer(issues, many=True).data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['patch'], url_path='bulk')
+    def bulk_update(self, request, project_pk=None):
+        """
+        Applique un statut, une priorité ou une étiquette à plusieurs problèmes du projet en un seul UPDATE.
+        Comme pour la modification d'un problème, seuls les problèmes dont l'utilisateur est l'auteur sont modifiés.
+        """
+        serializer = IssueBulkUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = list(dict.fromkeys(serializer.validated_data.pop('ids')))
+        changes = serializer.validated_data
+
+        with transaction.atomic():
+            # Une requête pour connaître les problèmes existants, leur auteur, leur statut actuel et leur titre.
+            # Elle est faite sous le verrou d'écriture pour que les statuts lus soient ceux que l'UPDATE remplace
+            # (le delta des compteurs en dépend) : SELECT ... FOR UPDATE sous PostgreSQL ; SQLite l'ignore,
+            # mais une transaction IMMEDIATE (profil "production") prend le verrou dès son ouverture, et une
+            # transaction différée échoue (base occupée) plutôt que d'écrire sur une lecture périmée.
+            found = {
+                issue_id: (author_id, old_status, title)
+                for issue_id, author_id, old_status, title in Issue.objects.select_for_update().filter(
+                    project_id=project_pk, id__in=ids
+                ).values_list('id', 'author_id', 'status', 'title')
+            }
+            updated = [issue_id for issue_id in ids if issue_id in found and found[issue_id][0] == request.user.id]
+
+            Issue.objects.filter(id__in=updated).update(**changes, updated_time=timezone.now())
+            # update() ne déclenche pas les signaux : les compteurs et la version du projet sont mis à jour ici
+            open_issues = 0
+            if 'status' in changes:
+                now_open = changes['status'] in Issue.OPEN_STATUSES
+                was_open = sum(found[issue_id][1] in Issue.OPEN_STATUSES for issue_id in updated)
+                open_issues = now_open * len(updated) - was_open
+            if updated:
+                counters.touch_project(project_pk, open_issues=open_issues)
+            if 'status' in changes:
+                activity.statuses_changed(
+                    int(project_pk), [(issue_id, found[issue_id][2], found[issue_id][1]) for issue_id in updated],
+                    changes['status'], request.user.id)
+            # Les évènements ne portent que les champs modifiés, et le titre
+            events.publish_on_commit(*(
+                {'type': 'issue.updated', 'project': int(project_pk), 'issue': issue_id,
+                 'data': {'title': found[issue_id][2], **changes}}
+                for issue_id in updated
+            ))
+        if updated:
+            response_cache.invalidate_project(project_pk, member_lists='status' in changes)
+
+        results = []
+        for issue_id in ids:
+            if issue_id not in found:
+                result = 'not_found'
+            elif issue_id in updated:
+                result = 'updated'
+            else:
+                result = 'forbidden'
+            results.append({'id': issue_id, 'result': result})
+        return Response({'results': results}, status=status.HTTP_200_OK)
 
-        # Enregistrer la nouvelle issue
-        serializer.save(author=self.request.user, project=project)
+    def get_project(self):
+        """
+        Renvoie le projet de l'URL, chargé une seule fois par requête.
+        """
+        if not hasattr(self, '_project'):
+            self._project = get_object_or_404(Project, pk=self.kwargs['project_pk'])
+        return self._project
     
     
     def get_permissions(self):
@@ -163,8 +560,8 @@ class IssueViewSet(viewsets.ModelViewSet):
         try:
             if self.action in ['update', 'partial_update', 'destroy']:
                 permission_classes = [IsIssueAuthor]
-            elif self.action == 'create':
-                project = get_object_or_404(Project, pk=self.kwargs['project_pk'])
+            elif self.action in ['create', 'bulk_update']:
+                project = self.get_project()
                 if IsAuthorOrContributor().has_object_permission(self.request, None, project):
                     permission_classes = [permissions.AllowAny]
                 else:
@@ -180,7 +577,7 @@ class IssueViewSet(viewsets.ModelViewSet):
 
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ReplicaReadMixin, ConditionalGetMixin, DeltaSyncMixin, viewsets.ModelViewSet):
     """
     Un ViewSet pour la vue de l'API des objets 'Comment'.
     """
@@ -188,31 +585,48 @@ class CommentViewSet(viewsets.ModelViewSet):
     # Récupérer tous les commentaires
     queryset = Comment.objects.all()
     serializer_class = CommentSerializer
+    pagination_class = KeysetPagination
+    tombstone_model = Tombstone.COMMENT
+    tombstone_scope = 'issue_pk'
 
     def get_queryset(self):
         """
         Cette méthode est surchargée pour personnaliser la queryset en fonction de l'utilisateur qui fait la requête.
         """
 
-        # Récupérer l'utilisateur actuellement connecté
-        user = self.request.user
-
-        # Renvoyer les commentaires où l'utilisateur est l'auteur ou contributeur
-        return Comment.objects.filter(Q(issue__project__author=user) | Q(issue__project__contributors=user))
+        return comment_queryset(self.request, self.kwargs['project_pk'], self.kwargs['issue_pk'])
 
     def perform_create(self, serializer):
         """
         Surchargée pour ajouter l'auteur et l'issue lors de la création d'un commentaire.
         """
 
-        # Récupérer l'ID de l'issue
-        issue_id = self.kwargs['issue_pk']
+        # Enregistrer le nouveau commentaire sur l'issue de l'URL (déjà chargée par get_permissions)
+        serializer.save(author=self.request.user, issue=self.get_issue())
 
-        # Trouver l'issue correspondante
-        issue = get_object_or_404(Issue, pk=issue_id)
+    def get_etag_versions(self):
+        """
+        Les commentaires suivent la version du projet de leur problème.
+        """
+        if self.action in ['list', 'retrieve']:
+            return visible_project_version(self.request.user, self.kwargs['project_pk'])
+        return None
 
-        # Enregistrer le nouveau commentaire
-        serializer.save(author=self.request.user, issue=issue)
+    def can_see_tombstones(self):
+        """
+        Les commentaires supprimés du problème, si l'utilisateur voit son projet.
+        Si le problème lui-même a été supprimé, sa trace suffit au client.
+        """
+        return super().can_see_tombstones() and Issue.objects.filter(
+            pk=self.kwargs['issue_pk'], project_id=self.kwargs['project_pk']).exists()
+
+    def get_issue(self):
+        """
+        Renvoie l'issue de l'URL, chargée une seule fois par requête.
+        """
+        if not hasattr(self, '_issue'):
+            self._issue = get_object_or_404(Issue, pk=self.kwargs['issue_pk'])
+        return self._issue
         
     def get_permissions(self):
         """
@@ -221,7 +635,7 @@ class CommentViewSet(viewsets.ModelViewSet):
         if self.action in ['update', 'partial_update', 'destroy']:
             permission_classes = [IsCommentAuthor]
         elif self.action == 'create':
-            issue = get_object_or_404(Issue, pk=self.kwargs['issue_pk'])
+            issue = self.get_issue()
             if IsIssueAuthorOrContributor().has_object_permission(self.request, None, issue):
                 permission_classes = [permissions.AllowAny]
             else:
@@ -233,7 +647,7 @@ class CommentViewSet(viewsets.ModelViewSet):
 
 
 
-class UserListView(generics.ListAPIView):
+class UserListView(ReplicaReadMixin, generics.ListAPIView):
     """
     Un View générique pour lister tous les utilisateurs.
     """
@@ -244,19 +658,53 @@ class UserListView(generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
 
+class FeedView(generics.ListAPIView):
+    """
+    Le fil d'activité de l'utilisateur connecté : les derniers évènements de tous ses projets,
+    du plus récent au plus ancien, paginés par curseur (voir projects/activity.py).
+    """
+    serializer_class = ActivitySerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = FeedPagination
+
+    def get_queryset(self):
+        return activity.feed_queryset(self.request.user)
+
+    def paginate_queryset(self, queryset):
+        # La pagination ne lit que les clés du fil ; les évènements de la page sont chargés ensuite
+        return activity.load_page(super().paginate_queryset(queryset))
+
 
-class ProjectUserViewSet(viewsets.ViewSet):
+class ResponseCacheStatsView(generics.GenericAPIView):
+    """
+    Succès et échecs du cache des réponses, par route. Réservé aux administrateurs.
+    """
+    permission_classes = [permissions.IsAdminUser]
+    cached_routes = ('projects', 'project-issues', 'project-user_list')
+
+    def get(self, request):
+        return Response({
+            'enabled': response_cache.is_enabled(),
+            'routes': response_cache.get_stats(self.cached_routes),
+        })
+
+
+class ProjectUserViewSet(ReplicaReadMixin, ResponseCacheMixin, viewsets.ViewSet):
     """
     ViewSet pour obtenir les utilisateurs liés à un projet spécifique.
     """
     # Définition de la classe de permissions
     permission_classes = [IsAuthenticated]
+    cache_scopes = [('project', 'project_pk')]
 
     def list(self, request, project_pk=None):
+        return self.cached(self.list_users, request, project_pk=project_pk)
+
+    def list_users(self, request, project_pk=None):
         project = get_object_or_404(Project, pk=project_pk)
 
         # Vérifiez si l'utilisateur est l'auteur du projet ou un contributeur
-        if not project.author == request.user and not project.contributors.filter(id=request.user.id).exists():
+        if not get_membership(request).can_see(project.id):
             return HttpResponseForbidden("Vous n'avez pas la permission d'accéder à cette ressource.")
 
         serializer = UserSerializer(project.contributors, many=True)